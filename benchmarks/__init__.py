@@ -0,0 +1,3 @@
+"""
+Бенчмарки калькуляторов и обработчиков бота (см. benchmarks/run.py)
+"""
@@ -0,0 +1,120 @@
+"""
+Бенчмарки обработчиков бота: полный путь обновления через Dispatcher
+с поддельной сессией aiogram (без сети)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+from aiogram import Bot
+from aiogram.client.session.base import BaseSession
+from aiogram.methods import SendMessage
+from aiogram.types import Chat, Message, Update, User, WebAppData
+
+from .registry import benchmark
+
+BATCH = 200
+
+
+class FakeSession(BaseSession):
+    """Сессия aiogram, отвечающая на запросы без обращения к Bot API"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = 0
+        self._message = Message(message_id=1, date=datetime.now(),
+                                chat=Chat(id=1, type='private'), text='ok')
+
+    async def make_request(self, bot, method, timeout=None):
+        self.requests += 1
+        if isinstance(method, SendMessage):
+            return self._message
+        return True
+
+    async def stream_content(self, url, headers=None, timeout=30,
+                             chunk_size=65536, raise_for_status=True):
+        yield b''
+
+    async def close(self):
+        pass
+
+
+def _import_bot():
+    """Импорт bot.py с тестовым токеном и временной базой истории"""
+    os.environ.setdefault('BOT_TOKEN', '123456:benchmark')
+    os.environ['HISTORY_DB'] = os.path.join(tempfile.mkdtemp(), 'history.db')
+    import bot
+    return bot
+
+
+def _quiet(func):
+    """
+    Вызов func без вывода журнала в консоль
+
+    Журнал обработки каждого обновления aiogram в замер не входит, записи
+    бота форматируются как обычно, но пишутся в os.devnull; уровень
+    и потоки обработчиков восстанавливаются после каждого вызова.
+    """
+    def run():
+        event_logger = logging.getLogger('aiogram.event')
+        level = event_logger.level
+        handlers = [handler for handler in logging.getLogger().handlers
+                    if isinstance(handler, logging.StreamHandler)]
+        with open(os.devnull, 'w') as devnull:
+            event_logger.setLevel(logging.WARNING)
+            streams = [handler.setStream(devnull) for handler in handlers]
+            try:
+                return func()
+            finally:
+                for handler, stream in zip(handlers, streams):
+                    handler.setStream(stream)
+                event_logger.setLevel(level)
+
+    return run
+
+
+def _updates(make_message, n: int = BATCH):
+    user = User(id=42, is_bot=False, first_name='Bench')
+    chat = Chat(id=42, type='private')
+    return [Update(update_id=i, message=make_message(i, user, chat))
+            for i in range(n)]
+
+
+def _dispatch(updates):
+    bot_module = _import_bot()
+    bot_module.history_store.start()
+    bot = Bot(token='123456:benchmark', session=FakeSession())
+    loop = asyncio.new_event_loop()
+
+    async def feed():
+        for update in updates:
+            await bot_module.dp.feed_update(bot, update)
+
+    return _quiet(lambda: loop.run_until_complete(feed()))
+
+
+@benchmark('bot.handle_web_app_data.dispatch', items=BATCH)
+def handle_web_app_data_dispatch():
+    payload = json.dumps({'category': 'length', 'value': 150, 'fromUnit': 'km',
+                          'convertedValue': 93.2057, 'toUnit': 'mile',
+                          'type': 'Конвертация'})
+
+    def make_message(i, user, chat):
+        return Message(message_id=i, date=datetime.now(), chat=chat,
+                       from_user=user,
+                       web_app_data=WebAppData(data=payload, button_text='📱'))
+
+    return _dispatch(_updates(make_message))
+
+
+@benchmark('bot.text_conversion.dispatch', items=BATCH)
+def text_conversion_dispatch():
+    def make_message(i, user, chat):
+        return Message(message_id=i, date=datetime.now(), chat=chat,
+                       from_user=user, text=f'{i + 1} km в мили')
+
+    return _dispatch(_updates(make_message))
@@ -0,0 +1,91 @@
+"""
+Бенчмарки GRSCalculator и GRSBatch
+"""
+
+import numpy as np
+
+from modules.grs_calculations import GRS_DEFAULTS, GRSBatch, GRSCalculator
+
+from .registry import benchmark
+
+N = 10000
+
+# Аргументы методов: {метод: {аргумент: значение}}
+SCALAR_PARAMS = {
+    'blowdown_separator': {'volume': 10, 'pressure': 1.0, 'temperature': 293,
+                           'n_blowdowns': 1},
+    'refuel_odorization': {'tank_volume': 1, 'concentration': 10,
+                           'pressure': 0.5, 'days': 30},
+    'diaphragm_replacement': {'pipe_diameter': 100, 'pressure': 1.0,
+                              'time_isolated': 1},
+    'gas_heating_before_regulators': {'gas_flow': 1000, 'temp_in': 278.15,
+                                      'temp_out': 288.15, 'hours': 24},
+    'pneumatic_devices': {'n_devices': 5, 'consumption_per_device': 0.1,
+                          'hours_per_day': 24, 'days': 30},
+    'heating_residential': {'area': 100, 'heat_loss_coef': 1.0,
+                            'degree_days': 4000, 'efficiency': 0.85}
+}
+
+APPLIANCES = {
+    'n_appliances': {'stove': 2, 'boiler': 1, 'water_heater': 1},
+    'consumption_rates': {'stove': 1.2, 'boiler': 2.5, 'water_heater': 2.0},
+    'hours_usage': {'stove': 3, 'boiler': 10, 'water_heater': 2}
+}
+
+
+def _columns(params: dict, n: int = N) -> dict:
+    rng = np.random.default_rng(0)
+    return {key: value * rng.uniform(0.8, 1.2, n) for key, value in params.items()}
+
+
+def _register(method: str, params: dict):
+    @benchmark(f'grs.{method}.scalar')
+    def scalar():
+        calc = GRSCalculator()
+        return lambda: getattr(calc, method)(**params)
+
+    @benchmark(f'grs.{method}.batch', items=N)
+    def batch():
+        calc, columns = GRSBatch(), _columns(params)
+        return lambda: getattr(calc, method)(**columns)
+
+
+for _method, _params in SCALAR_PARAMS.items():
+    _register(_method, _params)
+
+
+@benchmark('grs.household_appliances.scalar')
+def household_appliances_scalar():
+    calc = GRSCalculator()
+    return lambda: calc.household_appliances(**APPLIANCES)
+
+
+@benchmark('grs.household_appliances.batch', items=N)
+def household_appliances_batch():
+    calc = GRSBatch()
+    types = list(APPLIANCES['n_appliances'])
+    counts = np.random.default_rng(0).integers(0, 4, (N, len(types)))
+    rates = np.array([APPLIANCES['consumption_rates'][t] for t in types])
+    hours = np.array([APPLIANCES['hours_usage'][t] for t in types])
+    return lambda: calc.household_appliances(counts, rates, hours)
+
+
+def _station_parameters() -> dict:
+    parameters = {section: dict(values) for section, values in GRS_DEFAULTS.items()}
+    parameters['appliances'] = dict(APPLIANCES)
+    return parameters
+
+
+@benchmark('grs.calculate_all_grs.scalar')
+def calculate_all_grs_scalar():
+    calc, parameters = GRSCalculator(), _station_parameters()
+    return lambda: calc.calculate_all_grs(parameters)
+
+
+@benchmark('grs.calculate_table.batch', items=N)
+def calculate_table_batch():
+    calc = GRSBatch()
+    table = {f'{section}.{key}': column
+             for section, defaults in GRS_DEFAULTS.items() if section != 'appliances'
+             for key, column in _columns(defaults).items()}
+    return lambda: calc.calculate_table(table)
@@ -0,0 +1,63 @@
+"""
+Бенчмарки KCCalculator и KCBatch
+"""
+
+import numpy as np
+
+from modules.kc_calculations import KC_DEFAULTS, KC_ITEMS, KCBatch, KCCalculator
+
+from .registry import benchmark
+
+N = 10000
+
+
+def _columns(n: int = N) -> dict:
+    """Колоночные параметры n станций со значениями KC_DEFAULTS ±20 %"""
+    rng = np.random.default_rng(0)
+    return {
+        section: {key: value * rng.uniform(0.8, 1.2, n)
+                  for key, value in defaults.items()}
+        for section, defaults in KC_DEFAULTS.items()
+    }
+
+
+def _register(method: str, section: str):
+    @benchmark(f'kc.{method}.scalar')
+    def scalar():
+        calc = KCCalculator()
+        params = KC_DEFAULTS[section]
+        return lambda: getattr(calc, method)(**params)
+
+    @benchmark(f'kc.{method}.batch', items=N)
+    def batch():
+        calc = KCBatch()
+        params = _columns()[section]
+        return lambda: getattr(calc, method)(**params)
+
+
+for _, _section, _method in KC_ITEMS:
+    _register(_method, _section)
+
+
+@benchmark('kc.calculate_all_kc.scalar')
+def calculate_all_kc_scalar():
+    calc = KCCalculator()
+    return lambda: calc.calculate_all_kc(KC_DEFAULTS)
+
+
+@benchmark('kc.calculate_all_kc.batch', items=N)
+def calculate_all_kc_batch():
+    calc, columns = KCBatch(), _columns()
+    return lambda: calc.calculate_all_kc(columns)
+
+
+@benchmark('kc.calculate_fleet.records', items=N)
+def calculate_fleet_records():
+    calc = KCBatch()
+    columns = _columns()
+    stations = [
+        {section: {key: float(values[i]) for key, values in params.items()}
+         for section, params in columns.items()}
+        for i in range(N)
+    ]
+    return lambda: calc.calculate_fleet(stations)
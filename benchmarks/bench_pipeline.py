@@ -0,0 +1,243 @@
+"""
+Бенчмарки PipelineCalculator и PipelineBatch
+"""
+
+import numpy as np
+
+from modules.network_calculations import PipelineNetwork
+from modules.pipeline_calculations import PipelineBatch, PipelineCalculator
+
+from .registry import benchmark
+
+N = 10000
+
+COMPOSITION = {'methane': 0.92, 'ethane': 0.04, 'propane': 0.01,
+               'nitrogen': 0.02, 'carbon_dioxide': 0.01}
+
+
+def _segments(n: int = N) -> dict:
+    rng = np.random.default_rng(0)
+    return {
+        'diameter': rng.uniform(300, 1400, n),
+        'length': rng.uniform(1, 100, n),
+        'pressure_start': rng.uniform(5, 7.5, n),
+        'pressure_end': rng.uniform(3, 5, n),
+        'flow_rate': rng.uniform(1, 50, n),
+        'temperature': rng.uniform(275, 300, n),
+        'hole_diameter': rng.uniform(1, 50, n),
+        'dew_point': rng.uniform(-30, 0, n)
+    }
+
+
+# ========== СКАЛЯРНЫЕ РАСЧЕТЫ ==========
+
+@benchmark('pipeline.pipeline_volume.scalar')
+def pipeline_volume_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.pipeline_volume(1020, 50)
+
+
+@benchmark('pipeline.pipeline_capacity.scalar')
+def pipeline_capacity_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.pipeline_capacity(1020, 7.5, 5.1, 100, 288)
+
+
+@benchmark('pipeline.pipeline_capacity.scalar_composition')
+def pipeline_capacity_scalar_composition():
+    calc = PipelineCalculator(COMPOSITION)
+    return lambda: calc.pipeline_capacity(1020, 7.5, 5.1, 100, 288)
+
+
+@benchmark('pipeline.pipeline_capacity.scalar_colebrook')
+def pipeline_capacity_scalar_colebrook():
+    calc = PipelineCalculator()
+    return lambda: calc.pipeline_capacity(1020, 7.5, 5.1, 100, 288, lambda_coef=None)
+
+
+@benchmark('pipeline.final_pressure.scalar')
+def final_pressure_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.final_pressure(1020, 7.5, 30, 100, 288)
+
+
+@benchmark('pipeline.final_pressure.scalar_colebrook')
+def final_pressure_scalar_colebrook():
+    calc = PipelineCalculator()
+    return lambda: calc.final_pressure(1020, 7.5, 30, 100, 288, lambda_coef=None)
+
+
+@benchmark('pipeline.gas_through_hole.scalar')
+def gas_through_hole_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.gas_through_hole(10, 5.5, 288)
+
+
+@benchmark('pipeline.leak_volume.scalar')
+def leak_volume_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.leak_volume(20, 5.5, 288, 1020, 10)
+
+
+@benchmark('pipeline.gas_velocity.scalar')
+def gas_velocity_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.gas_velocity(30, 1020, 5.5, 288)
+
+
+@benchmark('pipeline.hydrate_plug_removal.scalar')
+def hydrate_plug_removal_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.hydrate_plug_removal(500, 5.5)
+
+
+@benchmark('pipeline.pipeline_purging.scalar')
+def pipeline_purging_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.pipeline_purging(500, 0.3)
+
+
+@benchmark('pipeline.dew_point_conversion.scalar')
+def dew_point_conversion_scalar():
+    calc = PipelineCalculator()
+    return lambda: calc.dew_point_conversion(-10, 5.5)
+
+
+# ========== ПАКЕТНЫЕ РАСЧЕТЫ ==========
+
+@benchmark('pipeline.pipeline_volume.batch', items=N)
+def pipeline_volume_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.pipeline_volume(s['diameter'], s['length'])
+
+
+@benchmark('pipeline.pipeline_capacity.batch', items=N)
+def pipeline_capacity_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.pipeline_capacity(
+        s['diameter'], s['pressure_start'], s['pressure_end'],
+        s['length'], s['temperature'])
+
+
+@benchmark('pipeline.pipeline_capacity.batch_composition', items=N)
+def pipeline_capacity_batch_composition():
+    batch, s = PipelineBatch(COMPOSITION), _segments()
+    return lambda: batch.pipeline_capacity(
+        s['diameter'], s['pressure_start'], s['pressure_end'],
+        s['length'], s['temperature'])
+
+
+@benchmark('pipeline.final_pressure.batch', items=N)
+def final_pressure_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.final_pressure(
+        s['diameter'], s['pressure_start'], s['flow_rate'],
+        s['length'], s['temperature'])
+
+
+@benchmark('pipeline.pipeline_capacity.batch_colebrook', items=N)
+def pipeline_capacity_batch_colebrook():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.pipeline_capacity(
+        s['diameter'], s['pressure_start'], s['pressure_end'],
+        s['length'], s['temperature'], lambda_coef=None)
+
+
+@benchmark('pipeline.final_pressure.batch_colebrook', items=N)
+def final_pressure_batch_colebrook():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.final_pressure(
+        s['diameter'], s['pressure_start'], s['flow_rate'],
+        s['length'], s['temperature'], lambda_coef=None)
+
+
+@benchmark('pipeline.gas_velocity.batch', items=N)
+def gas_velocity_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.gas_velocity(
+        s['flow_rate'], s['diameter'], s['pressure_start'], s['temperature'])
+
+
+@benchmark('pipeline.gas_through_hole.batch', items=N)
+def gas_through_hole_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.gas_through_hole(
+        s['hole_diameter'], s['pressure_start'], s['temperature'])
+
+
+@benchmark('pipeline.leak_volume.batch', items=N)
+def leak_volume_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.leak_volume(
+        s['hole_diameter'], s['pressure_start'], s['temperature'],
+        s['diameter'], s['length'])
+
+
+@benchmark('pipeline.dew_point_conversion.batch', items=N)
+def dew_point_conversion_batch():
+    batch, s = PipelineBatch(), _segments()
+    return lambda: batch.dew_point_conversion(s['dew_point'], s['pressure_start'])
+
+
+# Методы без векторизованной версии: пакет — цикл скалярных вызовов
+
+@benchmark('pipeline.hydrate_plug_removal.loop', items=N)
+def hydrate_plug_removal_loop():
+    calc, s = PipelineCalculator(), _segments()
+    rows = list(zip(s['length'].tolist(), s['pressure_start'].tolist()))
+    return lambda: [calc.hydrate_plug_removal(v, p) for v, p in rows]
+
+
+@benchmark('pipeline.pipeline_purging.loop', items=N)
+def pipeline_purging_loop():
+    calc, s = PipelineCalculator(), _segments()
+    rows = list(zip(s['length'].tolist(), s['pressure_end'].tolist()))
+    return lambda: [calc.pipeline_purging(v, p) for v, p in rows]
+
+
+# ========== СЕТЬ ==========
+
+def _mesh(side: int, lambda_coef=0.01) -> PipelineNetwork:
+    network = PipelineNetwork(lambda_coef=lambda_coef)
+    for i in range(side):
+        for j in range(side):
+            node = (i, j)
+            if (i, j) == (0, 0):
+                network.add_node(node, pressure=7.5)
+            else:
+                network.add_node(node, offtake=0.05)
+            if i > 0:
+                network.add_segment((i - 1, j), node, 1020, 10)
+            if j > 0:
+                network.add_segment((i, j - 1), node, 1020, 10)
+    return network
+
+
+@benchmark('network.solve.cold', items=400)
+def network_solve_cold():
+    def run():
+        network = _mesh(20)
+        network.solve()
+    return run
+
+
+@benchmark('network.solve.colebrook', items=400)
+def network_solve_colebrook():
+    def run():
+        network = _mesh(20, lambda_coef=None)
+        network.solve()
+    return run
+
+
+@benchmark('network.solve.warm', items=400)
+def network_solve_warm():
+    network = _mesh(20)
+    network.solve()
+    offtakes = [0.05, 0.06]
+    state = {'step': 0}
+
+    def run():
+        state['step'] += 1
+        network.set_offtake((19, 19), offtakes[state['step'] % 2])
+        network.solve()
+    return run
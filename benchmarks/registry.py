@@ -0,0 +1,58 @@
+"""
+Реестр бенчмарков и измерение времени
+
+Бенчмарк — функция подготовки, которая возвращает измеряемый вызов
+без аргументов; время подготовки в замер не входит. Для пакетных
+бенчмарков items — число элементов, обрабатываемых за один вызов.
+"""
+
+import statistics
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+BENCHMARKS: List[Dict] = []
+
+
+def benchmark(name: str, items: int = 1):
+    """
+    Регистрация бенчмарка
+
+    Args:
+        name: Имя бенчмарка ('группа.метод.вид')
+        items: Число элементов за один вызов
+    """
+    def register(setup: Callable[[], Callable[[], object]]):
+        BENCHMARKS.append({'name': name, 'items': items, 'setup': setup})
+        return setup
+    return register
+
+
+def measure_series(func: Callable[[], object], repeat: int = 5,
+                   min_time: float = 0.2) -> Tuple[float, float]:
+    """
+    Время одного вызова по сериям замера, с
+
+    Число вызовов в серии подбирается так, чтобы серия длилась не менее
+    min_time.
+
+    Args:
+        func: Измеряемый вызов
+        repeat: Число серий
+        min_time: Минимальная длительность серии, с
+
+    Returns:
+        (минимум, медиана) по repeat сериям
+    """
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+
+    series = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return min(series), statistics.median(series)
+
+
+def measure(func: Callable[[], object], repeat: int = 5,
+            min_time: float = 0.2) -> float:
+    """Время одного вызова (минимум по сериям, см. measure_series), с"""
+    return measure_series(func, repeat, min_time)[0]
@@ -0,0 +1,127 @@
+"""
+Запуск бенчмарков и сравнение с сохраненным базовым уровнем
+
+Запуск из корня репозитория:
+    python -m benchmarks.run                 # замер и сравнение с baseline.json
+    python -m benchmarks.run -k batch        # только бенчмарки с 'batch' в имени
+    python -m benchmarks.run --save          # обновление baseline.json
+
+Регрессией считается замедление относительно baseline.json больше чем
+в --threshold раз и по минимуму, и по медиане серий, если при этом вызов
+замедлился больше чем на --noise-floor секунд (разброс вызовов короче
+микросекунды превышает порог и без изменений кода); при регрессиях код
+возврата 1. Базовый уровень зависит от машины — обновляйте его на той же
+машине, где выполняется сравнение.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime
+
+from . import bench_bot, bench_grs, bench_kc, bench_pipeline  # noqa: F401
+from .registry import BENCHMARKS, measure_series
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-6:
+        return f'{seconds * 1e9:.0f} нс'
+    if seconds < 1e-3:
+        return f'{seconds * 1e6:.2f} мкс'
+    if seconds < 1:
+        return f'{seconds * 1e3:.2f} мс'
+    return f'{seconds:.2f} с'
+
+
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('results', {})
+
+
+def save_baseline(path: str, results: dict):
+    merged = load_baseline(path)
+    merged.update(results)
+    data = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'machine': f'{platform.machine()} {platform.processor()}'.strip(),
+        'python': platform.python_version(),
+        'results': dict(sorted(merged.items()))
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def run(args) -> int:
+    baseline = load_baseline(args.baseline)
+    selected = [b for b in BENCHMARKS if not args.filter or args.filter in b['name']]
+
+    results = {}
+    regressions = []
+
+    print(f"{'Бенчмарк':<52} {'вызов':>12} {'элемент':>12} {'база':>12} {'×':>6}")
+    for bench in selected:
+        func = bench['setup']()
+        seconds, median = measure_series(func, repeat=args.repeat, min_time=args.min_time)
+        results[bench['name']] = {'time': seconds, 'median': median,
+                                  'items': bench['items']}
+
+        per_item = format_time(seconds / bench['items']) if bench['items'] > 1 else ''
+        line = f"{bench['name']:<52} {format_time(seconds):>12} {per_item:>12}"
+
+        reference = baseline.get(bench['name'])
+        if reference:
+            ratio = seconds / reference['time']
+            line += f" {format_time(reference['time']):>12} {ratio:>6.2f}"
+            # Медиана серий базового уровня есть не у старых записей
+            median_ratio = median / reference.get('median', reference['time'])
+            if ratio > args.threshold:
+                if (median_ratio > args.threshold
+                        and seconds - reference['time'] > args.noise_floor):
+                    line += '  ← регрессия'
+                    regressions.append((bench['name'], ratio))
+                else:
+                    line += '  (шум)'
+        print(line, flush=True)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        print(f'\nБазовый уровень сохранен: {args.baseline}')
+        return 0
+
+    if regressions:
+        print(f'\nРегрессии (замедление > {args.threshold}×):')
+        for name, ratio in regressions:
+            print(f'  {name}: {ratio:.2f}×')
+        return 1
+
+    return 0
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('-k', dest='filter', default='',
+                        help='Подстрока имени бенчмарка')
+    parser.add_argument('--save', action='store_true',
+                        help='Сохранить результаты как базовый уровень')
+    parser.add_argument('--baseline', default=BASELINE,
+                        help='Файл базового уровня')
+    parser.add_argument('--threshold', type=float, default=1.5,
+                        help='Допустимое замедление относительно базового уровня')
+    parser.add_argument('--noise-floor', type=float, default=1e-6,
+                        help='Замедление вызова, с, не считающееся регрессией')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='Число серий замера')
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='Минимальная длительность серии, с')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    sys.exit(run(parse_args()))
@@ -1,188 +1,684 @@
-import asyncio
-import logging
-from aiogram import Bot, Dispatcher, types, F
-from aiogram.filters import Command
-from aiogram.types import WebAppInfo, ReplyKeyboardMarkup, KeyboardButton
-from aiogram.utils.keyboard import InlineKeyboardBuilder
-
-from config import config
-
-# Настройка логирования
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
-# Инициализация бота
-bot = Bot(token=config.BOT_TOKEN)
-dp = Dispatcher()
-
-# ========== КОМАНДЫ БОТА ==========
-
-@dp.message(Command("start"))
-async def cmd_start(message: types.Message):
-    """Обработчик команды /start"""
-    welcome_text = """
-    🧮 *Конвертер величин*
-    
-    Выберите действие:
-    • /converter - Открыть конвертер
-    • /categories - Категории величин
-    • /help - Справка
-    • /history - История конвертаций
-    """
-    
-    keyboard = ReplyKeyboardMarkup(
-        keyboard=[
-            [KeyboardButton(text="📱 Открыть конвертер", web_app=WebAppInfo(url=config.WEB_APP_URL))],
-            [KeyboardButton(text="📊 Категории"), KeyboardButton(text="❓ Помощь")],
-            [KeyboardButton(text="📜 История"), KeyboardButton(text="⭐ Избранное")]
-        ],
-        resize_keyboard=True,
-        input_field_placeholder="Выберите действие..."
-    )
-    
-    await message.answer(welcome_text, parse_mode="Markdown", reply_markup=keyboard)
-
-@dp.message(Command("converter"))
-async def cmd_converter(message: types.Message):
-    """Открытие конвертера через inline-кнопку"""
-    builder = InlineKeyboardBuilder()
-    builder.button(
-        text="🚀 Открыть конвертер",
-        web_app=WebAppInfo(url=config.WEB_APP_URL)
-    )
-    
-    await message.answer(
-        "Нажмите кнопку ниже, чтобы открыть конвертер величин:",
-        reply_markup=builder.as_markup()
-    )
-
-@dp.message(Command("categories"))
-async def cmd_categories(message: types.Message):
-    """Список категорий конвертации"""
-    categories_text = """
-    📁 *Категории величин:*
-    
-    🔹 *Длина*
-    • Метры ↔ Километры
-    • Мили ↔ Футы
-    • Дюймы ↔ Сантиметры
-    
-    🔹 *Вес*
-    • Килограммы ↔ Фунты
-    • Граммы ↔ Унции
-    • Тонны ↔ Караты
-    
-    🔹 *Температура*
-    • Цельсий ↔ Фаренгейт
-    • Цельсий ↔ Кельвин
-    
-    🔹 *Скорость*
-    • км/ч ↔ м/с
-    • мили/ч ↔ узлы
-    
-    🔹 *Объём*
-    • Литр ↔ Галлон
-    • Куб. метр ↔ Куб. фут
-    
-    🔹 *Площадь*
-    • кв. метр ↔ гектар
-    • акр ↔ сотка
-    
-    🔹 *Время*
-    • Секунды ↔ Часы
-    • Дни ↔ Недели
-    """
-    
-    await message.answer(categories_text, parse_mode="Markdown")
-
-@dp.message(Command("help"))
-async def cmd_help(message: types.Message):
-    """Справка по использованию"""
-    help_text = """
-    ❓ *Как пользоваться конвертером:*
-    
-    1. Нажмите кнопку *"📱 Открыть конвертер"*
-    2. Выберите категорию величин
-    3. Выберите единицы измерения
-    4. Введите значение
-    5. Получите результат мгновенно!
-    
-    *Особенности:*
-    • История последних конвертаций
-    • Избранные конвертации
-    • Быстрый доступ к частым операциям
-    • Поддержка научных вычислений
-    
-    *Команды бота:*
-    /start - Главное меню
-    /converter - Открыть конвертер
-    /categories - Категории величин
-    /history - История конвертаций
-    /help - Эта справка
-    """
-    
-    await message.answer(help_text, parse_mode="Markdown")
-
-@dp.message(F.text == "📊 Категории")
-async def button_categories(message: types.Message):
-    await cmd_categories(message)
-
-@dp.message(F.text == "❓ Помощь")
-async def button_help(message: types.Message):
-    await cmd_help(message)
-
-# ========== WEB APP DATA HANDLER ==========
-
-@dp.message(F.web_app_data)
-async def handle_web_app_data(message: types.Message):
-    """Обработка данных из мини-приложения"""
-    try:
-        data = message.web_app_data.data
-        # data - строка JSON от веб-приложения
-        
-        import json
-        result = json.loads(data)
-        
-        response_text = f"""
-        📊 *Результат конвертации:*
-        
-        *Входные данные:*
-        {result.get('value', 0)} {result.get('fromUnit', '')}
-        
-        *Результат:*
-        {result.get('convertedValue', 0):.6f} {result.get('toUnit', '')}
-        
-        *Операция:*
-        {result.get('category', 'Общая')} → {result.get('type', 'Конвертация')}
-        """
-        
-        await message.answer(response_text, parse_mode="Markdown")
-        
-        # Можно сохранить в историю
-        logger.info(f"Конвертация: {result}")
-        
-    except Exception as e:
-        logger.error(f"Ошибка обработки web app data: {e}")
-        await message.answer("❌ Произошла ошибка при обработке данных")
-
-# ========== ОБРАБОТЧИК ТЕКСТОВЫХ СООБЩЕНИЙ ==========
-
-@dp.message()
-async def handle_other_messages(message: types.Message):
-    """Обработчик прочих сообщений"""
-    if message.text == "📜 История":
-        await message.answer("🔄 История загружается...")
-        # Здесь можно реализовать загрузку истории
-    elif message.text == "⭐ Избранное":
-        await message.answer("⭐ Избранные конвертации:\n\n1. км → мили\n2. кг → фунты")
-    else:
-        await message.answer("Используйте кнопки меню или команды")
-
-# ========== ЗАПУСК БОТА ==========
-
-async def main():
-    logger.info("Бот запущен")
-    await dp.start_polling(bot)
-
-if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import re
+import signal
+import tempfile
+import time
+from datetime import datetime
+from aiohttp import web
+from aiogram import Bot, Dispatcher, types, F
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.filters import Command
+from aiogram.types import (WebAppInfo, ReplyKeyboardMarkup, KeyboardButton, FSInputFile,
+                           InlineQueryResultArticle, InputTextMessageContent)
+from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+
+from config import config
+from modules.bulk import process_csv
+from modules.cache import TTLCache, memoize_class
+from modules import metrics
+from modules.api import CalculationAPI, start_api_server
+from modules.grs_calculations import GRSBatch, GRSCalculator
+from modules.history import HistoryStore
+from modules.jobs import JobCancelled, JobManager
+from modules.kc_calculations import KCBatch, KCCalculator
+from modules.pipeline_calculations import PipelineBatch, PipelineCalculator
+from modules.telemetry import DERIVED, TelemetryProcessor, format_alert, source_from_url
+from modules.unit_converter import UnitConverter, converter
+
+# Настройка логирования
+logging.basicConfig(level=config.LOG_LEVEL)
+logger = logging.getLogger(__name__)
+
+# Инициализация бота
+def create_bot() -> Bot:
+    """Создание бота (с локальным Bot API, если задан TELEGRAM_API_URL)"""
+    session = None
+    if config.TELEGRAM_API_URL:
+        session = AiohttpSession(api=TelegramAPIServer.from_base(config.TELEGRAM_API_URL))
+    return Bot(token=config.BOT_TOKEN, session=session)
+
+bot = create_bot()
+dp = Dispatcher()
+
+# Кэш результатов калькуляторов (до метрик: длительность учитывает и попадания)
+if config.CALC_CACHE_SIZE > 0:
+    for calculator in (PipelineCalculator, GRSCalculator, KCCalculator):
+        memoize_class(calculator, config.CALC_CACHE_SIZE, config.CALC_CACHE_DIGITS)
+
+# Метрики: без METRICS_ENABLED middleware и обертки методов не подключаются
+if config.METRICS_ENABLED:
+    metrics.registry.enabled = True
+    metrics.setup_dispatcher(dp)
+    for calculator in (PipelineCalculator, PipelineBatch, GRSCalculator, GRSBatch,
+                       KCCalculator, KCBatch, UnitConverter):
+        metrics.instrument(calculator)
+
+async def start_metrics(port: int):
+    if config.METRICS_ENABLED:
+        await metrics.start_metrics_server(config.METRICS_HOST, port)
+        logger.info("Метрики: http://%s:%d/metrics", config.METRICS_HOST, port)
+
+# JSON API калькуляторов для WebApp
+api = CalculationAPI(cors_origin=config.API_CORS_ORIGIN, max_batch=config.API_MAX_BATCH,
+                     bot_token=config.BOT_TOKEN if config.API_AUTH else '')
+
+# История конвертаций
+history_store = HistoryStore(config.HISTORY_DB,
+                             flush_interval=config.HISTORY_FLUSH_MS / 1000)
+
+# Очередь тяжелых расчетов (пул процессов, вне цикла событий)
+def create_jobs(processes: int = 1) -> JobManager:
+    """
+    Очередь расчетов процесса бота
+
+    У каждого webhook-воркера своя очередь: процессы пула (JOB_WORKERS или
+    число ядер) делятся между воркерами, не меньше одного на воркер
+    """
+    workers = config.JOB_WORKERS or os.cpu_count() or 1
+    return JobManager(workers=max(1, workers // processes),
+                      max_per_user=config.JOB_MAX_PER_USER,
+                      queue_size=config.JOB_QUEUE_SIZE)
+
+jobs = create_jobs()
+
+@dp.startup()
+async def on_startup():
+    history_store.start()
+    jobs.start()
+
+@dp.shutdown()
+async def on_shutdown():
+    await jobs.close()
+    # Запись накопленной истории без блокировки цикла событий
+    await asyncio.get_running_loop().run_in_executor(None, history_store.close)
+
+# Спецсимволы Markdown (parse_mode="Markdown") в пользовательских строках
+MARKDOWN_SPECIAL = re.compile(r'([_*`\[])')
+
+def escape_markdown(text) -> str:
+    """Экранирование спецсимволов Markdown в тексте вне разметки"""
+    return MARKDOWN_SPECIAL.sub(r'\\\1', str(text))
+
+def bold_markdown(text) -> str:
+    """Жирный текст Markdown: спецсимволы экранируются вне разметки (*GRS*\\_*12*)"""
+    return ''.join('\\' + part if MARKDOWN_SPECIAL.fullmatch(part) else f'*{part}*'
+                   for part in MARKDOWN_SPECIAL.split(str(text)) if part)
+
+# ========== КОМАНДЫ БОТА ==========
+
+@dp.message(Command("start"))
+async def cmd_start(message: types.Message):
+    """Обработчик команды /start"""
+    welcome_text = """
+    🧮 *Конвертер величин*
+    
+    Выберите действие:
+    • /converter - Открыть конвертер
+    • /categories - Категории величин
+    • /help - Справка
+    • /history - История конвертаций
+    """
+    
+    keyboard = ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text="📱 Открыть конвертер", web_app=WebAppInfo(url=config.WEB_APP_URL))],
+            [KeyboardButton(text="📊 Категории"), KeyboardButton(text="❓ Помощь")],
+            [KeyboardButton(text="📜 История"), KeyboardButton(text="⭐ Избранное")]
+        ],
+        resize_keyboard=True,
+        input_field_placeholder="Выберите действие..."
+    )
+    
+    await message.answer(welcome_text, parse_mode="Markdown", reply_markup=keyboard)
+
+@dp.message(Command("converter"))
+async def cmd_converter(message: types.Message):
+    """Открытие конвертера через inline-кнопку"""
+    builder = InlineKeyboardBuilder()
+    builder.button(
+        text="🚀 Открыть конвертер",
+        web_app=WebAppInfo(url=config.WEB_APP_URL)
+    )
+    
+    await message.answer(
+        "Нажмите кнопку ниже, чтобы открыть конвертер величин:",
+        reply_markup=builder.as_markup()
+    )
+
+@dp.message(Command("categories"))
+async def cmd_categories(message: types.Message):
+    """Список категорий конвертации"""
+    categories_text = """
+    📁 *Категории величин:*
+    
+    🔹 *Длина*
+    • Метры ↔ Километры
+    • Мили ↔ Футы
+    • Дюймы ↔ Сантиметры
+    
+    🔹 *Вес*
+    • Килограммы ↔ Фунты
+    • Граммы ↔ Унции
+    • Тонны ↔ Караты
+    
+    🔹 *Температура*
+    • Цельсий ↔ Фаренгейт
+    • Цельсий ↔ Кельвин
+    
+    🔹 *Скорость*
+    • км/ч ↔ м/с
+    • мили/ч ↔ узлы
+    
+    🔹 *Объём*
+    • Литр ↔ Галлон
+    • Куб. метр ↔ Куб. фут
+    
+    🔹 *Площадь*
+    • кв. метр ↔ гектар
+    • акр ↔ сотка
+    
+    🔹 *Время*
+    • Секунды ↔ Часы
+    • Дни ↔ Недели
+    """
+    
+    await message.answer(categories_text, parse_mode="Markdown")
+
+@dp.message(Command("help"))
+async def cmd_help(message: types.Message):
+    """Справка по использованию"""
+    help_text = """
+    ❓ *Как пользоваться конвертером:*
+    
+    1. Нажмите кнопку *"📱 Открыть конвертер"*
+    2. Выберите категорию величин
+    3. Выберите единицы измерения
+    4. Введите значение
+    5. Получите результат мгновенно!
+    
+    *Особенности:*
+    • История последних конвертаций
+    • Избранные конвертации
+    • Быстрый доступ к частым операциям
+    • Поддержка научных вычислений
+    • Конвертация текстом: `150 km в мили`
+    • Пакетный расчет: отправьте CSV-файл
+    
+    *Команды бота:*
+    /start - Главное меню
+    /converter - Открыть конвертер
+    /categories - Категории величин
+    /history - История конвертаций
+    /telemetry - Последние данные телеметрии
+    /jobs - Мои расчеты
+    /cancel - Отменить расчет
+    /help - Эта справка
+    """
+    
+    await message.answer(help_text, parse_mode="Markdown")
+
+@dp.message(Command("history"))
+async def cmd_history(message: types.Message):
+    """История конвертаций пользователя"""
+    await send_history_page(message, message.from_user.id)
+
+@dp.callback_query(F.data.startswith("history:"))
+async def history_next_page(callback: types.CallbackQuery):
+    """Следующая страница истории"""
+    _, timestamp, record_id = callback.data.split(":")
+    await send_history_page(callback.message, callback.from_user.id,
+                            before=(float(timestamp), int(record_id)))
+    await callback.answer()
+
+async def send_history_page(message: types.Message, user_id: int, before=None):
+    records, cursor = await history_store.get_page(
+        user_id, limit=config.HISTORY_PAGE_SIZE, before=before
+    )
+
+    if not records:
+        await message.answer("📜 История пуста" if before is None else "📜 Больше записей нет")
+        return
+
+    lines = ["📜 *История конвертаций:*", ""]
+    for record in records:
+        date = datetime.fromtimestamp(record["timestamp"]).strftime("%d.%m %H:%M")
+        lines.append(
+            f"{date}  {record['value'] or 0:g} {escape_markdown(record['from_unit'] or '')} → "
+            f"{record['result'] or 0:.6g} {escape_markdown(record['to_unit'] or '')}"
+        )
+
+    reply_markup = None
+    if cursor is not None:
+        builder = InlineKeyboardBuilder()
+        builder.button(text="Далее ▶️", callback_data=f"history:{cursor[0]!r}:{cursor[1]}")
+        reply_markup = builder.as_markup()
+
+    await message.answer("\n".join(lines), parse_mode="Markdown",
+                         reply_markup=reply_markup)
+
+@dp.message(F.text == "📊 Категории")
+async def button_categories(message: types.Message):
+    await cmd_categories(message)
+
+@dp.message(F.text == "❓ Помощь")
+async def button_help(message: types.Message):
+    await cmd_help(message)
+
+@dp.message(F.text == "📜 История")
+async def button_history(message: types.Message):
+    await cmd_history(message)
+
+# ========== WEB APP DATA HANDLER ==========
+
+@dp.message(F.web_app_data)
+async def handle_web_app_data(message: types.Message):
+    """Обработка данных из мини-приложения"""
+    try:
+        data = message.web_app_data.data
+        # data - строка JSON от веб-приложения
+        
+        result = json.loads(data)
+        
+        response_text = f"""
+        📊 *Результат конвертации:*
+        
+        *Входные данные:*
+        {escape_markdown(result.get('value', 0))} {escape_markdown(result.get('fromUnit', ''))}
+        
+        *Результат:*
+        {result.get('convertedValue', 0):.6f} {escape_markdown(result.get('toUnit', ''))}
+        
+        *Операция:*
+        {escape_markdown(result.get('category', 'Общая'))} → {escape_markdown(result.get('type', 'Конвертация'))}
+        """
+        
+        await message.answer(response_text, parse_mode="Markdown")
+        
+        # Сохранение в историю (запись в фоне, пакетами)
+        history_store.add(message.from_user.id, result)
+        logger.info("Конвертация: %s", result)
+        
+    except Exception as e:
+        logger.error("Ошибка обработки web app data: %s", e)
+        await message.answer("❌ Произошла ошибка при обработке данных")
+
+# ========== INLINE-РЕЖИМ ==========
+
+# Готовые ответы на частые запросы (результат детерминирован запросом)
+inline_cache = TTLCache(maxsize=config.INLINE_CACHE_SIZE, ttl=config.INLINE_CACHE_TTL)
+
+INLINE_MAX_RESULTS = 20
+
+def inline_results(query: str) -> list:
+    """
+    Результаты inline-запроса "3.5 atm to MPa" или "3.5 atm"
+
+    Первым идет запрошенная единица, далее остальные единицы категории:
+    выше те, в которых значение ближе к 1 (удобнее читать).
+    """
+    parsed = converter.parse(query)
+    if parsed is not None:
+        value, from_unit, to_unit = parsed
+    else:
+        parsed = converter.parse_value(query)
+        if parsed is None:
+            return []
+        value, from_unit = parsed
+        to_unit = None
+
+    try:
+        conversions = converter.convert_all(value, from_unit)
+    except ValueError:
+        return []
+    if to_unit is not None:
+        if converter.category(to_unit) != converter.category(from_unit):
+            return []
+        requested = [item for item in conversions if item[0] == to_unit]
+        conversions = [item for item in conversions if item[0] != to_unit]
+    else:
+        requested = []
+
+    conversions.sort(key=lambda item: abs(math.log10(abs(item[1]))) if item[1] else 0.0)
+
+    results = []
+    for code, converted in (requested + conversions)[:INLINE_MAX_RESULTS]:
+        text = (f"{value:g} {converter.name(from_unit)} = "
+                f"{converted:.6g} {converter.name(code)}")
+        results.append(InlineQueryResultArticle(
+            id=f"{from_unit}:{code}:{value!r}",
+            title=f"{converted:.6g} {converter.name(code)}",
+            description=text,
+            input_message_content=InputTextMessageContent(message_text=text)
+        ))
+    return results
+
+@dp.inline_query()
+async def handle_inline_query(inline_query: types.InlineQuery):
+    """Конвертация в любом чате: @bot 3.5 atm to MPa"""
+    query = " ".join(inline_query.query.lower().split())
+
+    results = inline_cache.get(query)
+    if results is None:
+        results = inline_results(query)
+        inline_cache.set(query, results)
+
+    # Ответ не зависит от пользователя — Telegram может кэшировать его
+    # для всех; непустые результаты кэшируются надолго
+    await inline_query.answer(
+        results,
+        cache_time=config.INLINE_CACHE_TIME if results else 60,
+        is_personal=False
+    )
+
+# ========== ПАКЕТНЫЙ РАСЧЕТ ПО CSV ==========
+
+BULK_CALCULATORS = {'pipeline': 'участки газопровода', 'grs': 'ГРС', 'kc': 'КС'}
+
+@dp.message(F.document)
+async def handle_document(message: types.Message):
+    """Потоковый расчет загруженного CSV-файла"""
+    document = message.document
+    if not (document.file_name or "").lower().endswith(".csv"):
+        await message.answer("📎 Пришлите таблицу в формате CSV "
+                             "(Excel: «Сохранить как» → CSV)")
+        return
+
+    status = await message.answer("⏳ Файл получен, начинаю расчет...")
+    last_update = 0.0
+
+    def report(rows: int, fraction: float):
+        # Прогресс из процесса расчета; правка сообщения не чаще раза в 2 с
+        nonlocal last_update
+        now = time.monotonic()
+        if now - last_update < 2.0:
+            return
+        last_update = now
+        asyncio.ensure_future(
+            status.edit_text(f"⏳ Обработано строк: {rows} ({fraction:.0%})")
+        )
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "input.csv")
+        name = os.path.splitext(document.file_name)[0]
+        destination = os.path.join(directory, f"{name}_result.csv")
+
+        await bot.download(document, destination=source)
+        try:
+            job = jobs.submit(message.from_user.id, process_csv, source, destination,
+                              chunk_rows=config.BULK_CHUNK_ROWS, progress=report,
+                              name=document.file_name)
+        except ValueError as e:
+            await status.edit_text(f"❌ {e}")
+            return
+        await status.edit_text(f"⏳ Расчет #{job.id} в очереди (отмена: /cancel {job.id})")
+
+        try:
+            summary = await job.wait()
+        except JobCancelled:
+            await status.edit_text(f"🚫 Расчет #{job.id} отменен")
+            return
+        except (ValueError, UnicodeDecodeError) as e:
+            await status.edit_text(f"❌ {e}")
+            return
+
+        lines = [f"✅ Расчет: {BULK_CALCULATORS[summary['calculator']]}, "
+                 f"строк: {summary['rows']}"]
+        if 'total' in summary['totals']:
+            lines.append(f"Итого: {summary['totals']['total']:.6g} м³")
+        if summary['invalid_cells']:
+            lines.append(f"⚠️ Нечисловых ячеек: {summary['invalid_cells']} "
+                         f"(строки не рассчитаны)")
+            lines.extend(f"строка {row}, {column}: «{value}»"
+                         for row, column, value in summary['invalid'][:5])
+        await status.edit_text("\n".join(lines))
+        await message.answer_document(FSInputFile(destination))
+
+# ========== ОЧЕРЕДЬ РАСЧЕТОВ ==========
+
+JOB_STATUSES = {
+    'queued': '⏳ в очереди',
+    'running': '⚙️ выполняется',
+    'done': '✅ готово',
+    'failed': '❌ ошибка',
+    'cancelled': '🚫 отменено'
+}
+
+@dp.message(Command("jobs"))
+async def cmd_jobs(message: types.Message):
+    """Активные и последние расчеты пользователя"""
+    user_jobs = jobs.user_jobs(message.from_user.id)
+    if not user_jobs:
+        await message.answer("Расчетов нет. Отправьте CSV-файл для пакетного расчета")
+        return
+
+    lines = ["🗂 Расчеты:"]
+    for job in user_jobs:
+        line = f"#{job.id} {job.name} — {JOB_STATUSES[job.status]}"
+        if job.duration is not None:
+            line += f" ({job.duration:.0f} с)"
+        lines.append(line)
+    await message.answer("\n".join(lines))
+
+@dp.message(Command("cancel"))
+async def cmd_cancel(message: types.Message):
+    """Отмена расчета: /cancel N или /cancel — все активные"""
+    user_id = message.from_user.id
+    argument = (message.text or "").partition(" ")[2].strip().lstrip("#")
+    if argument:
+        if not argument.isdigit():
+            await message.answer("Укажите номер расчета: /cancel 12")
+            return
+        ids = [int(argument)]
+    else:
+        ids = [job.id for job in jobs.user_jobs(user_id) if job.active]
+
+    cancelled = [job_id for job_id in ids if jobs.cancel(job_id, user_id)]
+    if cancelled:
+        await message.answer("🚫 Отменяется: " + ", ".join(f"#{i}" for i in cancelled))
+    else:
+        await message.answer("Нет активных расчетов для отмены")
+
+# ========== ТЕЛЕМЕТРИЯ ==========
+
+telemetry = None
+telemetry_task = None
+TELEMETRY_MAX_STATIONS = 20
+
+async def send_telemetry_alert(alert: dict):
+    if config.TELEMETRY_CHAT_ID:
+        await bot.send_message(config.TELEMETRY_CHAT_ID, format_alert(alert))
+
+def telemetry_done(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Обработка телеметрии остановлена", exc_info=task.exception())
+
+def start_telemetry():
+    """Запуск обработки телеметрии, если задан TELEMETRY_SOURCE"""
+    global telemetry, telemetry_task
+    if not config.TELEMETRY_SOURCE:
+        return
+    stations = None
+    if config.TELEMETRY_STATIONS:
+        with open(config.TELEMETRY_STATIONS, encoding="utf-8") as f:
+            stations = json.load(f)
+    telemetry = TelemetryProcessor(source_from_url(config.TELEMETRY_SOURCE),
+                                   window=config.TELEMETRY_WINDOW,
+                                   stations=stations,
+                                   on_alert=send_telemetry_alert)
+    telemetry_task = asyncio.create_task(telemetry.run())
+    telemetry_task.add_done_callback(telemetry_done)
+    logger.info("Телеметрия: %s", config.TELEMETRY_SOURCE)
+
+@dp.message(Command("telemetry"))
+async def cmd_telemetry(message: types.Message):
+    """Последние рассчитанные значения по станциям"""
+    if telemetry is None or not telemetry.latest:
+        await message.answer("📡 Данных телеметрии нет")
+        return
+
+    lines = ["📡 *Телеметрия:*"]
+    for station in sorted(telemetry.latest)[:TELEMETRY_MAX_STATIONS]:
+        values = telemetry.latest[station]
+        updated = datetime.fromtimestamp(values["timestamp"]).strftime("%H:%M:%S")
+        lines.append(f"\n{bold_markdown(station)} ({updated})")
+        for name, (title, unit) in DERIVED.items():
+            if not math.isnan(values[name]):
+                lines.append(f"• {title}: {values[name]:.4g} {unit}")
+    if len(telemetry.latest) > TELEMETRY_MAX_STATIONS:
+        lines.append(f"\n…и еще {len(telemetry.latest) - TELEMETRY_MAX_STATIONS}")
+    await message.answer("\n".join(lines), parse_mode="Markdown")
+
+# ========== ОБРАБОТЧИК ТЕКСТОВЫХ СООБЩЕНИЙ ==========
+
+@dp.message()
+async def handle_other_messages(message: types.Message):
+    """Обработчик прочих сообщений"""
+    if message.text == "⭐ Избранное":
+        await message.answer("⭐ Избранные конвертации:\n\n1. км → мили\n2. кг → фунты")
+        return
+
+    # Текстовый запрос конвертации: "150 km в мили"
+    query = converter.parse(message.text or "")
+    if query is None:
+        await message.answer("Используйте кнопки меню или команды")
+        return
+
+    value, from_unit, to_unit = query
+    try:
+        converted = converter.convert(value, from_unit, to_unit)
+    except ValueError as e:
+        await message.answer(f"❌ {e}")
+        return
+
+    await message.answer(
+        f"{value:g} {converter.name(from_unit)} = "
+        f"{converted:.6g} {converter.name(to_unit)}"
+    )
+    history_store.add(message.from_user.id, {
+        "category": converter.category(from_unit),
+        "value": value,
+        "fromUnit": from_unit,
+        "convertedValue": converted,
+        "toUnit": to_unit
+    })
+
+# ========== ЗАПУСК БОТА ==========
+
+async def main():
+    await start_metrics(config.METRICS_PORT)
+    if config.API_ENABLED:
+        await start_api_server(api, config.API_HOST, config.API_PORT)
+        logger.info("API калькуляторов: http://%s:%d/api/calculate",
+                    config.API_HOST, config.API_PORT)
+    start_telemetry()
+    logger.info("Бот запущен")
+    await dp.start_polling(bot)
+
+async def run_webhook_worker(worker_id: int, reuse_port: bool, processes: int = 1):
+    """Один процесс webhook-сервера; останавливается по SIGTERM/SIGINT"""
+    global jobs
+    if processes > 1:
+        jobs = create_jobs(processes)
+
+    app = web.Application()
+    SimpleRequestHandler(
+        dispatcher=dp,
+        bot=bot,
+        secret_token=config.WEBHOOK_SECRET or None
+    ).register(app, path=config.WEBHOOK_PATH)
+    setup_application(app, dp, bot=bot)
+    if config.API_ENABLED:
+        api.setup(app)
+    await start_metrics(config.METRICS_PORT + worker_id)
+    if worker_id == 0:
+        # Источник телеметрии читает один процесс; последние значения
+        # хранятся в его памяти, и /telemetry в других процессах их не видит
+        start_telemetry()
+
+    runner = web.AppRunner(app, shutdown_timeout=config.SHUTDOWN_TIMEOUT)
+    await runner.setup()
+    site = web.TCPSite(runner, config.WEBHOOK_HOST, config.WEBHOOK_PORT,
+                       reuse_port=reuse_port)
+    await site.start()
+    logger.info("Webhook-воркер %d слушает %s:%d%s", worker_id,
+                config.WEBHOOK_HOST, config.WEBHOOK_PORT, config.WEBHOOK_PATH)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    # Плавная остановка: прекращаем прием, дожидаемся текущих обработчиков
+    logger.info("Webhook-воркер %d останавливается", worker_id)
+    await runner.cleanup()
+
+def webhook_worker_process(worker_id: int, reuse_port: bool, processes: int = 1):
+    """Точка входа дочернего процесса"""
+    asyncio.run(run_webhook_worker(worker_id, reuse_port, processes))
+
+async def register_webhook():
+    """Регистрация webhook в Telegram (один раз, из главного процесса)"""
+    if not config.WEBHOOK_URL:
+        logger.info("WEBHOOK_URL не задан, регистрация webhook пропущена")
+        return
+    await bot.set_webhook(
+        url=config.WEBHOOK_URL.rstrip("/") + config.WEBHOOK_PATH,
+        secret_token=config.WEBHOOK_SECRET or None,
+        drop_pending_updates=False
+    )
+    await bot.session.close()
+
+def run_webhook(workers: int):
+    """Запуск webhook-сервера в одном или нескольких процессах"""
+    asyncio.run(register_webhook())
+
+    if workers <= 1:
+        webhook_worker_process(0, reuse_port=False)
+        return
+
+    # Несколько процессов слушают один порт (SO_REUSEPORT),
+    # ядро распределяет соединения между ними
+    processes = [
+        multiprocessing.Process(target=webhook_worker_process, args=(i, True, workers))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def forward(signum, frame):
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, forward)
+    signal.signal(signal.SIGINT, forward)
+
+    for process in processes:
+        process.join()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Telegram-бот конвертера величин")
+    parser.add_argument("--webhook", action="store_true",
+                        help="Режим webhook вместо long polling")
+    parser.add_argument("--workers", type=int, default=config.WEBHOOK_WORKERS,
+                        help="Число процессов webhook-сервера")
+    parser.add_argument("--port", type=int, default=config.WEBHOOK_PORT,
+                        help="Порт webhook-сервера")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.webhook:
+        config.WEBHOOK_PORT = args.port
+        run_webhook(args.workers)
+    else:
+        asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Конфигурация бота (значения берутся из переменных окружения или .env)
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Config:
+    """Настройки бота"""
+
+    BOT_TOKEN = os.getenv("BOT_TOKEN", "")
+    WEB_APP_URL = os.getenv("WEB_APP_URL", "")
+
+    # Адрес Bot API (пусто — api.telegram.org; для нагрузочных тестов —
+    # локальная заглушка, см. tools/loadgen.py)
+    TELEGRAM_API_URL = os.getenv("TELEGRAM_API_URL", "")
+
+    # Режим webhook
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+    WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+    WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8080"))
+    WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "1"))
+    SHUTDOWN_TIMEOUT = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+
+    # История конвертаций
+    HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+    HISTORY_FLUSH_MS = int(os.getenv("HISTORY_FLUSH_MS", "50"))
+    HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", "10"))
+
+    # Inline-режим: кэш ответов в боте и время кэширования на стороне Telegram
+    INLINE_CACHE_SIZE = int(os.getenv("INLINE_CACHE_SIZE", "10000"))
+    INLINE_CACHE_TTL = float(os.getenv("INLINE_CACHE_TTL", "3600"))
+    INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "86400"))
+
+    # Пакетный расчет CSV: строк в одном блоке
+    BULK_CHUNK_ROWS = int(os.getenv("BULK_CHUNK_ROWS", "50000"))
+
+    # Очередь тяжелых расчетов: процессов пула (0 — по числу ядер; в режиме
+    # webhook — на все воркеры), активных заданий на пользователя и размер
+    # очереди (у каждого webhook-воркера свои)
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "0"))
+    JOB_MAX_PER_USER = int(os.getenv("JOB_MAX_PER_USER", "2"))
+    JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+
+    # JSON API калькуляторов для WebApp (/api/calculate): в режиме webhook —
+    # на порту webhook-сервера, в режиме polling — отдельный сервер API_PORT.
+    # API_CORS_ORIGIN — адрес WebApp (например, https://user.github.io),
+    # API_AUTH — проверка подписи initData Telegram
+    API_ENABLED = os.getenv("API_ENABLED", "").lower() in ("1", "true", "yes")
+    API_HOST = os.getenv("API_HOST", "0.0.0.0")
+    API_PORT = int(os.getenv("API_PORT", "8090"))
+    API_CORS_ORIGIN = os.getenv("API_CORS_ORIGIN", "*")
+    API_MAX_BATCH = int(os.getenv("API_MAX_BATCH", "1000"))
+    API_AUTH = os.getenv("API_AUTH", "1").lower() in ("1", "true", "yes")
+
+    # Кэш результатов скалярных методов калькуляторов: записей на метод
+    # (0 — выключен) и число значащих цифр для округления аргументов (пусто — без)
+    CALC_CACHE_SIZE = int(os.getenv("CALC_CACHE_SIZE", "0"))
+    CALC_CACHE_DIGITS = int(os.getenv("CALC_CACHE_DIGITS") or 0) or None
+
+    # Журнал и метрики Prometheus (/metrics; у webhook-воркера N — порт METRICS_PORT + N)
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9100"))
+
+    # Телеметрия SCADA: источник ('file:/путь', 'unix:/путь', 'tcp:host:port'),
+    # окно пакета, параметры станций (JSON-файл) и чат для тревог
+    TELEMETRY_SOURCE = os.getenv("TELEMETRY_SOURCE", "")
+    TELEMETRY_WINDOW = float(os.getenv("TELEMETRY_WINDOW", "1.0"))
+    TELEMETRY_STATIONS = os.getenv("TELEMETRY_STATIONS", "")
+    TELEMETRY_CHAT_ID = int(os.getenv("TELEMETRY_CHAT_ID", "0"))
+
+
+config = Config()
@@ -0,0 +1,403 @@
+"""
+HTTP JSON API калькуляторов для WebApp
+
+    POST /api/calculate — расчет одного или пакета вычислений
+    GET  /api/methods   — доступные калькуляторы, методы и их параметры
+
+Запрос — одно вычисление или пакет (все вычисления за один HTTP-запрос):
+
+    {"calculator": "pipeline", "method": "pipeline_volume",
+     "params": {"diameter": 1000, "length": 10}}
+
+    {"composition": {"methane": 0.95, "ethane": 0.05},
+     "calculations": [
+        {"id": "v", "calculator": "pipeline", "method": "pipeline_volume",
+         "params": {"diameter": 1000, "length": 10}},
+        {"id": "s", "calculator": "kc", "method": "gpa_startup",
+         "params": {"pipeline_volume": 10, "pressure": 2, "temperature": 288}}
+     ]}
+
+Ответ — {"result": ...} или {"error": "..."} на каждое вычисление (с тем
+же id); ошибка одного вычисления не прерывает пакет. Состав газа задается
+для пакета или вычисления; калькуляторы кэшируются по нормализованному
+составу, поэтому таблицы z и свойства газа строятся один раз.
+
+Калькулятор для нового состава строится десятки миллисекунд (таблица z),
+поэтому такие запросы, как и большие пакеты, считаются в пуле потоков, не
+задерживая цикл событий (в режиме webhook — обработку обновлений бота);
+число разных составов в запросе ограничено MAX_COMPOSITIONS.
+
+Соединения keep-alive (aiohttp), ответы больше COMPRESS_MIN_SIZE сжимаются
+gzip/deflate по Accept-Encoding. При заданном токене бота запросы
+проверяются по подписи initData Telegram WebApp (заголовок
+X-Telegram-Init-Data).
+"""
+
+import asyncio
+import hashlib
+import hmac
+import inspect
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl
+
+import numpy as np
+from aiohttp import web
+
+from .gas_properties import CompositionKey, normalize_composition
+from .grs_calculations import GRSCalculator
+from .kc_calculations import KCCalculator
+from .pipeline_calculations import PipelineCalculator
+
+logger = logging.getLogger(__name__)
+
+CALCULATORS = {
+    'pipeline': PipelineCalculator,
+    'grs': GRSCalculator,
+    'kc': KCCalculator,
+}
+
+# Публичные методы калькуляторов: {калькулятор: {метод: [параметры]}}
+METHODS = {
+    kind: {
+        name: [parameter for parameter in inspect.signature(method).parameters
+               if parameter != 'self']
+        for name, method in vars(cls).items()
+        if not name.startswith('_') and inspect.isfunction(method)
+    }
+    for kind, cls in CALCULATORS.items()
+}
+
+# Ограничения параметров, от которых линейно зависит время расчета
+PARAMETER_LIMITS = {'n_steps': 10000}
+
+# Пакеты больше INLINE_BATCH считаются в потоке, а не в цикле событий
+INLINE_BATCH = 32
+
+# Наибольшее число разных составов газа в одном запросе
+MAX_COMPOSITIONS = 4
+
+# Калькуляторов в кэше (по виду и составу газа)
+CALCULATOR_CACHE_SIZE = 64
+
+# Ответы меньше этого размера, байт, не сжимаются (задержка важнее)
+COMPRESS_MIN_SIZE = 1024
+
+# Время жизни ответа на CORS preflight, с
+CORS_MAX_AGE = 86400
+
+
+class APIError(Exception):
+    """Ошибка запроса целиком (HTTP 4xx)"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+# ========== РАСЧЕТ ==========
+
+_calculators: 'OrderedDict[Tuple[str, Optional[CompositionKey]], Any]' = OrderedDict()
+_calculators_lock = threading.Lock()
+
+
+def _calculator(kind: str, composition: Optional[CompositionKey]):
+    key = (kind, composition)
+    with _calculators_lock:
+        calculator = _calculators.get(key)
+        if calculator is not None:
+            _calculators.move_to_end(key)
+            return calculator
+
+    # Построение вне блокировки: вызывается и из потоков пула
+    calculator = CALCULATORS[kind](dict(composition) if composition else None)
+    with _calculators_lock:
+        _calculators[key] = calculator
+        while len(_calculators) > CALCULATOR_CACHE_SIZE:
+            _calculators.popitem(last=False)
+    return calculator
+
+
+def _composition_key(composition) -> Optional[CompositionKey]:
+    if composition is not None and not isinstance(composition, dict):
+        raise ValueError("Состав газа задается объектом {компонент: доля}")
+    return normalize_composition(composition) if composition else None
+
+
+def uncached(items: List[Any], composition: Optional[Dict[str, float]] = None
+             ) -> Set[Tuple[str, Optional[CompositionKey]]]:
+    """
+    Калькуляторы пакета, которых еще нет в кэше
+
+    Args:
+        items: Вычисления
+        composition: Состав газа пакета
+
+    Returns:
+        Множество (калькулятор, ключ состава); ошибочные вычисления
+        пропускаются — их ошибки возвращаются при расчете
+
+    Raises:
+        APIError: в запросе больше MAX_COMPOSITIONS разных составов
+    """
+    keys = set()
+    for item in items:
+        if not isinstance(item, dict) or item.get('calculator') not in CALCULATORS:
+            continue
+        try:
+            keys.add((item['calculator'],
+                      _composition_key(item.get('composition', composition))))
+        except (ValueError, TypeError):
+            continue
+
+    if len({key for _, key in keys}) > MAX_COMPOSITIONS:
+        raise APIError(f"В запросе больше {MAX_COMPOSITIONS} составов газа")
+    with _calculators_lock:
+        return {key for key in keys if key not in _calculators}
+
+
+def get_calculator(kind: str, composition: Optional[Dict[str, float]] = None):
+    """
+    Калькулятор для состава газа (общий для запросов с тем же составом)
+
+    Args:
+        kind: 'pipeline', 'grs' или 'kc'
+        composition: Состав газа {компонент: доля}
+
+    Returns:
+        Экземпляр калькулятора
+    """
+    if kind not in CALCULATORS:
+        raise ValueError(f"Неизвестный калькулятор: {kind}")
+    return _calculator(kind, _composition_key(composition))
+
+
+def to_json(value: Any) -> Any:
+    """
+    Приведение результата к типам JSON
+
+    NaN и бесконечности заменяются на None (JSON.parse их не принимает),
+    типы NumPy — на числа и списки Python.
+    """
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return to_json(value.tolist())
+    if isinstance(value, np.generic):
+        return to_json(value.item())
+    return value
+
+
+def calculate(item: Dict[str, Any],
+              composition: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+    """
+    Одно вычисление
+
+    Args:
+        item: {'calculator', 'method', 'params', 'composition', 'id'}
+        composition: Состав газа пакета (если в вычислении не задан свой)
+
+    Returns:
+        {'result': значение} или {'error': сообщение}; 'id' — как в запросе
+    """
+    response: Dict[str, Any] = {}
+    try:
+        if not isinstance(item, dict):
+            raise ValueError("Вычисление задается объектом")
+        if 'id' in item:
+            response['id'] = item['id']
+
+        kind = item.get('calculator')
+        method = item.get('method')
+        params = item.get('params', {})
+        if method not in METHODS.get(kind, {}):
+            raise ValueError(f"Неизвестный метод: {kind}.{method}")
+        if not isinstance(params, dict):
+            raise ValueError("Параметры задаются объектом {параметр: значение}")
+        for name, limit in PARAMETER_LIMITS.items():
+            value = params.get(name)
+            if isinstance(value, (int, float)) and value > limit:
+                raise ValueError(f"{name} не больше {limit}")
+
+        calculator = get_calculator(kind, item.get('composition', composition))
+        response['result'] = to_json(getattr(calculator, method)(**params))
+    except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+        response['error'] = str(e) or e.__class__.__name__
+    except Exception:
+        logger.exception("Ошибка расчета %r", item)
+        response['error'] = "Внутренняя ошибка расчета"
+    return response
+
+
+def calculate_batch(items: List[Dict[str, Any]],
+                    composition: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+    """Пакет вычислений (см. calculate)"""
+    return [calculate(item, composition) for item in items]
+
+
+# ========== ПОДПИСЬ TELEGRAM ==========
+
+def check_init_data(init_data: str, bot_token: str,
+                    max_age: Optional[float] = 86400) -> Dict[str, str]:
+    """
+    Проверка подписи initData Telegram WebApp
+
+    Args:
+        init_data: Строка Telegram.WebApp.initData
+        bot_token: Токен бота
+        max_age: Наибольший возраст auth_date, с (None — без проверки)
+
+    Returns:
+        Поля initData
+
+    Raises:
+        APIError: подпись отсутствует, неверна или устарела (HTTP 401)
+    """
+    fields = dict(parse_qsl(init_data, keep_blank_values=True))
+    received = fields.pop('hash', '')
+    data_check = '\n'.join(f'{key}={fields[key]}' for key in sorted(fields))
+    secret = hmac.new(b'WebAppData', bot_token.encode(), hashlib.sha256).digest()
+    expected = hmac.new(secret, data_check.encode(), hashlib.sha256).hexdigest()
+    if not received or not hmac.compare_digest(received, expected):
+        raise APIError("Неверная подпись initData", 401)
+
+    if max_age is not None:
+        try:
+            age = time.time() - int(fields.get('auth_date', 0))
+        except ValueError:
+            raise APIError("Неверная подпись initData", 401)
+        if age > max_age:
+            raise APIError("initData устарели, откройте WebApp заново", 401)
+    return fields
+
+
+# ========== HTTP ==========
+
+class CalculationAPI:
+    """Обработчики /api/* для подключения к приложению aiohttp"""
+
+    def __init__(self, cors_origin: str = '*', max_batch: int = 1000,
+                 bot_token: str = '', auth_max_age: Optional[float] = 86400):
+        """
+        Args:
+            cors_origin: Значение Access-Control-Allow-Origin (пусто — без CORS)
+            max_batch: Наибольшее число вычислений в запросе
+            bot_token: Токен бота для проверки initData (пусто — без проверки)
+            auth_max_age: Наибольший возраст initData, с
+        """
+        self.cors_origin = cors_origin
+        self.max_batch = max_batch
+        self.bot_token = bot_token
+        self.auth_max_age = auth_max_age
+        self._methods = json.dumps(METHODS, ensure_ascii=False)
+
+    def setup(self, app: web.Application, prefix: str = '/api'):
+        """Регистрация маршрутов"""
+        app.router.add_post(f'{prefix}/calculate', self.calculate_handler)
+        app.router.add_get(f'{prefix}/methods', self.methods_handler)
+        app.router.add_route('OPTIONS', f'{prefix}/{{tail:.*}}', self.options_handler)
+
+    def _headers(self) -> Dict[str, str]:
+        if not self.cors_origin:
+            return {}
+        return {'Access-Control-Allow-Origin': self.cors_origin, 'Vary': 'Origin'}
+
+    def _json(self, body: str, status: int = 200) -> web.Response:
+        response = web.json_response(text=body, status=status, headers=self._headers())
+        if len(body) >= COMPRESS_MIN_SIZE:
+            # Кодировка выбирается по Accept-Encoding клиента
+            response.enable_compression()
+        return response
+
+    def _error(self, error: APIError) -> web.Response:
+        return self._json(json.dumps({'error': str(error)}, ensure_ascii=False),
+                          error.status)
+
+    async def options_handler(self, request: web.Request) -> web.Response:
+        """CORS preflight (кэшируется браузером на CORS_MAX_AGE)"""
+        headers = self._headers()
+        if headers:
+            headers.update({
+                'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Telegram-Init-Data',
+                'Access-Control-Max-Age': str(CORS_MAX_AGE),
+            })
+        return web.Response(status=204, headers=headers)
+
+    async def methods_handler(self, request: web.Request) -> web.Response:
+        """Обработчик GET /api/methods"""
+        return self._json(self._methods)
+
+    def _parse(self, body: Any) -> Tuple[List[Dict[str, Any]], Optional[Dict], bool]:
+        # (вычисления, состав пакета, пакетный запрос)
+        if not isinstance(body, dict):
+            raise APIError("Тело запроса — объект JSON")
+        if 'calculations' not in body:
+            return [body], None, False
+
+        items = body['calculations']
+        if not isinstance(items, list):
+            raise APIError("calculations — список вычислений")
+        if len(items) > self.max_batch:
+            raise APIError(f"В запросе больше {self.max_batch} вычислений", 413)
+        return items, body.get('composition'), True
+
+    async def calculate_handler(self, request: web.Request) -> web.Response:
+        """Обработчик POST /api/calculate"""
+        start = time.perf_counter()
+        try:
+            if self.bot_token:
+                check_init_data(request.headers.get('X-Telegram-Init-Data', ''),
+                                self.bot_token, self.auth_max_age)
+            try:
+                body = await request.json()
+            except ValueError:
+                raise APIError("Тело запроса — не JSON")
+            items, composition, batch = self._parse(body)
+            # Новые составы газа (построение таблицы z) — в пуле потоков
+            offload = len(items) > INLINE_BATCH or bool(uncached(items, composition))
+        except APIError as e:
+            return self._error(e)
+
+        if offload:
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, calculate_batch, items, composition)
+        else:
+            results = calculate_batch(items, composition)
+
+        if batch:
+            elapsed = round((time.perf_counter() - start) * 1000, 3)
+            payload: Any = {'results': results, 'elapsed_ms': elapsed}
+        else:
+            payload = results[0]
+        return self._json(json.dumps(payload, ensure_ascii=False, allow_nan=False))
+
+
+async def start_api_server(api: CalculationAPI, host: str = '0.0.0.0',
+                           port: int = 8090) -> web.AppRunner:
+    """
+    Запуск отдельного HTTP-сервера API (в режиме long polling)
+
+    Args:
+        api: Обработчики API
+        host: Адрес
+        port: Порт
+
+    Returns:
+        AppRunner сервера (для остановки через cleanup())
+    """
+    app = web.Application()
+    api.setup(app)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,116 @@
+"""
+Вспомогательные функции для колоночных (пакетных) расчетов
+
+Колоночные параметры повторяют структуру словаря параметров
+calculate_all_*, но вместо чисел содержат массивы по станциям:
+
+    {'separator': {'volume': array([...]), 'pressure': array([...])}, ...}
+
+Отсутствие раздела у станции обозначается NaN в его колонках,
+такие позиции дают нулевой расход.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def columns_from_records(records: List[Dict],
+                         defaults: Dict[str, Dict[str, float]]) -> Dict:
+    """
+    Преобразование списка словарей параметров станций в колонки
+
+    Args:
+        records: Параметры станций в формате calculate_all_*
+        defaults: {раздел: {параметр: значение по умолчанию}}
+
+    Returns:
+        Колоночные параметры {раздел: {параметр: массив}}
+    """
+    columns = {}
+    n = len(records)
+
+    for section, section_defaults in defaults.items():
+        rows = [record.get(section) for record in records]
+        if all(row is None for row in rows):
+            continue
+
+        keys = set(section_defaults)
+        for row in rows:
+            if row is not None:
+                keys.update(row)
+
+        section_columns = {}
+        for key in keys:
+            default = section_defaults.get(key, np.nan)
+            values = np.full(n, np.nan)
+            for i, row in enumerate(rows):
+                if row is not None:
+                    values[i] = row.get(key, default)
+            section_columns[key] = values
+
+        columns[section] = section_columns
+
+    return columns
+
+
+def columns_from_table(table: Dict[str, np.ndarray],
+                       sections: Dict[str, Dict[str, float]]) -> Dict:
+    """
+    Преобразование плоской таблицы с колонками 'раздел.параметр' в колонки
+
+    Args:
+        table: {'separator.volume': массив, ...}
+        sections: Известные разделы {раздел: параметры по умолчанию};
+            колонки других разделов пропускаются
+
+    Returns:
+        Колоночные параметры {раздел: {параметр: массив}}
+    """
+    columns = {}
+    for name, values in table.items():
+        section, _, key = name.partition('.')
+        if section in sections and key:
+            columns.setdefault(section, {})[key] = values
+    return columns
+
+
+def column_count(columns: Dict) -> int:
+    """Количество станций в колоночных параметрах"""
+    for section in columns.values():
+        for values in section.values():
+            values = np.asarray(values)
+            if values.ndim > 0:
+                return len(values)
+    return 1
+
+
+def section_column(section: Dict, key: str, default: Optional[float],
+                   n: int) -> np.ndarray:
+    """
+    Колонка параметра раздела с подстановкой значения по умолчанию
+
+    Args:
+        section: Колонки раздела
+        key: Имя параметра
+        default: Значение по умолчанию (None — параметр обязателен)
+        n: Количество станций
+
+    Returns:
+        Массив значений длины n
+    """
+    if key not in section:
+        if default is None:
+            raise KeyError(f"Отсутствует колонка '{key}'")
+        return np.full(n, float(default))
+
+    values = np.asarray(section[key], dtype=float)
+    if values.ndim == 0:
+        return np.full(n, float(values))
+
+    return values
+
+
+def fill_missing(result: np.ndarray) -> np.ndarray:
+    """Замена NaN (раздел отсутствует у станции) на нулевой расход"""
+    return np.where(np.isnan(result), 0.0, result)
@@ -0,0 +1,308 @@
+"""
+Потоковый пакетный расчет по CSV-файлам
+
+Файл читается блоками по chunk_rows строк; каждый блок преобразуется
+в колонки и считается векторизованным калькулятором (PipelineBatch,
+GRSBatch или KCBatch), результат сразу дописывается в выходной файл.
+Память не зависит от размера файла.
+
+Тип расчета определяется по заголовку:
+    - колонки 'раздел.параметр' разделов GRS_DEFAULTS — расчет ГРС;
+    - колонки 'раздел.параметр' разделов KC_DEFAULTS — расчет КС;
+    - иначе — участки газопровода (колонки PIPELINE_COLUMNS).
+"""
+
+import csv
+import math
+import os
+from itertools import islice
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .grs_calculations import GRS_DEFAULTS, GRSBatch
+from .kc_calculations import KC_DEFAULTS, KCBatch
+from .pipeline_calculations import PipelineBatch
+
+# Расчеты участков газопровода:
+# (колонка результата, метод PipelineBatch, обязательные колонки)
+PIPELINE_ITEMS = [
+    ('volume', 'pipeline_volume', ['diameter', 'length']),
+    ('capacity', 'pipeline_capacity',
+     ['diameter', 'pressure_start', 'pressure_end', 'length', 'temperature']),
+    ('final_pressure', 'final_pressure',
+     ['diameter', 'pressure_start', 'flow_rate', 'length', 'temperature']),
+    ('velocity', 'gas_velocity',
+     ['flow_rate', 'diameter', 'pressure', 'temperature'])
+]
+
+# Необязательные колонки участков и значения по умолчанию (NaN — по составу)
+PIPELINE_OPTIONAL = {'z': math.nan, 'lambda_coef': 0.01, 'roughness': 0.0001}
+
+PIPELINE_COLUMNS = sorted({column for _, _, required in PIPELINE_ITEMS
+                           for column in required} | set(PIPELINE_OPTIONAL))
+
+# Сколько нечисловых ячеек перечислять в итогах расчета
+MAX_REPORTED_CELLS = 20
+
+
+def detect_calculator(header: List[str]) -> str:
+    """
+    Тип расчета по заголовку CSV
+
+    Args:
+        header: Имена колонок
+
+    Returns:
+        'grs', 'kc' или 'pipeline'
+    """
+    sections = {name.partition('.')[0] for name in header if '.' in name}
+    if sections & set(GRS_DEFAULTS):
+        return 'grs'
+    if sections & set(KC_DEFAULTS):
+        return 'kc'
+
+    available = set(header)
+    if any(set(required) <= available for _, _, required in PIPELINE_ITEMS):
+        return 'pipeline'
+
+    raise ValueError(
+        "Не удалось определить тип расчета: нужны колонки 'раздел.параметр' "
+        "(ГРС, КС) или параметры участков: " + ", ".join(PIPELINE_COLUMNS)
+    )
+
+
+def calculate_pipeline_table(batch: PipelineBatch,
+                             table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Расчет участков газопровода по таблице колонок
+
+    Выполняются все расчеты PIPELINE_ITEMS, для которых есть колонки.
+
+    Args:
+        batch: Векторизованный калькулятор
+        table: {колонка: массив}
+
+    Returns:
+        {колонка результата: массив}
+    """
+    if not table:
+        return {}
+    n = len(next(iter(table.values())))
+    optional = {key: table.get(key, np.full(n, default))
+                for key, default in PIPELINE_OPTIONAL.items()}
+    optional['roughness'] = np.where(np.isnan(optional['roughness']),
+                                     PIPELINE_OPTIONAL['roughness'],
+                                     optional['roughness'])
+    # Пустое lambda_coef — коэффициент по уравнению Колбрука–Уайта
+    # Пустое z — коэффициент по составу газа (или 0.95)
+    z = optional['z'] if not np.isnan(optional['z']).all() else None
+
+    results = {}
+    for item, method, required in PIPELINE_ITEMS:
+        if not set(required) <= set(table):
+            continue
+        args = [table[column] for column in required]
+        if method == 'pipeline_volume':
+            results[item] = batch.pipeline_volume(*args, optional['roughness'])
+        elif method == 'gas_velocity':
+            results[item] = batch.gas_velocity(*args)
+        else:
+            results[item] = getattr(batch, method)(
+                *args, z=z, lambda_coef=optional['lambda_coef'],
+                roughness=optional['roughness']
+            )
+
+    return results
+
+
+def _calculation_columns(kind: str, header: List[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Колонки заголовка, участвующие в расчете, по разделам
+
+    Args:
+        kind: Тип расчета ('grs', 'kc' или 'pipeline')
+        header: Имена колонок
+
+    Returns:
+        {раздел: {колонка: значение по умолчанию}}; у участков газопровода
+        один раздел '' и значения NaN (пустые ячейки обрабатывает
+        calculate_pipeline_table). Остальные колонки (идентификаторы
+        станций и т.п.) переносятся в результат без разбора.
+    """
+    if kind == 'pipeline':
+        return {'': {name: math.nan for name in header if name in PIPELINE_COLUMNS}}
+
+    sections = GRS_DEFAULTS if kind == 'grs' else KC_DEFAULTS
+    columns: Dict[str, Dict[str, float]] = {}
+    for name in header:
+        section, _, key = name.partition('.')
+        default = sections.get(section, {}).get(key)
+        if isinstance(default, (int, float)):
+            columns.setdefault(section, {})[name] = float(default)
+    return columns
+
+
+def _parse_column(values: List[str], decimal_comma: bool):
+    """
+    Преобразование колонки строк в числа
+
+    Returns:
+        (массив, пустые ячейки (маска), индексы нечисловых ячеек);
+        пустые и нечисловые ячейки — NaN
+    """
+    if decimal_comma:
+        values = [value.replace(',', '.') for value in values]
+    try:
+        column = np.array([float(value) if value.strip() else math.nan
+                           for value in values])
+        return column, np.isnan(column), []
+    except ValueError:
+        pass
+
+    # Есть нечисловые ячейки: разбор по одной
+    column = np.full(len(values), math.nan)
+    blank = np.zeros(len(values), dtype=bool)
+    invalid = []
+    for i, value in enumerate(values):
+        if not value.strip():
+            blank[i] = True
+            continue
+        try:
+            column[i] = float(value)
+        except ValueError:
+            invalid.append(i)
+    return column, blank, invalid
+
+
+def _format_column(values: np.ndarray, decimal_comma: bool) -> List[str]:
+    formatted = ['' if math.isnan(value) else f'{value:.10g}'
+                 for value in values.tolist()]
+    if decimal_comma:
+        formatted = [value.replace('.', ',') for value in formatted]
+    return formatted
+
+
+def process_csv(source: str, destination: str,
+                composition: Optional[Dict[str, float]] = None,
+                chunk_rows: int = 50000,
+                progress: Optional[Callable[[int, float], None]] = None) -> Dict:
+    """
+    Потоковый расчет CSV-файла
+
+    Выходной файл содержит исходные колонки и колонки результатов.
+    Разделитель (',' или ';') определяется по заголовку; при ';'
+    допускается десятичная запятая (выгрузка из Excel).
+
+    Пустая ячейка ГРС/КС заменяется значением по умолчанию раздела
+    (GRS_DEFAULTS, KC_DEFAULTS), если у станции заполнена хотя бы одна
+    ячейка раздела; иначе раздел у станции отсутствует. Строки
+    с нечисловыми ячейками не рассчитываются (результаты пустые), ячейки
+    перечисляются в итогах.
+
+    Args:
+        source: Путь к исходному CSV
+        destination: Путь к файлу результата
+        composition: Состав газа {компонент: мольная доля}
+        chunk_rows: Число строк в блоке
+        progress: Функция progress(обработано строк, доля файла 0..1),
+            вызывается после каждого блока
+
+    Returns:
+        {'calculator': тип расчета, 'rows': число строк,
+         'totals': {колонка результата: сумма по файлу},
+         'invalid_cells': число нечисловых ячеек,
+         'invalid': [(номер строки файла, колонка, значение)] — первые
+         MAX_REPORTED_CELLS ячеек}
+    """
+    with open(source, newline='', encoding='utf-8-sig') as src, \
+            open(destination, 'w', newline='', encoding='utf-8') as dst:
+        first_line = src.readline()
+        delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
+        decimal_comma = delimiter == ';'
+        header = [name.strip() for name in
+                  next(csv.reader([first_line], delimiter=delimiter))]
+
+        kind = detect_calculator(header)
+        sections = _calculation_columns(kind, header)
+        positions = {name: i for i, name in enumerate(header)}
+        if kind == 'grs':
+            calculate = GRSBatch(composition).calculate_table
+        elif kind == 'kc':
+            calculate = KCBatch(composition).calculate_table
+        else:
+            batch = PipelineBatch(composition)
+
+            def calculate(table):
+                return calculate_pipeline_table(batch, table)
+
+        reader = csv.reader(src, delimiter=delimiter)
+        writer = csv.writer(dst, delimiter=delimiter)
+
+        size = max(os.path.getsize(source), 1)
+
+        rows_done = 0
+        totals: Dict[str, float] = {}
+        result_names = None
+        invalid_cells = 0
+        reported = []
+
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                break
+
+            width = len(header)
+            rows = [row + [''] * (width - len(row)) if len(row) < width
+                    else row[:width] for row in rows]
+
+            table = {}
+            skipped = np.zeros(len(rows), dtype=bool)
+            for section, defaults in sections.items():
+                blank = {}
+                for name in defaults:
+                    values = [row[positions[name]] for row in rows]
+                    table[name], blank[name], invalid = _parse_column(values, decimal_comma)
+                    for i in invalid:
+                        skipped[i] = True
+                        invalid_cells += 1
+                        if len(reported) < MAX_REPORTED_CELLS:
+                            # Номер строки файла: строка 1 — заголовок
+                            reported.append((rows_done + i + 2, name, values[i]))
+
+                if not section:
+                    continue
+                # Пустые ячейки заполненного раздела — значения по умолчанию
+                absent = np.logical_and.reduce(list(blank.values()))
+                for name, default in defaults.items():
+                    table[name][blank[name] & ~absent] = default
+
+            results = calculate(table) if table else {}
+            if skipped.any():
+                results = {name: np.where(skipped, math.nan, values)
+                           for name, values in results.items()}
+
+            if result_names is None:
+                result_names = list(results)
+                writer.writerow(header + result_names)
+
+            missing = np.full(len(rows), math.nan)
+            formatted = [_format_column(np.asarray(results.get(name, missing),
+                                                   dtype=float), decimal_comma)
+                         for name in result_names]
+            writer.writerows(row + list(values)
+                             for row, values in zip(rows, zip(*formatted)))
+
+            for name in result_names:
+                totals[name] = (totals.get(name, 0.0)
+                                + float(np.nansum(results.get(name, missing))))
+
+            rows_done += len(rows)
+            if progress is not None:
+                progress(rows_done, min(src.buffer.raw.tell() / size, 1.0))
+
+        if result_names is None:
+            writer.writerow(header)
+
+    return {'calculator': kind, 'rows': rows_done, 'totals': totals,
+            'invalid_cells': invalid_cells, 'invalid': reported}
@@ -0,0 +1,319 @@
+"""
+Кэши результатов
+
+TTLCache — ограниченный по размеру LRU-кэш со временем жизни записей.
+memoize / memoize_class — кэширование результатов чистых методов
+калькуляторов (включается явно, см. CALC_CACHE_SIZE в config.py).
+"""
+
+import inspect
+import math
+import threading
+import time
+import typing
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence
+
+_MISSING = object()
+
+# Глубина вложенных вызовов методов калькуляторов в текущем потоке:
+# кэш действует только на внешней границе (вызовы калькулятора извне),
+# внутренние вызовы self.метод(...) выполняются напрямую
+_calls = threading.local()
+
+
+class TTLCache:
+    """LRU-кэш с ограничением размера и временем жизни записей"""
+
+    def __init__(self, maxsize: int = 10000, ttl: Optional[float] = 3600.0):
+        """
+        Args:
+            maxsize: Максимальное число записей (вытесняются давно не использованные)
+            ttl: Время жизни записи, с (None — без ограничения)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Значение из кэша
+
+        Args:
+            key: Ключ
+            default: Значение при отсутствии или устаревании записи
+
+        Returns:
+            Сохраненное значение или default
+        """
+        item = self._data.get(key, _MISSING)
+        if item is not _MISSING:
+            value, expires = item
+            if expires is None or expires > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+
+        self.misses += 1
+        return default
+
+    def set(self, key: Hashable, value: Any):
+        """Сохранение значения (с вытеснением самой старой записи)"""
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        """Очистка кэша и статистики"""
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Статистика обращений: {'hits', 'misses', 'hit_rate', 'size', 'maxsize'}"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ========== МЕМОИЗАЦИЯ МЕТОДОВ КАЛЬКУЛЯТОРОВ ==========
+
+class MemoCache:
+    """
+    LRU-кэш результатов одного метода
+
+    Чтение выполняет обертка memoize; запись и очистка — под блокировкой.
+    """
+
+    def __init__(self, name: str, maxsize: int = 4096):
+        """
+        Args:
+            name: Имя метода (для статистики)
+            maxsize: Максимальное число записей
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Обычный словарь: порядок вставки — порядок использования
+        self._data: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def set(self, key: Hashable, value: Any):
+        """Сохранение значения (с вытеснением самой старой записи)"""
+        with self._lock:
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                # Попадания извлекают и вставляют записи без блокировки:
+                # самая старая запись может исчезнуть между выбором и удалением
+                try:
+                    self._data.pop(next(iter(self._data)), None)
+                except (StopIteration, RuntimeError):
+                    break
+
+    def clear(self):
+        """Очистка кэша и статистики"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Статистика обращений: {'hits', 'misses', 'hit_rate', 'size', 'maxsize'}"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'size': len(self._data),
+            'maxsize': self.maxsize
+        }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Кэши всех мемоизированных методов процесса
+MEMO_CACHES: List[MemoCache] = []
+
+
+def quantize(value: float, digits: int) -> float:
+    """
+    Округление до заданного числа значащих цифр
+
+    Args:
+        value: Значение
+        digits: Число значащих цифр
+
+    Returns:
+        Округленное значение (0, inf и NaN — без изменений)
+    """
+    if value == 0 or not math.isfinite(value):
+        return value
+    return round(value, digits - 1 - math.floor(math.log10(abs(value))))
+
+
+def _composition_key(instance) -> Hashable:
+    # Ключ состава газа вычисляется один раз на экземпляр калькулятора
+    key = instance.__dict__.get('_memo_composition', _MISSING)
+    if key is _MISSING:
+        composition = getattr(instance, 'composition', None)
+        key = tuple(sorted(composition.items())) if composition else None
+        instance.__dict__['_memo_composition'] = key
+    return key
+
+
+def memoize(maxsize: int = 4096, digits: Optional[int] = None) -> Callable:
+    """
+    Декоратор кэширования результатов метода калькулятора
+
+    Ключ — состав газа экземпляра и аргументы вызова. Вызовы
+    с нехешируемыми аргументами (словари, массивы) выполняются без кэша.
+    При заданном digits аргументы float округляются до digits значащих
+    цифр, и метод вызывается с округленными значениями — результат не
+    зависит от того, какой из близких вызовов был первым.
+
+    Кэшируются только внешние вызовы: вызовы из другого метода
+    калькулятора (например, gas_through_hole в цикле leak_volume)
+    выполняются без кэша и без округления аргументов.
+
+    Args:
+        maxsize: Максимальное число записей кэша метода
+        digits: Число значащих цифр для квантования аргументов (None — без)
+
+    Returns:
+        Декоратор; кэш обертки доступен как wrapper.cache
+    """
+    def decorator(method: Callable) -> Callable:
+        cache = MemoCache(method.__qualname__, maxsize)
+        MEMO_CACHES.append(cache)
+
+        data = cache._data
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            depth = getattr(_calls, 'depth', 0)
+            if depth:
+                return method(self, *args, **kwargs)
+
+            if digits is not None:
+                args = tuple(quantize(a, digits) if isinstance(a, float) else a
+                             for a in args)
+                kwargs = {k: quantize(v, digits) if isinstance(v, float) else v
+                          for k, v in kwargs.items()}
+
+            composition = self.__dict__.get('_memo_composition', _MISSING)
+            if composition is _MISSING:
+                composition = _composition_key(self)
+            key = (composition, args, tuple(kwargs.items())) if kwargs else (composition, args)
+
+            # Попадание обрабатывается без блокировки: запись извлекается
+            # и вставляется заново (становится последней в порядке LRU);
+            # отдельные операции словаря атомарны
+            try:
+                value = data.pop(key, _MISSING)
+            except TypeError:
+                # Нехешируемые аргументы
+                return method(self, *args, **kwargs)
+            if value is not _MISSING:
+                data[key] = value
+                cache.hits += 1
+                return value
+
+            cache.misses += 1
+            _calls.depth = 1
+            try:
+                value = method(self, *args, **kwargs)
+            finally:
+                _calls.depth = 0
+            cache.set(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.__memoized__ = True
+        return wrapper
+    return decorator
+
+
+def _uncached_calls(method: Callable) -> Callable:
+    """Обертка некэшируемого метода: вложенные вызовы — без кэша"""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        depth = getattr(_calls, 'depth', 0)
+        _calls.depth = depth + 1
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _calls.depth = depth
+
+    wrapper.__memoized__ = True
+    return wrapper
+
+
+def _takes_dict(method: Callable) -> bool:
+    for parameter in inspect.signature(method).parameters.values():
+        annotation = parameter.annotation
+        if annotation is dict or typing.get_origin(annotation) is dict:
+            return True
+    return False
+
+
+def memoize_class(cls: type, maxsize: int = 4096, digits: Optional[int] = None,
+                  skip: Sequence[str] = ()) -> type:
+    """
+    Кэширование всех чистых публичных методов класса калькулятора
+
+    Методы с аргументами-словарями (calculate_all_*, household_appliances)
+    не кэшируются, вызываемые ими методы тоже выполняются без кэша. Как
+    и metrics.instrument, методы заменяются в самом классе — вызывать
+    один раз при запуске.
+
+    Args:
+        cls: Класс калькулятора
+        maxsize: Максимальное число записей кэша каждого метода
+        digits: Число значащих цифр для квантования аргументов (None — без)
+        skip: Дополнительно исключаемые методы
+
+    Returns:
+        Тот же класс
+    """
+    for attribute, method in list(vars(cls).items()):
+        if attribute.startswith('_') or not callable(method) or attribute in skip:
+            continue
+        if getattr(method, '__memoized__', False):
+            continue
+        if _takes_dict(method):
+            setattr(cls, attribute, _uncached_calls(method))
+            continue
+        setattr(cls, attribute, memoize(maxsize, digits)(method))
+    return cls
+
+
+def memo_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Статистика всех кэшей методов
+
+    Returns:
+        {имя метода: статистика}
+    """
+    return {cache.name: cache.stats() for cache in MEMO_CACHES}
+
+
+def clear_memo():
+    """Очистка всех кэшей методов"""
+    for cache in MEMO_CACHES:
+        cache.clear()
@@ -0,0 +1,237 @@
+"""
+Модуль расчета коэффициента сжимаемости природного газа
+Уравнение состояния Пенга-Робинсона с правилами смешения Ван-дер-Ваальса
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+
+from .gas_properties import COMPONENTS, CompositionKey, normalize_composition
+
+# Значение по умолчанию, используемое калькуляторами без состава газа
+DEFAULT_Z = 0.95
+
+R = 8.314462618
+
+
+def peng_robinson_z(composition: CompositionKey, pressure, temperature):
+    """
+    Коэффициент сжимаемости по уравнению Пенга-Робинсона
+
+    Args:
+        composition: Нормализованный состав (см. normalize_composition)
+        pressure: Давление, МПа (число или массив)
+        temperature: Температура, К (число или массив)
+
+    Returns:
+        Коэффициент сжимаемости газовой фазы
+    """
+    p_pa = np.asarray(pressure, dtype=float) * 1e6
+    t = np.asarray(temperature, dtype=float)
+
+    sqrt_a = 0.0
+    b_mix = 0.0
+    for name, fraction in composition:
+        _, tc, pc, omega = COMPONENTS[name]
+        pc_pa = pc * 1e6
+        m = 0.37464 + 1.54226 * omega - 0.26992 * omega**2
+        alpha = (1 + m * (1 - np.sqrt(t / tc)))**2
+        a_i = 0.45724 * R**2 * tc**2 / pc_pa * alpha
+        # При k_ij = 0 a_mix = (Σ x_i·√a_i)²
+        sqrt_a = sqrt_a + fraction * np.sqrt(a_i)
+        b_mix += fraction * 0.07780 * R * tc / pc_pa
+
+    big_a = sqrt_a**2 * p_pa / (R * t)**2
+    big_b = b_mix * p_pa / (R * t)
+
+    # Z³ + c2·Z² + c1·Z + c0 = 0
+    c2 = -(1 - big_b)
+    c1 = big_a - 3 * big_b**2 - 2 * big_b
+    c0 = -(big_a * big_b - big_b**2 - big_b**3)
+
+    return _largest_cubic_root(c2, c1, c0)
+
+
+def _largest_cubic_root(c2, c1, c0):
+    """Наибольший вещественный корень приведенного кубического уравнения"""
+    p = c1 - c2**2 / 3
+    q = 2 * c2**3 / 27 - c2 * c1 / 3 + c0
+    disc = (q / 2)**2 + (p / 3)**3
+
+    with np.errstate(all='ignore'):
+        # Один вещественный корень (формула Кардано)
+        sqrt_disc = np.sqrt(np.maximum(disc, 0))
+        one_root = np.cbrt(-q / 2 + sqrt_disc) + np.cbrt(-q / 2 - sqrt_disc)
+
+        # Три вещественных корня (тригонометрическая формула)
+        p_neg = np.minimum(p, -1e-300)
+        arg = np.clip(3 * q / (2 * p_neg) * np.sqrt(-3 / p_neg), -1, 1)
+        three_roots = 2 * np.sqrt(-p_neg / 3) * np.cos(np.arccos(arg) / 3)
+
+    return np.where(disc > 0, one_root, three_roots) - c2 / 3
+
+
+class ZTable:
+    """
+    Таблица коэффициента сжимаемости на сетке (p, T) для одного состава
+
+    Значения рассчитываются по уравнению состояния один раз при создании;
+    далее Z определяется билинейной интерполяцией. Вне диапазона сетки
+    выполняется точный расчет. Максимальная погрешность интерполяции
+    в центрах ячеек сохраняется в max_error.
+    """
+
+    def __init__(self, composition: CompositionKey,
+                 p_range=(0.05, 20.0), t_range=(240.0, 400.0),
+                 p_step: float = 0.05, t_step: float = 1.0):
+        self.composition = composition
+
+        self.p_min, self.p_max = p_range
+        self.t_min, self.t_max = t_range
+        self.p_step = p_step
+        self.t_step = t_step
+
+        n_p = int(round((self.p_max - self.p_min) / p_step)) + 1
+        n_t = int(round((self.t_max - self.t_min) / t_step)) + 1
+        pressures = self.p_min + p_step * np.arange(n_p)
+        temperatures = self.t_min + t_step * np.arange(n_t)
+
+        self.values = peng_robinson_z(
+            composition, pressures[:, None], temperatures[None, :]
+        )
+        self._rows = self.values.tolist()
+        self._n_p = n_p
+        self._n_t = n_t
+
+        # Оценка погрешности: центры ячеек
+        exact = peng_robinson_z(
+            composition,
+            (pressures[:-1] + p_step / 2)[:, None],
+            (temperatures[:-1] + t_step / 2)[None, :]
+        )
+        v = self.values
+        interpolated = (v[:-1, :-1] + v[1:, :-1] + v[:-1, 1:] + v[1:, 1:]) / 4
+        self.max_error = float(np.abs(exact - interpolated).max())
+
+    def __call__(self, pressure, temperature):
+        """
+        Коэффициент сжимаемости
+
+        Args:
+            pressure: Давление, МПа (число или массив)
+            temperature: Температура, К (число или массив)
+
+        Returns:
+            Коэффициент сжимаемости (число или массив)
+        """
+        if isinstance(pressure, (int, float)) and isinstance(temperature, (int, float)):
+            return self._lookup_scalar(float(pressure), float(temperature))
+        return self._lookup_array(pressure, temperature)
+
+    def _lookup_scalar(self, pressure: float, temperature: float) -> float:
+        fp = (pressure - self.p_min) / self.p_step
+        ft = (temperature - self.t_min) / self.t_step
+
+        if not (0 <= fp <= self._n_p - 1 and 0 <= ft <= self._n_t - 1):
+            return float(peng_robinson_z(self.composition, pressure, temperature))
+
+        i = min(int(fp), self._n_p - 2)
+        j = min(int(ft), self._n_t - 2)
+        dp = fp - i
+        dt = ft - j
+        row0 = self._rows[i]
+        row1 = self._rows[i + 1]
+
+        return ((row0[j] * (1 - dt) + row0[j + 1] * dt) * (1 - dp)
+                + (row1[j] * (1 - dt) + row1[j + 1] * dt) * dp)
+
+    def _lookup_array(self, pressure, temperature) -> np.ndarray:
+        p, t = np.broadcast_arrays(np.asarray(pressure, dtype=float),
+                                   np.asarray(temperature, dtype=float))
+
+        fp = (p - self.p_min) / self.p_step
+        ft = (t - self.t_min) / self.t_step
+        inside = ((fp >= 0) & (fp <= self._n_p - 1)
+                  & (ft >= 0) & (ft <= self._n_t - 1))
+
+        i = np.clip(np.floor(fp), 0, self._n_p - 2).astype(np.intp)
+        j = np.clip(np.floor(ft), 0, self._n_t - 2).astype(np.intp)
+        dp = np.clip(fp - i, 0, 1)
+        dt = np.clip(ft - j, 0, 1)
+
+        v = self.values
+        z = ((v[i, j] * (1 - dt) + v[i, j + 1] * dt) * (1 - dp)
+             + (v[i + 1, j] * (1 - dt) + v[i + 1, j + 1] * dt) * dp)
+
+        if not inside.all():
+            z = np.where(inside, z,
+                         peng_robinson_z(self.composition, p, t))
+
+        return z
+
+
+@lru_cache(maxsize=32)
+def _cached_table(composition: CompositionKey) -> ZTable:
+    return ZTable(composition)
+
+
+def get_z_table(composition: Dict[str, float]) -> ZTable:
+    """
+    Таблица Z для состава газа (кэшируется по составу)
+
+    Args:
+        composition: {компонент: мольная доля или %}
+
+    Returns:
+        Таблица коэффициента сжимаемости
+    """
+    return _cached_table(normalize_composition(composition))
+
+
+def z_factor(pressure, temperature, composition: Dict[str, float]):
+    """
+    Коэффициент сжимаемости газа заданного состава
+
+    Args:
+        pressure: Давление, МПа (число или массив)
+        temperature: Температура, К (число или массив)
+        composition: {компонент: мольная доля или %}
+
+    Returns:
+        Коэффициент сжимаемости
+    """
+    return get_z_table(composition)(pressure, temperature)
+
+
+def resolve_z(z, table: Optional[ZTable], pressure, temperature):
+    """
+    Коэффициент сжимаемости для калькуляторов
+
+    Явно заданное значение z используется как есть; если z не задан
+    (None или NaN в массиве), берется значение из таблицы состава,
+    а без состава — DEFAULT_Z.
+
+    Args:
+        z: Заданный коэффициент сжимаемости или None
+        table: Таблица Z для состава газа калькулятора или None
+        pressure: Давление, МПа
+        temperature: Температура, К
+
+    Returns:
+        Коэффициент сжимаемости
+    """
+    if z is not None and np.ndim(z) == 0:
+        return z
+
+    if z is None:
+        return DEFAULT_Z if table is None else table(pressure, temperature)
+
+    z = np.asarray(z, dtype=float)
+    missing = np.isnan(z)
+    if not missing.any():
+        return z
+
+    fallback = DEFAULT_Z if table is None else table(pressure, temperature)
+    return np.where(missing, fallback, z)
@@ -0,0 +1,61 @@
+"""
+Модуль пересчета температуры точки росы по воде (ТПРв) при различных давлениях
+Векторизованный расчет по ГОСТ Р 53763 / ISO 18453 для массивов замеров
+"""
+
+import numpy as np
+
+# Коэффициенты формулы Магнуса
+ALPHA = 17.27
+BETA = 237.7
+P_SAT_0 = 0.61094  # кПа
+
+# Значение, возвращаемое при нефизичном давлении (мольная доля воды ≤ 0)
+DEW_POINT_MIN = -100.0
+
+
+def dew_point_iso(dew_point_water, pressure):
+    """
+    Точка росы по воде при заданном давлении (точный расчет)
+
+    Поэлементно совпадает с PipelineCalculator.dew_point_conversion
+    для method="ISO18453".
+
+    Args:
+        dew_point_water: Точка росы по воде, °C (число или массив)
+        pressure: Давление, МПа (число или массив)
+
+    Returns:
+        Точка росы по воде при заданном давлении, °C
+    """
+    t = np.asarray(dew_point_water, dtype=float)
+    p = np.asarray(pressure, dtype=float) * 1000  # кПа
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Давление насыщенного пара при заданной точке росы
+        p_sat = P_SAT_0 * np.exp(ALPHA * t / (BETA + t))
+        # Мольная доля воды
+        x_water = p_sat / p
+
+        invalid = x_water <= 0
+        ratio = np.log(np.where(invalid, 1.0, x_water * p) / P_SAT_0)
+        dew_point = BETA * ratio / (ALPHA - ratio)
+
+    return np.where(invalid, DEW_POINT_MIN, dew_point)
+
+
+def dew_point_simplified(dew_point_water, pressure):
+    """
+    Точка росы по воде при заданном давлении (упрощенная поправка)
+
+    Поправка −0.5 °C на каждые 0.1 МПа сверх атмосферного давления.
+
+    Args:
+        dew_point_water: Точка росы по воде, °C (число или массив)
+        pressure: Давление, МПа (число или массив)
+
+    Returns:
+        Точка росы по воде при заданном давлении, °C
+    """
+    pressure_correction = (np.asarray(pressure, dtype=float) - 0.101325) / 0.1 * (-0.5)
+    return np.asarray(dew_point_water, dtype=float) + pressure_correction
@@ -0,0 +1,228 @@
+"""
+Коэффициент гидравлического сопротивления участков газопровода
+Уравнение Колбрука–Уайта, решаемое векторизованным методом Ньютона
+
+    1/√λ = -2·lg(k/(3.7·d) + 2.51/(Re·√λ))
+
+Начальное приближение — явная формула Свами–Джейна (погрешность ~1 %),
+после 2–3 шагов Ньютона по x = 1/√λ погрешность достигает точности
+double. Функции принимают числа или массивы NumPy: массивы решаются
+одновременно (итерации до сходимости всех элементов), числа — через
+math, без накладных расходов NumPy.
+Для пропускной способности при заданных давлениях уравнение решается
+явно (capacity_friction).
+"""
+
+import math
+
+import numpy as np
+
+from .gas_properties import AIR_DENSITY
+
+# Параметры газа по умолчанию: относительная плотность по воздуху
+# и динамическая вязкость, Па·с
+RELATIVE_DENSITY = 0.6
+VISCOSITY = 1.1e-5
+
+# Шероховатость стенок по умолчанию, м
+ROUGHNESS = 0.0001
+
+# Верхняя граница ламинарного режима
+REYNOLDS_LAMINAR = 2300.0
+
+# Коэффициент в Re = K·q·Δ / (d·μ): q в млн м³/сут, d в м, μ в Па·с
+_RE_COEF = 4 * AIR_DENSITY * 1e6 / (24 * 3600 * math.pi)
+
+_LN10 = math.log(10)
+
+
+def _scalars(*values) -> bool:
+    return all(isinstance(value, (int, float)) for value in values)
+
+
+def reynolds(flow_rate, diameter, relative_density: float = RELATIVE_DENSITY,
+             viscosity: float = VISCOSITY):
+    """
+    Число Рейнольдса потока газа
+
+    Args:
+        flow_rate: Расход газа при стандартных условиях, млн м³/сут
+        diameter: Внутренний диаметр, мм
+        relative_density: Относительная плотность газа по воздуху
+        viscosity: Динамическая вязкость, Па·с
+
+    Returns:
+        Число Рейнольдса (по модулю расхода)
+    """
+    q = np.abs(np.asarray(flow_rate, dtype=float))
+    d_m = np.asarray(diameter, dtype=float) / 1000
+    return _RE_COEF * q * relative_density / (d_m * viscosity)
+
+
+def swamee_jain(re, relative_roughness):
+    """
+    Явная формула Свами–Джейна для турбулентного режима
+
+    Args:
+        re: Число Рейнольдса
+        relative_roughness: Относительная шероховатость k/d
+
+    Returns:
+        Коэффициент гидравлического сопротивления
+    """
+    re = np.asarray(re, dtype=float)
+    rr = np.asarray(relative_roughness, dtype=float)
+    return 0.25 / np.log10(rr / 3.7 + 5.74 / re**0.9) ** 2
+
+
+def colebrook(re, relative_roughness, tol: float = 1e-12, max_iter: int = 20):
+    """
+    Решение уравнения Колбрука–Уайта методом Ньютона
+
+    Args:
+        re: Число Рейнольдса (турбулентный режим)
+        relative_roughness: Относительная шероховатость k/d
+        tol: Допустимое относительное изменение 1/√λ
+        max_iter: Максимальное число итераций
+
+    Returns:
+        Коэффициент гидравлического сопротивления
+    """
+    re = np.asarray(re, dtype=float)
+    rr = np.asarray(relative_roughness, dtype=float)
+    a = rr / 3.7
+    b = 2.51 / re
+
+    # f(x) = x + 2·lg(a + b·x) = 0, x = 1/√λ
+    x = 1 / np.sqrt(swamee_jain(re, rr))
+    for _ in range(max_iter):
+        s = a + b * x
+        f = x + 2 * np.log10(s)
+        df = 1 + 2 * b / (s * _LN10)
+        dx = f / df
+        x = x - dx
+        if not np.any(np.abs(dx) > tol * np.abs(x)):
+            break
+
+    return 1 / x**2
+
+
+def _friction_scalar(re: float, rr: float) -> float:
+    if math.isnan(re):
+        return math.nan
+    if re < REYNOLDS_LAMINAR:
+        return 64 / re if re > 0 else 0.0
+
+    a = rr / 3.7
+    b = 2.51 / re
+    x = -1 / (2 * math.log10(a + 5.74 / re**0.9))
+    for _ in range(20):
+        s = a + b * x
+        dx = (x + 2 * math.log10(s)) / (1 + 2 * b / (s * _LN10))
+        x -= dx
+        if abs(dx) <= 1e-12 * abs(x):
+            break
+    return 1 / x**2
+
+
+def friction_factor(re, relative_roughness):
+    """
+    Коэффициент гидравлического сопротивления по режиму течения
+
+    Ламинарный режим (Re < REYNOLDS_LAMINAR) — λ = 64/Re, иначе уравнение
+    Колбрука–Уайта. При Re = 0 возвращается 0: потерь на трение нет.
+
+    Args:
+        re: Число Рейнольдса
+        relative_roughness: Относительная шероховатость k/d
+
+    Returns:
+        Коэффициент гидравлического сопротивления
+    """
+    if _scalars(re, relative_roughness):
+        return _friction_scalar(float(re), float(relative_roughness))
+
+    re, rr = np.broadcast_arrays(np.asarray(re, dtype=float),
+                                 np.asarray(relative_roughness, dtype=float))
+    laminar = re < REYNOLDS_LAMINAR
+
+    lam = np.zeros(re.shape)
+    turbulent = ~laminar & ~np.isnan(re)
+    if turbulent.any():
+        lam[turbulent] = colebrook(re[turbulent], rr[turbulent])
+    flowing = laminar & (re > 0)
+    lam[flowing] = 64 / re[flowing]
+    lam[np.isnan(re)] = np.nan
+
+    return lam
+
+
+def pipe_friction(flow_rate, diameter, roughness=ROUGHNESS,
+                  relative_density: float = RELATIVE_DENSITY,
+                  viscosity: float = VISCOSITY):
+    """
+    Коэффициент гидравлического сопротивления участка по расходу
+
+    Args:
+        flow_rate: Расход газа, млн м³/сут
+        diameter: Внутренний диаметр, мм
+        roughness: Шероховатость стенок, м
+        relative_density: Относительная плотность газа по воздуху
+        viscosity: Динамическая вязкость, Па·с
+
+    Returns:
+        Коэффициент гидравлического сопротивления
+    """
+    if _scalars(flow_rate, diameter, roughness):
+        d_m = diameter / 1000
+        re = _RE_COEF * abs(flow_rate) * relative_density / (d_m * viscosity)
+        return _friction_scalar(re, roughness / d_m)
+
+    re = reynolds(flow_rate, diameter, relative_density, viscosity)
+    rr = np.asarray(roughness, dtype=float) / (np.asarray(diameter, dtype=float) / 1000)
+    return friction_factor(re, rr)
+
+
+def capacity_friction(flow_unit, diameter, roughness=ROUGHNESS,
+                      relative_density: float = RELATIVE_DENSITY,
+                      viscosity: float = VISCOSITY):
+    """
+    Коэффициент сопротивления, согласованный с пропускной способностью
+
+    При заданных давлениях расход q = q₁/√λ (q₁ — расход при λ = 1),
+    поэтому Re·√λ = Re(q₁) известно заранее и уравнение Колбрука–Уайта
+    решается явно, без итераций λ → q → Re → λ:
+
+        1/√λ = -2·lg(k/(3.7·d) + 2.51/(Re·√λ))
+
+    В ламинарном режиме λ = 64/Re дает λ = (64/Re(q₁))².
+
+    Args:
+        flow_unit: Расход при λ = 1, млн м³/сут
+        diameter: Внутренний диаметр, мм
+        roughness: Шероховатость стенок, м
+        relative_density: Относительная плотность газа по воздуху
+        viscosity: Динамическая вязкость, Па·с
+
+    Returns:
+        Коэффициент гидравлического сопротивления (0 — нет потока)
+    """
+    if _scalars(flow_unit, diameter, roughness):
+        d_m = diameter / 1000
+        re_sqrt_lam = _RE_COEF * abs(flow_unit) * relative_density / (d_m * viscosity)
+        if not re_sqrt_lam > 0:
+            return 0.0
+        x = -2 * math.log10(roughness / d_m / 3.7 + 2.51 / re_sqrt_lam)
+        if re_sqrt_lam * x < REYNOLDS_LAMINAR:
+            return (64 / re_sqrt_lam) ** 2
+        return 1 / x**2
+
+    re_sqrt_lam = reynolds(flow_unit, diameter, relative_density, viscosity)
+    rr = np.asarray(roughness, dtype=float) / (np.asarray(diameter, dtype=float) / 1000)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = -2 * np.log10(rr / 3.7 + 2.51 / re_sqrt_lam)
+        lam = np.where(re_sqrt_lam * x < REYNOLDS_LAMINAR,
+                       (64 / re_sqrt_lam) ** 2, 1 / x**2)
+
+    return np.where(re_sqrt_lam > 0, lam, 0.0)
@@ -0,0 +1,185 @@
+"""
+Модуль свойств компонентов природного газа
+ГОСТ 30319.1-2015, ГОСТ 31369-2008
+"""
+
+import math
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Свойства компонентов:
+# молярная масса, г/моль; критическая температура, К;
+# критическое давление, МПа; фактор ацентричности
+COMPONENTS = {
+    'methane':          (16.043, 190.56, 4.599, 0.0114),
+    'ethane':           (30.069, 305.32, 4.872, 0.0995),
+    'propane':          (44.096, 369.83, 4.248, 0.1523),
+    'i-butane':         (58.122, 407.80, 3.640, 0.1835),
+    'n-butane':         (58.122, 425.12, 3.796, 0.2002),
+    'i-pentane':        (72.149, 460.40, 3.380, 0.2275),
+    'n-pentane':        (72.149, 469.70, 3.370, 0.2515),
+    'n-hexane':         (86.175, 507.60, 3.025, 0.3013),
+    'nitrogen':         (28.013, 126.20, 3.398, 0.0377),
+    'carbon_dioxide':   (44.010, 304.13, 7.377, 0.2239),
+    'hydrogen_sulfide': (34.081, 373.10, 9.000, 0.0942),
+    'hydrogen':         (2.016, 33.19, 1.313, -0.2160),
+    'helium':           (4.003, 5.19, 0.227, -0.3900),
+    'oxygen':           (31.999, 154.58, 5.043, 0.0222),
+    'water':            (18.015, 647.10, 22.064, 0.3449)
+}
+
+CompositionKey = Tuple[Tuple[str, float], ...]
+
+
+def normalize_composition(composition: Dict[str, float]) -> CompositionKey:
+    """
+    Нормализация состава газа в ключ для кэширования
+
+    Args:
+        composition: {компонент: мольная доля или %}
+
+    Returns:
+        Кортеж (компонент, мольная доля), упорядоченный по имени,
+        сумма долей равна 1
+
+    Raises:
+        ValueError: неизвестный компонент, отрицательная или нечисловая
+            доля, неположительная сумма долей
+    """
+    unknown = set(composition) - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"Неизвестные компоненты: {', '.join(sorted(unknown))}")
+
+    invalid = sorted(name for name, fraction in composition.items()
+                     if not isinstance(fraction, (int, float))
+                     or not math.isfinite(fraction) or fraction < 0)
+    if invalid:
+        raise ValueError("Доли компонентов должны быть неотрицательными числами: "
+                         + ", ".join(invalid))
+
+    total = sum(composition.values())
+    if total <= 0:
+        raise ValueError("Сумма долей компонентов должна быть положительной")
+
+    return tuple(
+        (name, round(fraction / total, 8))
+        for name, fraction in sorted(composition.items())
+        if fraction > 0
+    )
+
+
+# ========== СВОЙСТВА СМЕСИ ==========
+
+# Стандартные условия (ГОСТ 2939): 20 °C, 0.101325 МПа
+T_STANDARD = 293.15
+P_STANDARD = 101325.0
+R = 8.314462618
+
+# Плотность воздуха при стандартных условиях, кг/м³
+AIR_DENSITY = 1.205
+
+# Теплофизические свойства компонентов:
+# изобарная теплоемкость идеального газа при 20 °C, Дж/(моль·К);
+# низшая теплота сгорания, кДж/моль; коэффициент суммирования √b
+THERMAL = {
+    'methane':          (35.69, 802.69, 0.0436),
+    'ethane':           (52.49, 1428.84, 0.0894),
+    'propane':          (73.60, 2043.37, 0.1288),
+    'i-butane':         (96.80, 2648.42, 0.1783),
+    'n-butane':         (98.49, 2657.60, 0.1825),
+    'i-pentane':        (118.9, 3265.08, 0.2387),
+    'n-pentane':        (120.0, 3272.00, 0.2515),
+    'n-hexane':         (143.1, 3887.21, 0.3062),
+    'nitrogen':         (29.12, 0.0, 0.0173),
+    'carbon_dioxide':   (37.12, 0.0, 0.0728),
+    'hydrogen_sulfide': (34.20, 517.95, 0.0980),
+    'hydrogen':         (28.84, 241.72, -0.0051),
+    'helium':           (20.79, 0.0, 0.0),
+    'oxygen':           (29.38, 0.0, 0.0265),
+    'water':            (33.58, 0.0, 0.2470)
+}
+
+
+class GasProperties:
+    """
+    Свойства газа, используемые калькуляторами
+
+    Attributes:
+        molar_mass: Молярная масса, г/моль
+        k: Показатель адиабаты
+        density: Плотность при стандартных условиях, кг/м³
+        relative_density: Относительная плотность по воздуху
+        cp: Удельная изобарная теплоемкость, Дж/(кг·К)
+        heating_value: Низшая теплота сгорания, МДж/м³
+    """
+
+    __slots__ = ('molar_mass', 'k', 'density', 'relative_density', 'cp',
+                 'heating_value')
+
+    def __init__(self, molar_mass: float, k: float, density: float,
+                 relative_density: float, cp: float, heating_value: float):
+        self.molar_mass = molar_mass
+        self.k = k
+        self.density = density
+        self.relative_density = relative_density
+        self.cp = cp
+        self.heating_value = heating_value
+
+    def as_dict(self) -> Dict[str, float]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name):.6g}' for name in self.__slots__)
+        return f'GasProperties({values})'
+
+
+# Свойства газа без заданного состава (прежние константы калькуляторов)
+DEFAULT_GAS = GasProperties(molar_mass=16.04, k=1.3, density=0.7,
+                            relative_density=0.6, cp=2200.0, heating_value=35.0)
+
+
+def mixture_properties(composition: CompositionKey) -> GasProperties:
+    """
+    Свойства смеси по составу (правила смешения ГОСТ 31369)
+
+    Args:
+        composition: Нормализованный состав (см. normalize_composition)
+
+    Returns:
+        Свойства газа
+    """
+    molar_mass = sum(x * COMPONENTS[name][0] for name, x in composition)
+    cp_molar = sum(x * THERMAL[name][0] for name, x in composition)
+    heat_molar = sum(x * THERMAL[name][1] for name, x in composition)
+
+    # Коэффициент сжимаемости при стандартных условиях
+    z = 1 - sum(x * THERMAL[name][2] for name, x in composition) ** 2
+    molar_volume = z * R * T_STANDARD / P_STANDARD  # м³/моль
+
+    density = molar_mass / 1000 / molar_volume
+    return GasProperties(
+        molar_mass=molar_mass,
+        k=cp_molar / (cp_molar - R),
+        density=density,
+        relative_density=density / AIR_DENSITY,
+        cp=cp_molar / (molar_mass / 1000),
+        heating_value=heat_molar / 1000 / molar_volume,
+    )
+
+
+@lru_cache(maxsize=256)
+def _cached_properties(composition: CompositionKey) -> GasProperties:
+    return mixture_properties(composition)
+
+
+def get_gas_properties(composition: Dict[str, float]) -> GasProperties:
+    """
+    Свойства газа заданного состава (кэшируются по составу)
+
+    Args:
+        composition: {компонент: мольная доля или %}
+
+    Returns:
+        Свойства газа (общий объект для одинаковых составов, не изменять)
+    """
+    return _cached_properties(normalize_composition(composition))
@@ -1,242 +1,521 @@
-"""
-Модуль расчетов для ГРС/ГРП
-СТО Газпром 3.3-2-1
-"""
-
-import math
-from typing import Dict, List, Tuple
-
-class GRSCalculator:
-    """Калькулятор для газораспределительных станций"""
-    
-    def __init__(self):
-        self.R = 8.314462618  # Универсальная газовая постоянная
-    
-    # ========== ТЕХНОЛОГИЧЕСКИЕ ОПЕРАЦИИ ==========
-    
-    def blowdown_separator(self, volume: float, pressure: float, 
-                          temperature: float, z: float = 0.95,
-                          n_blowdowns: int = 1) -> float:
-        """
-        1.2.1 Продувка сепараторов и пылеуловителей ГРС
-        
-        Args:
-            volume: Объем сепаратора, м³
-            pressure: Давление, МПа
-            temperature: Температура, К
-            z: Коэффициент сжимаемости
-            n_blowdowns: Количество продувок
-        
-        Returns:
-            Объем газа при н.у., м³
-        """
-        # Перевод давления в Па
-        p_pa = pressure * 1e6
-        
-        # Расчет количества вещества
-        n = (p_pa * volume) / (z * self.R * temperature)
-        
-        # Объем при нормальных условиях
-        p0 = 101325  # Па
-        t0 = 293.15  # К
-        v0 = n * self.R * t0 / p0
-        
-        return v0 * n_blowdowns
-    
-    def refuel_odorization(self, tank_volume: float, concentration: float,
-                          pressure: float, days: int = 30) -> float:
-        """
-        1.2.2 Заправка одоризационных и метанольных установок
-        
-        Args:
-            tank_volume: Объем бака, м³
-            concentration: Концентрация, кг/м³
-            pressure: Давление закачки, МПа
-            days: Период работы, дней
-        
-        Returns:
-            Расход газа на заправку, м³
-        """
-        # Объем заправки за период
-        refuel_volume = tank_volume * (days / 30)  # Упрощенно
-        
-        # Расход газа на создание давления
-        gas_volume = refuel_volume * (pressure / 0.1)  # Эмпирический коэффициент
-        
-        return gas_volume
-    
-    def diaphragm_replacement(self, pipe_diameter: float, pressure: float,
-                             time_isolated: float) -> float:
-        """
-        1.2.3 Ревизия и замена диафрагм на пункте замера расхода газа
-        
-        Args:
-            pipe_diameter: Диаметр трубопровода, мм
-            pressure: Давление в трубопроводе, МПа
-            time_isolated: Время отключения участка, ч
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Площадь сечения
-        area = math.pi * (pipe_diameter / 1000) ** 2 / 4
-        
-        # Объем участка для продувки
-        # Длина участка принимается 10 м (типовое значение)
-        length = 10
-        volume = area * length
-        
-        # Расход на продувку
-        gas_consumption = volume * (pressure / 0.101325)  # Приведение к н.у.
-        
-        return gas_consumption
-    
-    def gas_heating_before_regulators(self, gas_flow: float, 
-                                     temp_in: float, temp_out: float,
-                                     hours: float = 24) -> float:
-        """
-        1.2.4 Расход газа на ГРС для обогрева газа перед регуляторами
-        
-        Args:
-            gas_flow: Расход газа, м³/ч
-            temp_in: Температура на входе, К
-            temp_out: Температура на выходе, К
-            hours: Время работы, ч
-        
-        Returns:
-            Расход газа на обогрев, м³
-        """
-        # Теплоемкость газа (приближенно)
-        cp = 2200  # Дж/(кг·К)
-        
-        # Плотность газа при н.у.
-        rho = 0.7  # кг/м³
-        
-        # Тепловая мощность
-        delta_t = temp_out - temp_in
-        if delta_t <= 0:
-            return 0
-        
-        # Массовый расход
-        mass_flow = gas_flow * rho
-        
-        # Тепловая энергия
-        q = mass_flow * cp * delta_t * hours
-        
-        # Расход газа (теплотворная способность ~35 МДж/м³)
-        gas_for_heating = q / (35e6)
-        
-        return gas_for_heating
-    
-    # ========== ЭКСПЛУАТАЦИОННЫЕ РАСХОДЫ ==========
-    
-    def pneumatic_devices(self, n_devices: int, consumption_per_device: float,
-                         hours_per_day: float, days: int = 30) -> float:
-        """
-        1.2.5 Эксплуатация пневморегуляторов и пневмоустройств КИП
-        
-        Args:
-            n_devices: Количество устройств
-            consumption_per_device: Расход на устройство, м³/ч
-            hours_per_day: Часов работы в сутки
-            days: Количество дней
-        
-        Returns:
-            Расход газа, м³
-        """
-        total_hours = hours_per_day * days
-        return n_devices * consumption_per_device * total_hours
-    
-    def household_appliances(self, n_appliances: Dict[str, int],
-                            consumption_rates: Dict[str, float],
-                            hours_usage: Dict[str, float]) -> float:
-        """
-        1.2.7 Расход газа бытовыми приборами
-        
-        Args:
-            n_appliances: {тип_прибора: количество}
-            consumption_rates: {тип_прибора: расход, м³/ч}
-            hours_usage: {тип_прибора: часов_в_день}
-        
-        Returns:
-            Месячный расход, м³
-        """
-        total = 0
-        for appliance_type in n_appliances:
-            if appliance_type in consumption_rates and appliance_type in hours_usage:
-                daily = (n_appliances[appliance_type] * 
-                        consumption_rates[appliance_type] * 
-                        hours_usage[appliance_type])
-                monthly = daily * 30
-                total += monthly
-        
-        return total
-    
-    def heating_residential(self, area: float, heat_loss_coef: float,
-                          degree_days: float, efficiency: float = 0.85) -> float:
-        """
-        Расход газа на отопление жилых помещений
-        
-        Args:
-            area: Площадь помещений, м²
-            heat_loss_coef: Коэффициент теплопотерь, Вт/(м²·°C)
-            degree_days: Градусо-дни отопительного периода
-            efficiency: КПД отопительной системы
-        
-        Returns:
-            Расход газа за отопительный период, м³
-        """
-        # Теплопотери
-        heat_loss = area * heat_loss_coef * degree_days * 0.024
-        
-        # Расход газа (теплотворная способность ~35 МДж/м³)
-        gas_consumption = heat_loss / (35 * efficiency)
-        
-        return gas_consumption
-    
-    # ========== ДОПОЛНИТЕЛЬНЫЕ ФУНКЦИИ ==========
-    
-    def calculate_all_grs(self, parameters: Dict) -> Dict:
-        """Комплексный расчет всех расходов ГРС"""
-        
-        results = {
-            'separator_blowdown': 0,
-            'odorization_refuel': 0,
-            'diaphragm_replacement': 0,
-            'gas_heating': 0,
-            'pneumatic_devices': 0,
-            'household_appliances': 0,
-            'heating': 0,
-            'total': 0
-        }
-        
-        # Расчеты
-        if 'separator' in parameters:
-            sep = parameters['separator']
-            results['separator_blowdown'] = self.blowdown_separator(
-                volume=sep.get('volume', 10),
-                pressure=sep.get('pressure', 1.0),
-                temperature=sep.get('temperature', 293),
-                n_blowdowns=sep.get('n_blowdowns', 1)
-            )
-        
-        if 'odorization' in parameters:
-            odor = parameters['odorization']
-            results['odorization_refuel'] = self.refuel_odorization(
-                tank_volume=odor.get('tank_volume', 1),
-                concentration=odor.get('concentration', 10),
-                pressure=odor.get('pressure', 0.5)
-            )
-        
-        if 'pneumatic' in parameters:
-            pneu = parameters['pneumatic']
-            results['pneumatic_devices'] = self.pneumatic_devices(
-                n_devices=pneu.get('n_devices', 5),
-                consumption_per_device=pneu.get('consumption', 0.1),
-                hours_per_day=pneu.get('hours', 24)
-            )
-        
-        # Итог
-        results['total'] = sum(results.values())
-        
-        return results
\ No newline at end of file
+"""
+Модуль расчетов для ГРС/ГРП
+СТО Газпром 3.3-2-1
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .batch_utils import (column_count, columns_from_table, fill_missing,
+                          section_column)
+from .compressibility import get_z_table, resolve_z
+from .gas_properties import DEFAULT_GAS, get_gas_properties
+
+# Параметры по умолчанию для разделов calculate_all_grs
+GRS_DEFAULTS = {
+    'separator': {
+        'volume': 10, 'pressure': 1.0, 'temperature': 293, 'n_blowdowns': 1
+    },
+    'odorization': {
+        'tank_volume': 1, 'concentration': 10, 'pressure': 0.5, 'days': 30
+    },
+    'diaphragm': {
+        'pipe_diameter': 100, 'pressure': 1.0, 'time_isolated': 1
+    },
+    'gas_heating': {
+        'gas_flow': 1000, 'temp_in': 278.15, 'temp_out': 288.15, 'hours': 24
+    },
+    'pneumatic': {
+        'n_devices': 5, 'consumption': 0.1, 'hours': 24, 'days': 30
+    },
+    'appliances': {
+        'n_appliances': {}, 'consumption_rates': {}, 'hours_usage': {}
+    },
+    'heating': {
+        'area': 100, 'heat_loss_coef': 1.0, 'degree_days': 4000,
+        'efficiency': 0.85
+    }
+}
+
+# Статьи расхода ГРС в порядке отчета
+GRS_ITEMS = [
+    'separator_blowdown', 'odorization_refuel', 'diaphragm_replacement',
+    'gas_heating', 'pneumatic_devices', 'household_appliances', 'heating'
+]
+
+class GRSCalculator:
+    """Калькулятор для газораспределительных станций"""
+    
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618  # Универсальная газовая постоянная
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+    
+    # ========== ТЕХНОЛОГИЧЕСКИЕ ОПЕРАЦИИ ==========
+    
+    def blowdown_separator(self, volume: float, pressure: float, 
+                          temperature: float, z: Optional[float] = None,
+                          n_blowdowns: int = 1) -> float:
+        """
+        1.2.1 Продувка сепараторов и пылеуловителей ГРС
+        
+        Args:
+            volume: Объем сепаратора, м³
+            pressure: Давление, МПа
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            n_blowdowns: Количество продувок
+        
+        Returns:
+            Объем газа при н.у., м³
+        """
+        # Перевод давления в Па
+        p_pa = pressure * 1e6
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        
+        # Расчет количества вещества
+        n = (p_pa * volume) / (z * self.R * temperature)
+        
+        # Объем при нормальных условиях
+        p0 = 101325  # Па
+        t0 = 293.15  # К
+        v0 = n * self.R * t0 / p0
+        
+        return v0 * n_blowdowns
+    
+    def refuel_odorization(self, tank_volume: float, concentration: float,
+                          pressure: float, days: int = 30) -> float:
+        """
+        1.2.2 Заправка одоризационных и метанольных установок
+        
+        Args:
+            tank_volume: Объем бака, м³
+            concentration: Концентрация, кг/м³
+            pressure: Давление закачки, МПа
+            days: Период работы, дней
+        
+        Returns:
+            Расход газа на заправку, м³
+        """
+        # Объем заправки за период
+        refuel_volume = tank_volume * (days / 30)  # Упрощенно
+        
+        # Расход газа на создание давления
+        gas_volume = refuel_volume * (pressure / 0.1)  # Эмпирический коэффициент
+        
+        return gas_volume
+    
+    def diaphragm_replacement(self, pipe_diameter: float, pressure: float,
+                             time_isolated: float) -> float:
+        """
+        1.2.3 Ревизия и замена диафрагм на пункте замера расхода газа
+        
+        Args:
+            pipe_diameter: Диаметр трубопровода, мм
+            pressure: Давление в трубопроводе, МПа
+            time_isolated: Время отключения участка, ч
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Площадь сечения
+        area = math.pi * (pipe_diameter / 1000) ** 2 / 4
+        
+        # Объем участка для продувки
+        # Длина участка принимается 10 м (типовое значение)
+        length = 10
+        volume = area * length
+        
+        # Расход на продувку
+        gas_consumption = volume * (pressure / 0.101325)  # Приведение к н.у.
+        
+        return gas_consumption
+    
+    def gas_heating_before_regulators(self, gas_flow: float, 
+                                     temp_in: float, temp_out: float,
+                                     hours: float = 24) -> float:
+        """
+        1.2.4 Расход газа на ГРС для обогрева газа перед регуляторами
+        
+        Args:
+            gas_flow: Расход газа, м³/ч
+            temp_in: Температура на входе, К
+            temp_out: Температура на выходе, К
+            hours: Время работы, ч
+        
+        Returns:
+            Расход газа на обогрев, м³
+        """
+        # Теплоемкость газа
+        cp = self.gas.cp  # Дж/(кг·К)
+        
+        # Плотность газа при н.у.
+        rho = self.gas.density  # кг/м³
+        
+        # Тепловая мощность
+        delta_t = temp_out - temp_in
+        if delta_t <= 0:
+            return 0
+        
+        # Массовый расход
+        mass_flow = gas_flow * rho
+        
+        # Тепловая энергия
+        q = mass_flow * cp * delta_t * hours
+        
+        # Расход газа (низшая теплота сгорания, МДж/м³)
+        gas_for_heating = q / (self.gas.heating_value * 1e6)
+        
+        return gas_for_heating
+    
+    # ========== ЭКСПЛУАТАЦИОННЫЕ РАСХОДЫ ==========
+    
+    def pneumatic_devices(self, n_devices: int, consumption_per_device: float,
+                         hours_per_day: float, days: int = 30) -> float:
+        """
+        1.2.5 Эксплуатация пневморегуляторов и пневмоустройств КИП
+        
+        Args:
+            n_devices: Количество устройств
+            consumption_per_device: Расход на устройство, м³/ч
+            hours_per_day: Часов работы в сутки
+            days: Количество дней
+        
+        Returns:
+            Расход газа, м³
+        """
+        total_hours = hours_per_day * days
+        return n_devices * consumption_per_device * total_hours
+    
+    def household_appliances(self, n_appliances: Dict[str, int],
+                            consumption_rates: Dict[str, float],
+                            hours_usage: Dict[str, float]) -> float:
+        """
+        1.2.7 Расход газа бытовыми приборами
+        
+        Args:
+            n_appliances: {тип_прибора: количество}
+            consumption_rates: {тип_прибора: расход, м³/ч}
+            hours_usage: {тип_прибора: часов_в_день}
+        
+        Returns:
+            Месячный расход, м³
+        """
+        total = 0
+        for appliance_type in n_appliances:
+            if appliance_type in consumption_rates and appliance_type in hours_usage:
+                daily = (n_appliances[appliance_type] * 
+                        consumption_rates[appliance_type] * 
+                        hours_usage[appliance_type])
+                monthly = daily * 30
+                total += monthly
+        
+        return total
+    
+    def heating_residential(self, area: float, heat_loss_coef: float,
+                          degree_days: float, efficiency: float = 0.85) -> float:
+        """
+        Расход газа на отопление жилых помещений
+        
+        Args:
+            area: Площадь помещений, м²
+            heat_loss_coef: Коэффициент теплопотерь, Вт/(м²·°C)
+            degree_days: Градусо-дни отопительного периода
+            efficiency: КПД отопительной системы
+        
+        Returns:
+            Расход газа за отопительный период, м³
+        """
+        # Теплопотери
+        heat_loss = area * heat_loss_coef * degree_days * 0.024
+        
+        # Расход газа (низшая теплота сгорания, МДж/м³)
+        gas_consumption = heat_loss / (self.gas.heating_value * efficiency)
+        
+        return gas_consumption
+    
+    # ========== ДОПОЛНИТЕЛЬНЫЕ ФУНКЦИИ ==========
+    
+    def calculate_all_grs(self, parameters: Dict) -> Dict:
+        """Комплексный расчет всех расходов ГРС"""
+        
+        results = {
+            'separator_blowdown': 0,
+            'odorization_refuel': 0,
+            'diaphragm_replacement': 0,
+            'gas_heating': 0,
+            'pneumatic_devices': 0,
+            'household_appliances': 0,
+            'heating': 0,
+            'total': 0
+        }
+        
+        # Расчеты
+        if 'separator' in parameters:
+            sep = {**GRS_DEFAULTS['separator'], **parameters['separator']}
+            results['separator_blowdown'] = self.blowdown_separator(
+                volume=sep['volume'],
+                pressure=sep['pressure'],
+                temperature=sep['temperature'],
+                z=sep.get('z'),
+                n_blowdowns=sep['n_blowdowns']
+            )
+        
+        if 'odorization' in parameters:
+            odor = {**GRS_DEFAULTS['odorization'], **parameters['odorization']}
+            results['odorization_refuel'] = self.refuel_odorization(
+                tank_volume=odor['tank_volume'],
+                concentration=odor['concentration'],
+                pressure=odor['pressure'],
+                days=odor['days']
+            )
+        
+        if 'diaphragm' in parameters:
+            diaph = {**GRS_DEFAULTS['diaphragm'], **parameters['diaphragm']}
+            results['diaphragm_replacement'] = self.diaphragm_replacement(
+                pipe_diameter=diaph['pipe_diameter'],
+                pressure=diaph['pressure'],
+                time_isolated=diaph['time_isolated']
+            )
+        
+        if 'gas_heating' in parameters:
+            heat = {**GRS_DEFAULTS['gas_heating'], **parameters['gas_heating']}
+            results['gas_heating'] = self.gas_heating_before_regulators(
+                gas_flow=heat['gas_flow'],
+                temp_in=heat['temp_in'],
+                temp_out=heat['temp_out'],
+                hours=heat['hours']
+            )
+        
+        if 'pneumatic' in parameters:
+            pneu = {**GRS_DEFAULTS['pneumatic'], **parameters['pneumatic']}
+            results['pneumatic_devices'] = self.pneumatic_devices(
+                n_devices=pneu['n_devices'],
+                consumption_per_device=pneu['consumption'],
+                hours_per_day=pneu['hours'],
+                days=pneu['days']
+            )
+        
+        if 'appliances' in parameters:
+            appl = {**GRS_DEFAULTS['appliances'], **parameters['appliances']}
+            results['household_appliances'] = self.household_appliances(
+                n_appliances=appl['n_appliances'],
+                consumption_rates=appl['consumption_rates'],
+                hours_usage=appl['hours_usage']
+            )
+        
+        if 'heating' in parameters:
+            home = {**GRS_DEFAULTS['heating'], **parameters['heating']}
+            results['heating'] = self.heating_residential(
+                area=home['area'],
+                heat_loss_coef=home['heat_loss_coef'],
+                degree_days=home['degree_days'],
+                efficiency=home['efficiency']
+            )
+        
+        # Итог
+        results['total'] = sum(results.values())
+        
+        return results
+
+
+class GRSBatch:
+    """
+    Колоночный расчет расходов для парка ГРС
+
+    Методы повторяют формулы GRSCalculator для массивов NumPy.
+    Параметры calculate_all_grs задаются колонками
+    {раздел: {параметр: массив по станциям}} с теми же разделами и именами,
+    что и в GRSCalculator.calculate_all_grs (см. GRS_DEFAULTS). Бытовые
+    приборы задаются матрицами 'n_appliances', 'consumption_rates',
+    'hours_usage' размером (станции × типы приборов).
+    Результат — таблица {статья: массив по станциям}.
+    """
+
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+
+    # ========== СТАТЬИ РАСХОДА ==========
+
+    def blowdown_separator(self, volume, pressure, temperature, z=None,
+                           n_blowdowns=1) -> np.ndarray:
+        """1.2.1 Продувка сепараторов и пылеуловителей, м³"""
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        p_pa = np.asarray(pressure, dtype=float) * 1e6
+        n = (p_pa * volume) / (np.asarray(z, dtype=float)
+                               * self.R * temperature)
+        v0 = n * self.R * 293.15 / 101325
+
+        return v0 * n_blowdowns
+
+    def refuel_odorization(self, tank_volume, concentration, pressure,
+                           days=30) -> np.ndarray:
+        """1.2.2 Заправка одоризационных и метанольных установок, м³"""
+        refuel_volume = np.asarray(tank_volume, dtype=float) * (
+            np.asarray(days, dtype=float) / 30)
+
+        return refuel_volume * (np.asarray(pressure, dtype=float) / 0.1)
+
+    def diaphragm_replacement(self, pipe_diameter, pressure,
+                              time_isolated) -> np.ndarray:
+        """1.2.3 Ревизия и замена диафрагм, м³"""
+        area = math.pi * (np.asarray(pipe_diameter, dtype=float) / 1000) ** 2 / 4
+        volume = area * 10
+
+        return volume * (np.asarray(pressure, dtype=float) / 0.101325)
+
+    def gas_heating_before_regulators(self, gas_flow, temp_in, temp_out,
+                                      hours=24) -> np.ndarray:
+        """1.2.4 Расход газа на обогрев газа перед регуляторами, м³"""
+        delta_t = (np.asarray(temp_out, dtype=float)
+                   - np.asarray(temp_in, dtype=float))
+        mass_flow = np.asarray(gas_flow, dtype=float) * self.gas.density
+        q = mass_flow * self.gas.cp * delta_t * hours
+
+        return np.where(delta_t > 0, q / (self.gas.heating_value * 1e6), 0.0)
+
+    def pneumatic_devices(self, n_devices, consumption_per_device,
+                          hours_per_day, days=30) -> np.ndarray:
+        """1.2.5 Эксплуатация пневморегуляторов и пневмоустройств КИП, м³"""
+        total_hours = np.asarray(hours_per_day, dtype=float) * days
+
+        return np.asarray(n_devices, dtype=float) * consumption_per_device * total_hours
+
+    def household_appliances(self, n_appliances, consumption_rates,
+                             hours_usage) -> np.ndarray:
+        """
+        1.2.7 Расход газа бытовыми приборами, м³ в месяц
+
+        Args:
+            n_appliances: Количество приборов (станции × типы)
+            consumption_rates: Расход, м³/ч (станции × типы или типы)
+            hours_usage: Часов в день (станции × типы или типы)
+        """
+        daily = (np.atleast_2d(np.asarray(n_appliances, dtype=float))
+                 * np.asarray(consumption_rates, dtype=float)
+                 * np.asarray(hours_usage, dtype=float))
+
+        return np.nansum(daily, axis=1) * 30
+
+    def heating_residential(self, area, heat_loss_coef, degree_days,
+                            efficiency=0.85) -> np.ndarray:
+        """Расход газа на отопление жилых помещений, м³"""
+        heat_loss = (np.asarray(area, dtype=float) * heat_loss_coef
+                     * degree_days * 0.024)
+
+        return heat_loss / (self.gas.heating_value * np.asarray(efficiency, dtype=float))
+
+    # ========== КОМПЛЕКСНЫЙ РАСЧЕТ ==========
+
+    def calculate_all_grs(self, columns: Dict) -> Dict[str, np.ndarray]:
+        """
+        Комплексный расчет расходов для всех станций
+
+        Args:
+            columns: Колоночные параметры {раздел: {параметр: массив}}
+
+        Returns:
+            {статья: массив по станциям}, включая 'total', м³
+        """
+        n = column_count(columns)
+        results = {item: np.zeros(n) for item in GRS_ITEMS}
+
+        def section(name):
+            return {key: section_column(columns[name], key, default, n)
+                    for key, default in GRS_DEFAULTS[name].items()}
+
+        if 'separator' in columns:
+            sep = section('separator')
+            results['separator_blowdown'] = fill_missing(self.blowdown_separator(
+                volume=sep['volume'],
+                pressure=sep['pressure'],
+                temperature=sep['temperature'],
+                z=columns['separator'].get('z'),
+                n_blowdowns=sep['n_blowdowns']
+            ))
+
+        if 'odorization' in columns:
+            odor = section('odorization')
+            results['odorization_refuel'] = fill_missing(self.refuel_odorization(
+                tank_volume=odor['tank_volume'],
+                concentration=odor['concentration'],
+                pressure=odor['pressure'],
+                days=odor['days']
+            ))
+
+        if 'diaphragm' in columns:
+            diaph = section('diaphragm')
+            results['diaphragm_replacement'] = fill_missing(self.diaphragm_replacement(
+                pipe_diameter=diaph['pipe_diameter'],
+                pressure=diaph['pressure'],
+                time_isolated=diaph['time_isolated']
+            ))
+
+        if 'gas_heating' in columns:
+            heat = section('gas_heating')
+            results['gas_heating'] = fill_missing(self.gas_heating_before_regulators(
+                gas_flow=heat['gas_flow'],
+                temp_in=heat['temp_in'],
+                temp_out=heat['temp_out'],
+                hours=heat['hours']
+            ))
+
+        if 'pneumatic' in columns:
+            pneu = section('pneumatic')
+            results['pneumatic_devices'] = fill_missing(self.pneumatic_devices(
+                n_devices=pneu['n_devices'],
+                consumption_per_device=pneu['consumption'],
+                hours_per_day=pneu['hours'],
+                days=pneu['days']
+            ))
+
+        if 'appliances' in columns:
+            appl = columns['appliances']
+            results['household_appliances'] = self.household_appliances(
+                n_appliances=appl['n_appliances'],
+                consumption_rates=appl['consumption_rates'],
+                hours_usage=appl['hours_usage']
+            )
+
+        if 'heating' in columns:
+            home = section('heating')
+            results['heating'] = fill_missing(self.heating_residential(
+                area=home['area'],
+                heat_loss_coef=home['heat_loss_coef'],
+                degree_days=home['degree_days'],
+                efficiency=home['efficiency']
+            ))
+
+        results['total'] = sum(results[item] for item in GRS_ITEMS)
+
+        return results
+
+    def calculate_table(self, table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Расчет по плоской таблице с колонками вида 'раздел.параметр'
+
+        Args:
+            table: {'separator.volume': массив, 'pneumatic.n_devices': ...}
+
+        Returns:
+            {статья: массив по станциям}, включая 'total', м³
+        """
+        return self.calculate_all_grs(columns_from_table(table, GRS_DEFAULTS))
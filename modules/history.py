@@ -0,0 +1,235 @@
+"""
+Хранилище истории конвертаций (SQLite, режим WAL)
+
+Записи из обработчиков ставятся в очередь без ожидания и записываются
+отдельным потоком пакетами: одна транзакция на все записи, накопленные
+за интервал группового коммита. Чтение выполняется в пуле потоков
+с постраничной выборкой по индексу (user_id, timestamp, id).
+"""
+
+import asyncio
+import logging
+import math
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    category TEXT,
+    value REAL,
+    from_unit TEXT,
+    result REAL,
+    to_unit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_history_user_time
+    ON history (user_id, timestamp DESC, id DESC);
+"""
+
+INSERT = """
+INSERT INTO history (user_id, timestamp, category, value, from_unit, result, to_unit)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+logger = logging.getLogger(__name__)
+
+
+def _number(value) -> Optional[float]:
+    # Поля записи приходят из данных WebApp: нечисловые значения не сохраняются
+    if isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+class HistoryStore:
+    """Хранилище истории конвертаций пользователей"""
+
+    def __init__(self, path: str = "history.db", flush_interval: float = 0.05,
+                 max_batch: int = 5000):
+        """
+        Args:
+            path: Путь к файлу базы данных
+            flush_interval: Интервал группового коммита, с
+            max_batch: Максимальное число записей в одной транзакции
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._local = threading.local()
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # ========== ЗАПИСЬ ==========
+
+    def start(self):
+        """Запуск потока записи"""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop,
+                                            name="history-writer", daemon=True)
+            self._writer.start()
+
+    def close(self):
+        """Запись накопленных данных и остановка потока записи"""
+        if self._writer is not None:
+            self._queue.put(_STOP)
+            self._writer.join()
+            self._writer = None
+
+    def add(self, user_id: int, record: Dict, timestamp: Optional[float] = None):
+        """
+        Добавление записи в очередь (не блокирует цикл событий)
+
+        Числовые поля приводятся к float (нечисловые и NaN — None),
+        категория и единицы — к строкам.
+
+        Args:
+            user_id: Идентификатор пользователя Telegram
+            record: {'category', 'value', 'fromUnit', 'convertedValue', 'toUnit'}
+            timestamp: Время конвертации (по умолчанию текущее)
+        """
+        self._queue.put((
+            int(user_id),
+            time.time() if timestamp is None else float(timestamp),
+            _text(record.get("category")),
+            _number(record.get("value")),
+            _text(record.get("fromUnit")),
+            _number(record.get("convertedValue")),
+            _text(record.get("toUnit"))
+        ))
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, batch: List[tuple]):
+        # Ошибка пакета не должна останавливать поток записи: пакет
+        # повторяется по одной записи, отклоненные записи пропускаются
+        try:
+            with conn:
+                conn.executemany(INSERT, batch)
+            return
+        except sqlite3.Error as e:
+            logger.error("Ошибка записи пакета истории (%d записей): %s", len(batch), e)
+
+        for row in batch:
+            try:
+                with conn:
+                    conn.execute(INSERT, row)
+            except sqlite3.Error as e:
+                logger.error("Запись истории пропущена %r: %s", row, e)
+
+    def _write_loop(self):
+        conn = self._connect()
+        stopping = False
+
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._insert(conn, batch)
+
+        # Остаток очереди после сигнала остановки
+        rest = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rest.append(item)
+        if rest:
+            self._insert(conn, rest)
+
+        conn.close()
+
+    # ========== ЧТЕНИЕ ==========
+
+    def _read_connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def get_page_sync(self, user_id: int, limit: int = 10,
+                      before: Optional[Tuple[float, int]] = None
+                      ) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+        """
+        Страница истории пользователя, от новых к старым
+
+        Args:
+            user_id: Идентификатор пользователя
+            limit: Размер страницы
+            before: Курсор (timestamp, id) последней записи предыдущей страницы
+
+        Returns:
+            Записи страницы и курсор следующей страницы (None — страниц больше нет)
+        """
+        conn = self._read_connection()
+        if before is None:
+            rows = conn.execute(
+                "SELECT * FROM history WHERE user_id = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (user_id, limit + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT * FROM history WHERE user_id = ? AND (timestamp, id) < (?, ?) "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (user_id, before[0], before[1], limit + 1)
+            ).fetchall()
+
+        records = [dict(row) for row in rows[:limit]]
+        cursor = None
+        if len(rows) > limit:
+            cursor = (records[-1]["timestamp"], records[-1]["id"])
+
+        return records, cursor
+
+    async def get_page(self, user_id: int, limit: int = 10,
+                       before: Optional[Tuple[float, int]] = None
+                       ) -> Tuple[List[Dict], Optional[Tuple[float, int]]]:
+        """Асинхронная версия get_page_sync (выполняется в пуле потоков)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.get_page_sync, user_id, limit, before
+        )
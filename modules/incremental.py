@@ -0,0 +1,250 @@
+"""
+Инкрементальный пересчет комплексных расчетов ГРС и КС
+
+Каждая статья calculate_all_grs / calculate_all_kc зависит только от
+параметров своего раздела (см. DEPENDENCIES). Модель хранит параметры
+и результаты статей; при изменении параметра пересчитываются только
+статьи зависящего от него раздела, а итоги станции и парка
+корректируются на разность старого и нового значения статьи.
+
+Результаты совпадают с полным расчетом calculate_all_grs / calculate_all_kc
+тех же параметров; итоги парка при длительной работе накапливают
+погрешность округления порядка 1e-16 на изменение — rebuild() пересчитывает
+их заново.
+"""
+
+import copy
+import math
+from typing import Any, Dict, Optional
+
+from .grs_calculations import GRS_ITEMS, GRSCalculator
+from .kc_calculations import KC_DEFAULTS, KC_ITEMS, KCCalculator
+
+# Зависимости статей от разделов параметров: {вид: {статья: раздел}}
+DEPENDENCIES = {
+    'grs': {
+        'separator_blowdown': 'separator',
+        'odorization_refuel': 'odorization',
+        'diaphragm_replacement': 'diaphragm',
+        'gas_heating': 'gas_heating',
+        'pneumatic_devices': 'pneumatic',
+        'household_appliances': 'appliances',
+        'heating': 'heating',
+    },
+    'kc': {item: section for item, section, _ in KC_ITEMS},
+}
+
+ITEMS = {
+    'grs': list(GRS_ITEMS),
+    'kc': [item for item, _, _ in KC_ITEMS],
+}
+
+CALCULATORS = {'grs': GRSCalculator, 'kc': KCCalculator}
+
+# Обратные зависимости: {вид: {раздел: [статьи]}}
+SECTION_ITEMS = {
+    kind: {section: [item for item, s in items.items() if s == section]
+           for section in dict.fromkeys(items.values())}
+    for kind, items in DEPENDENCIES.items()
+}
+
+_KC_METHODS = {item: method for item, _, method in KC_ITEMS}
+
+
+class IncrementalStation:
+    """Параметры и результаты одной станции с пересчетом по зависимостям"""
+
+    def __init__(self, kind: str, parameters: Optional[Dict] = None,
+                 calculator=None):
+        """
+        Args:
+            kind: 'grs' или 'kc'
+            parameters: {раздел: {параметр: значение}} как для calculate_all_*
+            calculator: Калькулятор (по умолчанию — без состава газа)
+        """
+        if kind not in DEPENDENCIES:
+            raise ValueError(f"Неизвестный вид станции: {kind}")
+        self.kind = kind
+        self.calculator = calculator or CALCULATORS[kind]()
+        self.parameters: Dict[str, Dict[str, Any]] = copy.deepcopy(parameters or {})
+        self.items: Dict[str, float] = {item: 0 for item in ITEMS[kind]}
+        self._sections = SECTION_ITEMS[kind]
+
+        for section in self.parameters:
+            self._recalculate(section)
+
+    @property
+    def total(self) -> float:
+        """Итог станции, м³"""
+        return sum(self.items.values())
+
+    def results(self) -> Dict[str, float]:
+        """
+        Результаты в формате calculate_all_grs / calculate_all_kc
+
+        Returns:
+            Расход по статьям и итог, м³
+        """
+        return {**self.items, 'total': self.total}
+
+    def _calculate_item(self, item: str, section: str) -> float:
+        params = self.parameters.get(section)
+        if params is None:
+            return 0
+        if self.kind == 'kc':
+            method = getattr(self.calculator, _KC_METHODS[item])
+            return method(**{**KC_DEFAULTS[section], **params})
+        # Разделы ГРС передаются в метод с разными именами аргументов:
+        # расчет одного раздела через calculate_all_grs
+        return self.calculator.calculate_all_grs({section: params})[item]
+
+    def _recalculate(self, section: str) -> Dict[str, float]:
+        changes = {}
+        for item in self._sections.get(section, ()):
+            value = self._calculate_item(item, section)
+            delta = value - self.items[item]
+            self.items[item] = value
+            if delta:
+                changes[item] = delta
+        return changes
+
+    # ========== ИЗМЕНЕНИЕ ПАРАМЕТРОВ ==========
+
+    def update(self, section: str, **values) -> Dict[str, float]:
+        """
+        Изменение параметров раздела (раздел добавляется, если его не было)
+
+        Args:
+            section: Раздел параметров
+            values: Новые значения параметров
+
+        Returns:
+            Изменения статей {статья: разность}, м³
+        """
+        if section not in self._sections:
+            raise ValueError(f"Неизвестный раздел: {section}")
+
+        params = self.parameters.get(section)
+        if params is not None and all(key in params and params[key] == value
+                                      for key, value in values.items()):
+            return {}
+
+        # Копируются только вложенные словари (бытовые приборы ГРС)
+        self.parameters[section] = {
+            **(params or {}),
+            **{key: copy.deepcopy(value) if isinstance(value, dict) else value
+               for key, value in values.items()}
+        }
+        return self._recalculate(section)
+
+    def remove(self, section: str) -> Dict[str, float]:
+        """
+        Исключение раздела из расчета (статьи раздела становятся 0)
+
+        Args:
+            section: Раздел параметров
+
+        Returns:
+            Изменения статей {статья: разность}, м³
+        """
+        if self.parameters.pop(section, None) is None:
+            return {}
+        return self._recalculate(section)
+
+
+class IncrementalFleet:
+    """Парк станций одного вида с итогами, обновляемыми по разностям"""
+
+    def __init__(self, kind: str, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            kind: 'grs' или 'kc'
+            composition: Состав газа (общий для калькулятора парка)
+        """
+        if kind not in DEPENDENCIES:
+            raise ValueError(f"Неизвестный вид станции: {kind}")
+        self.kind = kind
+        self.calculator = CALCULATORS[kind](composition)
+        self.stations: Dict[Any, IncrementalStation] = {}
+        self.totals: Dict[str, float] = {item: 0.0 for item in ITEMS[kind]}
+        self.total = 0.0
+
+    def _apply(self, changes: Dict[str, float], sign: float = 1.0):
+        for item, delta in changes.items():
+            self.totals[item] += sign * delta
+            self.total += sign * delta
+
+    def add(self, station_id, parameters: Dict) -> Dict[str, float]:
+        """
+        Добавление (или замена) станции
+
+        Args:
+            station_id: Идентификатор станции
+            parameters: {раздел: {параметр: значение}}
+
+        Returns:
+            Результаты станции
+        """
+        if station_id in self.stations:
+            self.remove(station_id)
+        station = IncrementalStation(self.kind, parameters, self.calculator)
+        self.stations[station_id] = station
+        self._apply(station.items)
+        return station.results()
+
+    def remove(self, station_id):
+        """
+        Исключение станции из парка
+
+        Args:
+            station_id: Идентификатор станции
+        """
+        station = self.stations.pop(station_id)
+        self._apply(station.items, -1.0)
+
+    def update(self, station_id, section: str, **values) -> Dict[str, float]:
+        """
+        Изменение параметров раздела станции
+
+        Args:
+            station_id: Идентификатор станции
+            section: Раздел параметров
+            values: Новые значения параметров
+
+        Returns:
+            Изменения статей {статья: разность}, м³
+        """
+        changes = self.stations[station_id].update(section, **values)
+        self._apply(changes)
+        return changes
+
+    def remove_section(self, station_id, section: str) -> Dict[str, float]:
+        """
+        Исключение раздела параметров станции
+
+        Args:
+            station_id: Идентификатор станции
+            section: Раздел параметров
+
+        Returns:
+            Изменения статей {статья: разность}, м³
+        """
+        changes = self.stations[station_id].remove(section)
+        self._apply(changes)
+        return changes
+
+    def results(self) -> Dict[str, float]:
+        """
+        Итоги парка
+
+        Returns:
+            Сумма статей по станциям и общий итог, м³
+        """
+        return {**self.totals, 'total': self.total}
+
+    def rebuild(self):
+        """Точный пересчет итогов парка по результатам станций"""
+        self.totals = {item: math.fsum(station.items[item]
+                                       for station in self.stations.values())
+                       for item in ITEMS[self.kind]}
+        self.total = math.fsum(self.totals.values())
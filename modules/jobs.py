@@ -0,0 +1,396 @@
+"""
+Очередь тяжелых расчетов бота
+
+Задания (пакетный расчет CSV, расчеты парка станций, моделирование)
+выполняются в пуле процессов ProcessPoolExecutor, а не в цикле событий
+aiogram, поэтому обработчики остальных чатов отвечают без задержек.
+Задания ставятся в общую очередь asyncio фиксированного размера; число
+одновременно активных (ожидающих и выполняемых) заданий одного
+пользователя ограничено.
+
+Функция задания и ее аргументы должны передаваться в дочерний процесс
+(функции уровня модуля, числа, строки, массивы). Если функция принимает
+обработчик прогресса (аргумент progress, как process_csv), вызовы из
+дочернего процесса передаются в цикл событий через очередь
+multiprocessing. Отмена ожидающего задания мгновенная; выполняемое
+задание прерывается при ближайшем вызове progress (остальные досчитываются
+в своем процессе, результат отбрасывается).
+
+Процессы пула запускаются через forkserver (spawn, где его нет): к моменту
+запуска в процессе бота уже работают потоки (запись истории, чтение
+прогресса), и fork унаследовал бы их блокировки в неизвестном состоянии.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Способ запуска процессов пула (без fork, см. описание модуля)
+START_METHOD = ('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+                else 'spawn')
+
+
+class JobCancelled(Exception):
+    """Задание отменено пользователем"""
+
+
+# ========== ДОЧЕРНИЙ ПРОЦЕСС ==========
+
+# Очередь прогресса и флаги отмены (по номеру исполнителя);
+# передаются в процессы пула через initializer
+_progress_queue = None
+_cancel_flags = None
+
+
+def _init_worker(progress_queue, cancel_flags):
+    global _progress_queue, _cancel_flags
+    _progress_queue = progress_queue
+    _cancel_flags = cancel_flags
+
+
+class _Progress:
+    """Обработчик прогресса в дочернем процессе; проверяет флаг отмены"""
+
+    def __init__(self, job_id: int, slot: int):
+        self.job_id = job_id
+        self.slot = slot
+
+    def __call__(self, *args):
+        if _cancel_flags[self.slot]:
+            raise JobCancelled()
+        _progress_queue.put((self.job_id, args))
+
+
+def _run(job_id: int, slot: int, func: Callable, args: tuple, kwargs: dict,
+         progress: bool):
+    """Выполнение задания в процессе пула"""
+    if progress:
+        kwargs = {**kwargs, 'progress': _Progress(job_id, slot)}
+    return func(*args, **kwargs)
+
+
+# ========== ЗАДАНИЯ ==========
+
+class Job:
+    """Задание очереди"""
+
+    def __init__(self, job_id: int, user_id: int, name: str, func: Callable,
+                 args: tuple, kwargs: dict,
+                 progress: Optional[Callable[..., Any]] = None):
+        self.id = job_id
+        self.user_id = user_id
+        self.name = name or getattr(func, '__name__', 'job')
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.progress = progress
+
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancel_requested = False
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._done = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Время выполнения, с"""
+        if self.started is None:
+            return None
+        return (self.finished or time.time()) - self.started
+
+    async def wait(self) -> Any:
+        """
+        Ожидание завершения задания
+
+        Returns:
+            Результат функции задания
+
+        Raises:
+            JobCancelled: задание отменено
+            Exception: исключение функции задания
+        """
+        await self._done.wait()
+        if self.status == CANCELLED:
+            raise JobCancelled()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'name': self.name,
+            'status': self.status,
+            'created': self.created,
+            'duration': self.duration,
+            'error': None if self.error is None else str(self.error),
+        }
+
+
+class JobManager:
+    """Очередь заданий с пулом процессов и ограничениями на пользователя"""
+
+    def __init__(self, workers: int = 0, max_per_user: int = 2,
+                 queue_size: int = 100, history: int = 10):
+        """
+        Args:
+            workers: Число процессов пула (0 — по числу ядер)
+            max_per_user: Активных заданий на пользователя (0 — без ограничения)
+            queue_size: Наибольшее число ожидающих заданий
+            history: Завершенных заданий, хранимых на пользователя
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self.history = history
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.jobs: Dict[int, Job] = {}
+        self._finished: Dict[int, Deque[Job]] = {}
+        self._ids = itertools.count(1)
+        self._running: List[Optional[Job]] = [None] * self.workers
+        self._tasks: List[asyncio.Task] = []
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._progress_queue = None
+        self._cancel_flags = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    # ========== ЗАПУСК И ОСТАНОВКА ==========
+
+    def start(self):
+        """Запуск пула и исполнителей (в работающем цикле событий)"""
+        if self._pool is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(self.queue_size)
+
+        context = multiprocessing.get_context(START_METHOD)
+        self._progress_queue = context.Queue()
+        self._cancel_flags = context.Array('b', self.workers, lock=False)
+        self._pool = self._create_pool()
+
+        self._reader = threading.Thread(target=self._read_progress,
+                                        name='jobs-progress', daemon=True)
+        self._reader.start()
+        self._tasks = [asyncio.create_task(self._execute(slot))
+                       for slot in range(self.workers)]
+
+    def _create_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context(START_METHOD),
+            initializer=_init_worker,
+            initargs=(self._progress_queue, self._cancel_flags)
+        )
+
+    async def close(self):
+        """Остановка: ожидающие задания отменяются, пул завершается"""
+        if self._pool is None:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        for job in list(self.jobs.values()):
+            if job.active:
+                job.cancel_requested = True
+                self._finish(job, CANCELLED)
+
+        # Выполняемые задания прерываются при ближайшем вызове progress
+        for slot in range(self.workers):
+            self._cancel_flags[slot] = 1
+
+        pool, self._pool = self._pool, None
+        await self._loop.run_in_executor(
+            None, lambda: pool.shutdown(wait=True, cancel_futures=True))
+        self._progress_queue.put(None)
+        await self._loop.run_in_executor(None, self._reader.join)
+
+    # ========== ЗАДАНИЯ ==========
+
+    def submit(self, user_id: int, func: Callable, *args, name: str = '',
+               progress: Optional[Callable[..., Any]] = None, **kwargs) -> Job:
+        """
+        Постановка задания в очередь
+
+        Args:
+            user_id: Пользователь (для ограничений и списка заданий)
+            func: Функция уровня модуля
+            args: Позиционные аргументы функции
+            name: Название задания для пользователя
+            progress: Обработчик прогресса (вызывается в цикле событий);
+                функции передается аргумент progress
+            kwargs: Именованные аргументы функции
+
+        Returns:
+            Задание
+
+        Raises:
+            ValueError: превышено число заданий пользователя или очередь полна
+        """
+        if self._pool is None:
+            raise RuntimeError("Очередь заданий не запущена")
+
+        active = sum(1 for job in self.jobs.values()
+                     if job.user_id == user_id and job.active)
+        if self.max_per_user and active >= self.max_per_user:
+            raise ValueError(f"Уже выполняется заданий: {active}, дождитесь "
+                             f"завершения или отмените (/cancel)")
+        if self.queue.full():
+            raise ValueError("Очередь расчетов заполнена, попробуйте позже")
+
+        job = Job(next(self._ids), user_id, name, func, args, kwargs, progress)
+        self.jobs[job.id] = job
+        self.queue.put_nowait(job)
+        return job
+
+    def cancel(self, job_id: int, user_id: Optional[int] = None) -> bool:
+        """
+        Отмена задания
+
+        Args:
+            job_id: Номер задания
+            user_id: Пользователь (отменить можно только свое задание)
+
+        Returns:
+            True, если задание было активно и отменяется
+        """
+        job = self.jobs.get(job_id)
+        if job is None or not job.active or job.cancel_requested:
+            return False
+        if user_id is not None and job.user_id != user_id:
+            return False
+
+        job.cancel_requested = True
+        if job.status == QUEUED:
+            # Исполнитель пропустит задание при выборке из очереди
+            self._finish(job, CANCELLED)
+        else:
+            self._cancel_flags[self._running.index(job)] = 1
+        return True
+
+    def user_jobs(self, user_id: int) -> List[Job]:
+        """Активные и последние завершенные задания пользователя"""
+        active = [job for job in self.jobs.values()
+                  if job.user_id == user_id and job.active]
+        return active + list(reversed(self._finished.get(user_id, ())))
+
+    def stats(self) -> Dict[str, int]:
+        """Состояние очереди"""
+        return {
+            'workers': self.workers,
+            'queued': sum(1 for job in self.jobs.values() if job.status == QUEUED),
+            'running': sum(1 for job in self._running if job is not None),
+            'completed': self.completed,
+            'failed': self.failed,
+            'cancelled': self.cancelled,
+        }
+
+    # ========== ВЫПОЛНЕНИЕ ==========
+
+    async def _execute(self, slot: int):
+        """Исполнитель: одно задание за раз в одном процессе пула"""
+        while True:
+            job = await self.queue.get()
+            if job.status != QUEUED:
+                continue
+
+            job.status = RUNNING
+            job.started = time.time()
+            self._running[slot] = job
+            self._cancel_flags[slot] = 0
+            pool = self._pool
+            try:
+                result = await self._loop.run_in_executor(
+                    pool, _run, job.id, slot, job.func, job.args,
+                    job.kwargs, job.progress is not None)
+            except asyncio.CancelledError:
+                raise
+            except JobCancelled:
+                self._finish(job, CANCELLED)
+            except BrokenProcessPool as e:
+                # Процесс пула аварийно завершился (например, по памяти):
+                # задание не выполнено, пул пересоздается для следующих
+                logger.error("Пул процессов заданий поврежден: %s", e)
+                job.error = e
+                self._finish(job, FAILED)
+                if self._pool is pool:
+                    self._pool = self._create_pool()
+                    pool.shutdown(wait=False)
+            except Exception as e:
+                job.error = e
+                self._finish(job, CANCELLED if job.cancel_requested else FAILED)
+            else:
+                job.result = result
+                self._finish(job, CANCELLED if job.cancel_requested else DONE)
+            finally:
+                self._running[slot] = None
+
+    def _finish(self, job: Job, status: str):
+        if not job.active:
+            return
+        job.status = status
+        job.finished = time.time()
+        if status == CANCELLED:
+            job.result = None
+            self.cancelled += 1
+        elif status == FAILED:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+        del self.jobs[job.id]
+        finished = self._finished.setdefault(job.user_id, deque(maxlen=self.history))
+        finished.append(job)
+        job._done.set()
+
+    def _read_progress(self):
+        """Поток чтения прогресса из процессов пула"""
+        while True:
+            item = self._progress_queue.get()
+            if item is None:
+                return
+            try:
+                self._loop.call_soon_threadsafe(self._on_progress, *item)
+            except RuntimeError:
+                # Цикл событий закрыт без close()
+                return
+
+    def _on_progress(self, job_id: int, args: tuple):
+        job = self.jobs.get(job_id)
+        if job is None or job.progress is None or job.cancel_requested:
+            return
+        try:
+            job.progress(*args)
+        except Exception:
+            logger.exception("Ошибка обработчика прогресса задания %d", job_id)
@@ -1,212 +1,476 @@
-"""
-Модуль расчетов для компрессорных станций
-СТО Газпром 3.3-2-1
-"""
-
-import math
-
-class KCCalculator:
-    """Калькулятор для компрессорных станций"""
-    
-    def __init__(self):
-        self.R = 8.314462618
-    
-    # ========== ПУСКОВЫЕ ОПЕРАЦИИ ГПА ==========
-    
-    def gpa_startup(self, pipeline_volume: float, pressure: float,
-                   temperature: float, z: float = 0.95,
-                   n_starts: int = 1) -> float:
-        """
-        3.1 Количество газа, израсходованного на один пуск ГПА
-        
-        Args:
-            pipeline_volume: Объем пускового газопровода, м³
-            pressure: Давление пускового газа, МПа
-            temperature: Температура, К
-            z: Коэффициент сжимаемости
-            n_starts: Количество пусков
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Количество вещества
-        p_pa = pressure * 1e6
-        n = (p_pa * pipeline_volume) / (z * self.R * temperature)
-        
-        # Объем при н.у.
-        v0 = n * self.R * 293.15 / 101325
-        
-        return v0 * n_starts
-    
-    def compressor_venting(self, circuit_volume: float, pressure: float,
-                         venting_percentage: float = 0.1) -> float:
-        """
-        3.2 Количество газа, стравливаемого из контура нагнетателя
-        
-        Args:
-            circuit_volume: Объем контура, м³
-            pressure: Рабочее давление, МПа
-            venting_percentage: Доля стравливаемого газа
-        
-        Returns:
-            Объем стравленного газа, м³
-        """
-        # Объем газа в контуре при рабочих условиях
-        gas_volume = circuit_volume * (pressure / 0.101325)
-        
-        # Стравливаемый объем
-        vented_volume = gas_volume * venting_percentage
-        
-        return vented_volume
-    
-    def air_displacement(self, system_volume: float, purge_pressure: float,
-                        n_purges: int = 1) -> float:
-        """
-        3.3 Количество газа, использованного на вытеснение воздуха
-        
-        Args:
-            system_volume: Объем системы, м³
-            purge_pressure: Давление продувки, МПа
-            n_purges: Количество продувок
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Объем газа для продувки (3 объема системы)
-        gas_volume = 3 * system_volume * (purge_pressure / 0.101325)
-        
-        return gas_volume * n_purges
-    
-    # ========== ТЕХНИЧЕСКОЕ ОБСЛУЖИВАНИЕ ==========
-    
-    def seal_system_venting(self, seal_volume: float, pressure: float,
-                           venting_rate: float, hours: float) -> float:
-        """
-        3.4 Количество газа, стравливаемого из системы уплотнений
-        
-        Args:
-            seal_volume: Объем системы уплотнений, м³
-            pressure: Давление, МПа
-            venting_rate: Норма стравливания, м³/ч
-            hours: Время работы, ч
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Постоянное стравливание
-        continuous = venting_rate * hours
-        
-        # Разовое стравливание при остановке
-        one_time = seal_volume * (pressure / 0.101325) * 0.5
-        
-        return continuous + one_time
-    
-    def oil_tank_purging(self, tank_volume: float, pressure: float,
-                        n_purges_per_day: int, days: int = 30) -> float:
-        """
-        3.5 Количество газа, стравливаемого через свечи маслобаков
-        
-        Args:
-            tank_volume: Объем маслобака, м³
-            pressure: Давление продувки, МПа
-            n_purges_per_day: Продувок в сутки
-            days: Количество дней
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Объем газа на одну продувку
-        gas_per_purge = tank_volume * (pressure / 0.101325)
-        
-        # Общий расход
-        total_purges = n_purges_per_day * days
-        total_gas = gas_per_purge * total_purges
-        
-        return total_gas
-    
-    def liquid_degassing(self, liquid_volume: float, gas_content: float,
-                        pressure: float) -> float:
-        """
-        3.6 Количество газа дегазации дренируемой жидкости
-        
-        Args:
-            liquid_volume: Объем жидкости, м³
-            gas_content: Газосодержание, м³/м³
-            pressure: Давление, МПа
-        
-        Returns:
-            Объем газа, м³
-        """
-        # Объем растворенного газа
-        dissolved_gas = liquid_volume * gas_content
-        
-        # Объем при стравливании
-        gas_volume = dissolved_gas * (pressure / 0.101325)
-        
-        return gas_volume
-    
-    # ========== ЭКСПЛУАТАЦИОННЫЕ РАСХОДЫ ==========
-    
-    def gpa_enclosure_heating(self, enclosure_volume: float, 
-                             heat_loss_coef: float, delta_t: float,
-                             hours: float, efficiency: float = 0.8) -> float:
-        """
-        Расход газа на обогрев укрытий ГПА
-        
-        Args:
-            enclosure_volume: Объем укрытия, м³
-            heat_loss_coef: Коэффициент теплопотерь, Вт/(м³·°C)
-            delta_t: Разница температур, °C
-            hours: Часы работы
-            efficiency: КПД обогрева
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Тепловая мощность
-        heat_power = enclosure_volume * heat_loss_coef * delta_t
-        
-        # Тепловая энергия
-        heat_energy = heat_power * hours * 3600  # Дж
-        
-        # Расход газа
-        gas_consumption = heat_energy / (35e6 * efficiency)
-        
-        return gas_consumption
-    
-    def thermal_oxidation(self, waste_gas_flow: float, hours: float) -> float:
-        """
-        Расход газа на установки термического обезвреживания
-        
-        Args:
-            waste_gas_flow: Расход сбрасываемого газа, м³/ч
-            hours: Время работы, ч
-        
-        Returns:
-            Расход газа на поддержание горения, м³
-        """
-        # Газ на поддержание горения (10% от расхода)
-        support_gas = waste_gas_flow * 0.1 * hours
-        
-        return support_gas
-    
-    # ========== КОМПЛЕКСНЫЙ РАСЧЕТ ==========
-    
-    def calculate_all_kc(self, parameters: Dict) -> Dict:
-        """Комплексный расчет всех расходов КС"""
-        
-        results = {
-            'gpa_startup': 0,
-            'compressor_venting': 0,
-            'air_displacement': 0,
-            'seal_venting': 0,
-            'oil_tank_purging': 0,
-            'liquid_degassing': 0,
-            'enclosure_heating': 0,
-            'thermal_oxidation': 0,
-            'total': 0
-        }
-        
-        # Расчеты на основе параметров
-        
-        return results
\ No newline at end of file
+"""
+Модуль расчетов для компрессорных станций
+СТО Газпром 3.3-2-1
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .batch_utils import (column_count, columns_from_records,
+                          columns_from_table, fill_missing, section_column)
+from .compressibility import get_z_table, resolve_z
+from .gas_properties import DEFAULT_GAS, get_gas_properties
+
+# Параметры по умолчанию для разделов calculate_all_kc
+KC_DEFAULTS = {
+    'startup': {
+        'pipeline_volume': 10, 'pressure': 2.0, 'temperature': 293,
+        'n_starts': 1
+    },
+    'venting': {
+        'circuit_volume': 20, 'pressure': 5.0, 'venting_percentage': 0.1
+    },
+    'air_displacement': {
+        'system_volume': 10, 'purge_pressure': 0.1, 'n_purges': 1
+    },
+    'seal': {
+        'seal_volume': 0.5, 'pressure': 5.0, 'venting_rate': 0.5,
+        'hours': 720
+    },
+    'oil_tank': {
+        'tank_volume': 5, 'pressure': 0.1, 'n_purges_per_day': 1, 'days': 30
+    },
+    'degassing': {
+        'liquid_volume': 1, 'gas_content': 2, 'pressure': 0.5
+    },
+    'enclosure': {
+        'enclosure_volume': 500, 'heat_loss_coef': 1.0, 'delta_t': 20,
+        'hours': 720, 'efficiency': 0.8
+    },
+    'thermal_oxidation': {
+        'waste_gas_flow': 10, 'hours': 720
+    }
+}
+
+# Статьи расхода: (ключ результата, раздел параметров, метод калькулятора)
+KC_ITEMS = [
+    ('gpa_startup', 'startup', 'gpa_startup'),
+    ('compressor_venting', 'venting', 'compressor_venting'),
+    ('air_displacement', 'air_displacement', 'air_displacement'),
+    ('seal_venting', 'seal', 'seal_system_venting'),
+    ('oil_tank_purging', 'oil_tank', 'oil_tank_purging'),
+    ('liquid_degassing', 'degassing', 'liquid_degassing'),
+    ('enclosure_heating', 'enclosure', 'gpa_enclosure_heating'),
+    ('thermal_oxidation', 'thermal_oxidation', 'thermal_oxidation')
+]
+
+class KCCalculator:
+    """Калькулятор для компрессорных станций"""
+    
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+    
+    # ========== ПУСКОВЫЕ ОПЕРАЦИИ ГПА ==========
+    
+    def gpa_startup(self, pipeline_volume: float, pressure: float,
+                   temperature: float, z: Optional[float] = None,
+                   n_starts: int = 1) -> float:
+        """
+        3.1 Количество газа, израсходованного на один пуск ГПА
+        
+        Args:
+            pipeline_volume: Объем пускового газопровода, м³
+            pressure: Давление пускового газа, МПа
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            n_starts: Количество пусков
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Количество вещества
+        p_pa = pressure * 1e6
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        n = (p_pa * pipeline_volume) / (z * self.R * temperature)
+        
+        # Объем при н.у.
+        v0 = n * self.R * 293.15 / 101325
+        
+        return v0 * n_starts
+    
+    def compressor_venting(self, circuit_volume: float, pressure: float,
+                         venting_percentage: float = 0.1) -> float:
+        """
+        3.2 Количество газа, стравливаемого из контура нагнетателя
+        
+        Args:
+            circuit_volume: Объем контура, м³
+            pressure: Рабочее давление, МПа
+            venting_percentage: Доля стравливаемого газа
+        
+        Returns:
+            Объем стравленного газа, м³
+        """
+        # Объем газа в контуре при рабочих условиях
+        gas_volume = circuit_volume * (pressure / 0.101325)
+        
+        # Стравливаемый объем
+        vented_volume = gas_volume * venting_percentage
+        
+        return vented_volume
+    
+    def air_displacement(self, system_volume: float, purge_pressure: float,
+                        n_purges: int = 1) -> float:
+        """
+        3.3 Количество газа, использованного на вытеснение воздуха
+        
+        Args:
+            system_volume: Объем системы, м³
+            purge_pressure: Давление продувки, МПа
+            n_purges: Количество продувок
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Объем газа для продувки (3 объема системы)
+        gas_volume = 3 * system_volume * (purge_pressure / 0.101325)
+        
+        return gas_volume * n_purges
+    
+    # ========== ТЕХНИЧЕСКОЕ ОБСЛУЖИВАНИЕ ==========
+    
+    def seal_system_venting(self, seal_volume: float, pressure: float,
+                           venting_rate: float, hours: float) -> float:
+        """
+        3.4 Количество газа, стравливаемого из системы уплотнений
+        
+        Args:
+            seal_volume: Объем системы уплотнений, м³
+            pressure: Давление, МПа
+            venting_rate: Норма стравливания, м³/ч
+            hours: Время работы, ч
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Постоянное стравливание
+        continuous = venting_rate * hours
+        
+        # Разовое стравливание при остановке
+        one_time = seal_volume * (pressure / 0.101325) * 0.5
+        
+        return continuous + one_time
+    
+    def oil_tank_purging(self, tank_volume: float, pressure: float,
+                        n_purges_per_day: int, days: int = 30) -> float:
+        """
+        3.5 Количество газа, стравливаемого через свечи маслобаков
+        
+        Args:
+            tank_volume: Объем маслобака, м³
+            pressure: Давление продувки, МПа
+            n_purges_per_day: Продувок в сутки
+            days: Количество дней
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Объем газа на одну продувку
+        gas_per_purge = tank_volume * (pressure / 0.101325)
+        
+        # Общий расход
+        total_purges = n_purges_per_day * days
+        total_gas = gas_per_purge * total_purges
+        
+        return total_gas
+    
+    def liquid_degassing(self, liquid_volume: float, gas_content: float,
+                        pressure: float) -> float:
+        """
+        3.6 Количество газа дегазации дренируемой жидкости
+        
+        Args:
+            liquid_volume: Объем жидкости, м³
+            gas_content: Газосодержание, м³/м³
+            pressure: Давление, МПа
+        
+        Returns:
+            Объем газа, м³
+        """
+        # Объем растворенного газа
+        dissolved_gas = liquid_volume * gas_content
+        
+        # Объем при стравливании
+        gas_volume = dissolved_gas * (pressure / 0.101325)
+        
+        return gas_volume
+    
+    # ========== ЭКСПЛУАТАЦИОННЫЕ РАСХОДЫ ==========
+    
+    def gpa_enclosure_heating(self, enclosure_volume: float, 
+                             heat_loss_coef: float, delta_t: float,
+                             hours: float, efficiency: float = 0.8) -> float:
+        """
+        Расход газа на обогрев укрытий ГПА
+        
+        Args:
+            enclosure_volume: Объем укрытия, м³
+            heat_loss_coef: Коэффициент теплопотерь, Вт/(м³·°C)
+            delta_t: Разница температур, °C
+            hours: Часы работы
+            efficiency: КПД обогрева
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Тепловая мощность
+        heat_power = enclosure_volume * heat_loss_coef * delta_t
+        
+        # Тепловая энергия
+        heat_energy = heat_power * hours * 3600  # Дж
+        
+        # Расход газа
+        gas_consumption = heat_energy / (self.gas.heating_value * 1e6 * efficiency)
+        
+        return gas_consumption
+    
+    def thermal_oxidation(self, waste_gas_flow: float, hours: float) -> float:
+        """
+        Расход газа на установки термического обезвреживания
+        
+        Args:
+            waste_gas_flow: Расход сбрасываемого газа, м³/ч
+            hours: Время работы, ч
+        
+        Returns:
+            Расход газа на поддержание горения, м³
+        """
+        # Газ на поддержание горения (10% от расхода)
+        support_gas = waste_gas_flow * 0.1 * hours
+        
+        return support_gas
+    
+    # ========== КОМПЛЕКСНЫЙ РАСЧЕТ ==========
+    
+    def calculate_all_kc(self, parameters: Dict) -> Dict:
+        """
+        Комплексный расчет всех расходов КС
+        
+        Args:
+            parameters: {раздел: {параметр: значение}}, разделы и
+                значения по умолчанию — см. KC_DEFAULTS
+        
+        Returns:
+            Расход по статьям и итог, м³
+        """
+        
+        results = {item: 0 for item, _, _ in KC_ITEMS}
+        
+        # Расчеты по разделам, заданным для станции
+        for item, section, method in KC_ITEMS:
+            if section in parameters:
+                params = {**KC_DEFAULTS[section], **parameters[section]}
+                results[item] = getattr(self, method)(**params)
+        
+        # Итог
+        results['total'] = sum(results.values())
+        
+        return results
+
+
+class KCBatch:
+    """
+    Векторизованный расчет расходов для парка компрессорных станций
+
+    Методы повторяют формулы KCCalculator для массивов NumPy, расчет
+    calculate_all_kc выполняется над колоночными параметрами
+    (см. modules.batch_utils) за один проход по всем станциям.
+    """
+
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+
+    # ========== СТАТЬИ РАСХОДА ==========
+
+    def gpa_startup(self, pipeline_volume, pressure, temperature, z=None,
+                    n_starts=1) -> np.ndarray:
+        """3.1 Расход газа на пуски ГПА, м³"""
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        p_pa = np.asarray(pressure, dtype=float) * 1e6
+        n = (p_pa * pipeline_volume) / (np.asarray(z, dtype=float)
+                                        * self.R * temperature)
+        v0 = n * self.R * 293.15 / 101325
+
+        return v0 * n_starts
+
+    def compressor_venting(self, circuit_volume, pressure,
+                           venting_percentage=0.1) -> np.ndarray:
+        """3.2 Объем газа, стравливаемого из контура нагнетателя, м³"""
+        gas_volume = (np.asarray(circuit_volume, dtype=float)
+                      * (np.asarray(pressure, dtype=float) / 0.101325))
+
+        return gas_volume * venting_percentage
+
+    def air_displacement(self, system_volume, purge_pressure,
+                         n_purges=1) -> np.ndarray:
+        """3.3 Расход газа на вытеснение воздуха, м³"""
+        gas_volume = (3 * np.asarray(system_volume, dtype=float)
+                      * (np.asarray(purge_pressure, dtype=float) / 0.101325))
+
+        return gas_volume * n_purges
+
+    def seal_system_venting(self, seal_volume, pressure, venting_rate,
+                            hours) -> np.ndarray:
+        """3.4 Расход газа, стравливаемого из системы уплотнений, м³"""
+        continuous = np.asarray(venting_rate, dtype=float) * hours
+        one_time = (np.asarray(seal_volume, dtype=float)
+                    * (np.asarray(pressure, dtype=float) / 0.101325) * 0.5)
+
+        return continuous + one_time
+
+    def oil_tank_purging(self, tank_volume, pressure, n_purges_per_day,
+                         days=30) -> np.ndarray:
+        """3.5 Расход газа через свечи маслобаков, м³"""
+        gas_per_purge = (np.asarray(tank_volume, dtype=float)
+                         * (np.asarray(pressure, dtype=float) / 0.101325))
+
+        return gas_per_purge * (np.asarray(n_purges_per_day) * days)
+
+    def liquid_degassing(self, liquid_volume, gas_content,
+                         pressure) -> np.ndarray:
+        """3.6 Объем газа дегазации дренируемой жидкости, м³"""
+        dissolved_gas = (np.asarray(liquid_volume, dtype=float)
+                         * gas_content)
+
+        return dissolved_gas * (np.asarray(pressure, dtype=float) / 0.101325)
+
+    def gpa_enclosure_heating(self, enclosure_volume, heat_loss_coef,
+                              delta_t, hours,
+                              efficiency=0.8) -> np.ndarray:
+        """Расход газа на обогрев укрытий ГПА, м³"""
+        heat_power = (np.asarray(enclosure_volume, dtype=float)
+                      * heat_loss_coef * delta_t)
+        heat_energy = heat_power * hours * 3600
+
+        return heat_energy / (self.gas.heating_value * 1e6
+                              * np.asarray(efficiency, dtype=float))
+
+    def thermal_oxidation(self, waste_gas_flow, hours) -> np.ndarray:
+        """Расход газа на установки термического обезвреживания, м³"""
+        return np.asarray(waste_gas_flow, dtype=float) * 0.1 * hours
+
+    # ========== КОМПЛЕКСНЫЙ РАСЧЕТ ==========
+
+    def calculate_all_kc(self, columns: Dict) -> Dict[str, np.ndarray]:
+        """
+        Комплексный расчет расходов для всех станций
+
+        Args:
+            columns: Колоночные параметры {раздел: {параметр: массив}}
+
+        Returns:
+            {статья: массив по станциям}, включая 'total', м³
+        """
+        n = column_count(columns)
+        results = {}
+
+        for item, section, method in KC_ITEMS:
+            if section not in columns:
+                results[item] = np.zeros(n)
+                continue
+
+            params = {
+                key: section_column(columns[section], key, default, n)
+                for key, default in KC_DEFAULTS[section].items()
+            }
+            # Необязательные параметры (например, z) передаются как есть
+            params.update((key, values)
+                          for key, values in columns[section].items()
+                          if key not in params)
+            results[item] = fill_missing(getattr(self, method)(**params))
+
+        results['total'] = sum(results[item] for item, _, _ in KC_ITEMS)
+
+        return results
+
+    def calculate_table(self, table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Расчет по плоской таблице с колонками вида 'раздел.параметр'
+
+        Args:
+            table: {'startup.pipeline_volume': массив, 'seal.hours': ...}
+
+        Returns:
+            {статья: массив по станциям}, включая 'total', м³
+        """
+        return self.calculate_all_kc(columns_from_table(table, KC_DEFAULTS))
+
+    def calculate_fleet(self, stations: List[Dict],
+                        workers: Optional[int] = None,
+                        chunk_size: int = 10000) -> Dict:
+        """
+        Расчет расходов по парку КС с итогами по станциям и по парку
+
+        Args:
+            stations: Параметры станций в формате KCCalculator.calculate_all_kc
+            workers: Число процессов (None или 1 — расчет в текущем процессе,
+                0 — по числу ядер)
+            chunk_size: Размер пакета станций для одного процесса
+
+        Returns:
+            {'stations': {статья: массив по станциям},
+             'fleet': {статья: итог по парку}}
+        """
+        chunks = [stations[i:i + chunk_size]
+                  for i in range(0, len(stations), chunk_size)]
+
+        if workers == 0:
+            workers = os.cpu_count() or 1
+
+        if workers and workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                parts = list(executor.map(
+                    partial(_calculate_kc_chunk, composition=self.composition),
+                    chunks
+                ))
+        else:
+            parts = [_calculate_kc_chunk(chunk, self.composition)
+                     for chunk in chunks]
+
+        keys = [item for item, _, _ in KC_ITEMS] + ['total']
+        per_station = {
+            key: (np.concatenate([part[key] for part in parts])
+                  if parts else np.zeros(0))
+            for key in keys
+        }
+
+        return {
+            'stations': per_station,
+            'fleet': {key: float(values.sum())
+                      for key, values in per_station.items()}
+        }
+
+
+def _calculate_kc_chunk(stations: List[Dict],
+                        composition: Optional[Dict[str, float]] = None
+                        ) -> Dict[str, np.ndarray]:
+    """Расчет пакета станций (выполняется в дочернем процессе)"""
+    columns = columns_from_records(stations, KC_DEFAULTS)
+    if not columns:
+        zeros = np.zeros(len(stations))
+        return {key: zeros for key in
+                [item for item, _, _ in KC_ITEMS] + ['total']}
+
+    return KCBatch(composition).calculate_all_kc(columns)
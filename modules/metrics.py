@@ -0,0 +1,286 @@
+"""
+Метрики в формате Prometheus (без внешних зависимостей)
+
+Счетчики и гистограммы хранятся в памяти процесса и отдаются по HTTP
+на /metrics в текстовом формате Prometheus. Пока метрики не включены
+(registry.enabled = False), middleware не регистрируются, методы
+калькуляторов не оборачиваются, а inc()/observe() сразу возвращаются.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from aiogram import BaseMiddleware
+from aiohttp import web
+
+# Границы корзин гистограмм, с
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALCULATION_BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3,
+                       0.01, 0.1, 1.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Registry:
+    """Набор метрик процесса"""
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics: List['_Metric'] = []
+
+    def register(self, metric: '_Metric'):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (), registry: Registry = registry):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+
+    kind = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        """
+        Увеличение счетчика
+
+        Args:
+            labels: Значения меток в порядке labelnames
+            amount: Приращение
+        """
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} '
+                         f'{_format_value(value)}')
+        return lines
+
+
+class Histogram(_Metric):
+    """Гистограмма с накопительными корзинами"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: Registry = registry):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счетчики корзин (последняя — +Inf), сумма, количество]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        """
+        Добавление наблюдения
+
+        Args:
+            value: Значение (например, длительность, с)
+            labels: Значения меток в порядке labelnames
+        """
+        if not self.registry.enabled:
+            return
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state else 0
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for labels, (counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket'
+                             f'{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f'{self.name}_sum{label_text} {_format_value(total)}')
+            lines.append(f'{self.name}_count{label_text} {count}')
+        return lines
+
+
+# ========== МЕТРИКИ БОТА ==========
+
+UPDATES = Counter('bot_updates_total', 'Полученные обновления', ['type'])
+UPDATE_ERRORS = Counter('bot_update_errors_total',
+                        'Обновления, обработка которых завершилась исключением',
+                        ['type'])
+HANDLER_LATENCY = Histogram('bot_handler_duration_seconds',
+                            'Длительность обработчиков', ['handler'])
+CALCULATIONS = Histogram('calculator_call_duration_seconds',
+                         'Длительность вызовов методов калькуляторов',
+                         ['calculator', 'method'], buckets=CALCULATION_BUCKETS)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Внешний middleware обновлений: счетчики обновлений и ошибок"""
+
+    async def __call__(self, handler: Callable[..., Awaitable[Any]],
+                       event: Any, data: Dict[str, Any]) -> Any:
+        event_type = getattr(event, 'event_type', type(event).__name__)
+        UPDATES.inc(event_type)
+        try:
+            return await handler(event, data)
+        except Exception:
+            UPDATE_ERRORS.inc(event_type)
+            raise
+
+
+class HandlerMetricsMiddleware(BaseMiddleware):
+    """Внутренний middleware событий: длительность конкретного обработчика"""
+
+    async def __call__(self, handler: Callable[..., Awaitable[Any]],
+                       event: Any, data: Dict[str, Any]) -> Any:
+        handler_object = data.get('handler')
+        name = (handler_object.callback.__name__
+                if handler_object is not None else 'unknown')
+        start = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - start, name)
+
+
+def setup_dispatcher(dp, observers: Sequence[str] = ('message', 'callback_query',
+                                                     'inline_query')):
+    """
+    Регистрация middleware метрик в диспетчере aiogram
+
+    Args:
+        dp: Диспетчер
+        observers: События, для которых измеряется длительность обработчиков
+    """
+    dp.update.outer_middleware(UpdateMetricsMiddleware())
+    handler_middleware = HandlerMetricsMiddleware()
+    for name in observers:
+        getattr(dp, name).middleware(handler_middleware)
+
+
+def instrument(cls: type, name: Optional[str] = None) -> type:
+    """
+    Замер длительности всех публичных методов класса калькулятора
+
+    Методы заменяются обертками в самом классе, поэтому вызывать
+    функцию следует один раз при запуске и только при включенных метриках.
+
+    Args:
+        cls: Класс калькулятора
+        name: Значение метки calculator (по умолчанию имя класса)
+
+    Returns:
+        Тот же класс
+    """
+    label = name or cls.__name__
+    for attribute, method in list(vars(cls).items()):
+        if attribute.startswith('_') or not callable(method):
+            continue
+        if getattr(method, '__metrics_wrapped__', False):
+            continue
+
+        def make_wrapper(method, attribute):
+            @wraps(method)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    CALCULATIONS.observe(time.perf_counter() - start, label, attribute)
+            wrapper.__metrics_wrapped__ = True
+            return wrapper
+
+        setattr(cls, attribute, make_wrapper(method, attribute))
+    return cls
+
+
+# ========== HTTP ==========
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """Обработчик GET /metrics"""
+    return web.Response(text=registry.render(),
+                        content_type='text/plain', charset='utf-8',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+
+async def start_metrics_server(host: str = '127.0.0.1',
+                               port: int = 9100) -> web.AppRunner:
+    """
+    Запуск отдельного HTTP-сервера метрик
+
+    Args:
+        host: Адрес
+        port: Порт
+
+    Returns:
+        AppRunner сервера (для остановки через cleanup())
+    """
+    app = web.Application()
+    app.router.add_get('/metrics', metrics_handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
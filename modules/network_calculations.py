@@ -0,0 +1,482 @@
+"""
+Модуль расчета установившегося режима газотранспортной сети
+СТО Газпром 2-3.5-051-2006
+"""
+
+import math
+from typing import Dict, Hashable, Optional
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import splu
+
+from .friction import (RELATIVE_DENSITY, REYNOLDS_LAMINAR, ROUGHNESS,
+                       VISCOSITY, friction_factor, reynolds, swamee_jain)
+
+
+class PipelineNetwork:
+    """
+    Сеть газопроводов: узлы, участки, отборы и компрессорные станции
+
+    Каждый участок описывается той же зависимостью, что и
+    PipelineCalculator.final_pressure:
+
+        p1² - p2² = λ·z·R·T·L·q² / d⁵
+
+    Давления в узлах и расходы на участках находятся методом Ньютона
+    по расходам и квадратам давлений (метод глобального градиента):
+    на каждой итерации решается разреженная узловая система. LU-разложение
+    сохраняется и переиспользуется на следующих итерациях и при расчете
+    близких режимов (например, после изменения отборов), пока сходимость
+    не ухудшится.
+
+    Участки с λ = NaN (или все участки при lambda_coef=None) получают
+    коэффициент сопротивления по уравнению Колбрука–Уайта: после расчета
+    режима λ пересчитываются по расходам, и режим уточняется с теми же
+    разложениями до согласования λ и расходов.
+    """
+
+    def __init__(self, temperature: float = 288.15, z: float = 0.95,
+                 lambda_coef: Optional[float] = 0.01,
+                 roughness: float = ROUGHNESS,
+                 relative_density: float = RELATIVE_DENSITY,
+                 viscosity: float = VISCOSITY):
+        self.R = 8.314462618
+
+        # Значения по умолчанию для участков
+        self.temperature = temperature
+        self.z = z
+        self.lambda_coef = math.nan if lambda_coef is None else lambda_coef
+        self.roughness = roughness
+
+        # Параметры газа для числа Рейнольдса
+        self.relative_density = relative_density
+        self.viscosity = viscosity
+
+        self._node_index: Dict[Hashable, int] = {}
+        self._node_pressure = []
+        self._node_offtake = []
+
+        self._seg_start = []
+        self._seg_end = []
+        self._seg_k = []
+        self._seg_diameter = []
+        self._seg_roughness = []
+        self._seg_lambda = []
+        self._seg_auto = []
+
+        self._comp_start = []
+        self._comp_end = []
+        self._comp_ratio = []
+
+        self._compiled = None
+        self._lu = None
+        self._conductance = None
+        self._flows = None
+        self._unknowns = None
+        self.factorizations = 0
+
+    # ========== ОПИСАНИЕ СЕТИ ==========
+
+    def add_node(self, node: Hashable, pressure: Optional[float] = None,
+                 offtake: float = 0.0) -> int:
+        """
+        Добавление узла сети
+
+        Args:
+            node: Идентификатор узла
+            pressure: Заданное давление (узел питания), МПа
+            offtake: Отбор газа из узла, млн м³/сут
+
+        Returns:
+            Индекс узла
+        """
+        if node in self._node_index:
+            raise ValueError(f"Узел {node!r} уже существует")
+
+        index = len(self._node_pressure)
+        self._node_index[node] = index
+        self._node_pressure.append(math.nan if pressure is None else pressure)
+        self._node_offtake.append(offtake)
+        self._invalidate()
+
+        return index
+
+    def add_segment(self, start: Hashable, end: Hashable, diameter: float,
+                    length: float, temperature: Optional[float] = None,
+                    z: Optional[float] = None,
+                    lambda_coef: Optional[float] = None,
+                    roughness: Optional[float] = None) -> int:
+        """
+        Добавление участка газопровода между узлами
+
+        Args:
+            start: Начальный узел
+            end: Конечный узел
+            diameter: Диаметр, мм
+            length: Длина, км
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+                (NaN — по уравнению Колбрука–Уайта)
+            roughness: Шероховатость стенок, м
+
+        Returns:
+            Индекс участка
+        """
+        lambda_coef = self.lambda_coef if lambda_coef is None else lambda_coef
+        roughness = self.roughness if roughness is None else roughness
+        auto = math.isnan(lambda_coef)
+        if auto:
+            # Начальное приближение — развитая турбулентность
+            lambda_coef = float(swamee_jain(1e7, roughness / (diameter / 1000)))
+
+        self._seg_start.append(self._node_index[start])
+        self._seg_end.append(self._node_index[end])
+        self._seg_k.append(self._resistance(
+            diameter, length,
+            self.temperature if temperature is None else temperature,
+            self.z if z is None else z,
+            lambda_coef
+        ))
+        self._seg_diameter.append(diameter)
+        self._seg_roughness.append(roughness)
+        self._seg_lambda.append(lambda_coef)
+        self._seg_auto.append(auto)
+        self._invalidate()
+
+        return len(self._seg_k) - 1
+
+    def add_compressor(self, start: Hashable, end: Hashable,
+                       ratio: float) -> int:
+        """
+        Добавление компрессорной станции между узлами
+
+        Args:
+            start: Узел на входе КС
+            end: Узел на выходе КС
+            ratio: Степень сжатия (p_вых / p_вх)
+
+        Returns:
+            Индекс КС
+        """
+        self._comp_start.append(self._node_index[start])
+        self._comp_end.append(self._node_index[end])
+        self._comp_ratio.append(ratio)
+        self._invalidate()
+
+        return len(self._comp_ratio) - 1
+
+    def set_offtake(self, node: Hashable, offtake: float):
+        """
+        Изменение отбора газа в узле (якобиан не сбрасывается)
+
+        Args:
+            node: Идентификатор узла
+            offtake: Отбор газа, млн м³/сут
+        """
+        index = self._node_index[node]
+        self._node_offtake[index] = offtake
+        if self._compiled is not None:
+            self._compiled['offtake'][index] = offtake
+
+    def set_pressure(self, node: Hashable, pressure: float):
+        """
+        Изменение давления в узле питания (якобиан не сбрасывается)
+
+        Args:
+            node: Идентификатор узла питания
+            pressure: Давление, МПа
+        """
+        index = self._node_index[node]
+        if math.isnan(self._node_pressure[index]):
+            raise ValueError(f"Узел {node!r} не является узлом питания")
+
+        self._node_pressure[index] = pressure
+        if self._compiled is not None:
+            self._compiled['pressure'][index] = pressure
+
+    # ========== РАСЧЕТ РЕЖИМА ==========
+
+    def solve(self, tol: float = 1e-6, max_iter: int = 50,
+              friction_tol: float = 1e-6) -> Dict:
+        """
+        Расчет давлений в узлах и расходов на участках
+
+        Args:
+            tol: Допустимая невязка расходов, млн м³/сут
+            max_iter: Максимальное число итераций
+            friction_tol: Допустимое относительное изменение λ участков
+                с коэффициентом по Колбруку–Уайту
+
+        Returns:
+            Словарь с массивами давлений в узлах (МПа), расходов
+            на участках и через КС (млн м³/сут), притоков в узлах
+            питания, коэффициентов сопротивления участков, числом
+            итераций и невязкой
+        """
+        net = self._compile()
+        fixed = net['fixed']
+        n_free = net['n_free']
+
+        # Сглаживание закона сопротивления около нулевого расхода
+        if net['q_eps'] != tol:
+            net['q_eps'] = tol
+            self._lu = None
+
+        big_p = np.where(fixed, net['pressure'], 0.0) ** 2
+
+        # Горячий старт с решения предыдущего режима
+        if self._flows is None:
+            q = np.ones(len(net['seg_k']))
+            x = np.zeros(n_free + len(net['comp_ratio_sq']))
+            x[:n_free] = big_p.max(initial=0.0)
+        else:
+            q, x = self._flows.copy(), self._unknowns.copy()
+
+        iterations = 0
+        previous_change = math.inf
+        change = math.inf
+        friction_change = math.inf
+
+        while iterations < max_iter:
+            iterations += 1
+
+            if self._lu is None:
+                self._factorize(net, q)
+
+            dq, dx = self._newton_step(net, big_p, q, x)
+            change = np.abs(dq).max(initial=0.0)
+
+            # Старое разложение плохо описывает режим — обновляем
+            if change > 0.5 * previous_change and change > tol:
+                self._factorize(net, q)
+                dq, dx = self._newton_step(net, big_p, q, x)
+                change = np.abs(dq).max(initial=0.0)
+
+            q += dq
+            x += dx
+            previous_change = change
+            if change <= tol:
+                # Режим найден: уточняем λ по расходам; при заметном
+                # изменении продолжаем итерации с прежним разложением
+                friction_change = self._update_friction(net, q)
+                if friction_change <= friction_tol:
+                    break
+                previous_change = math.inf
+
+        if change > tol:
+            raise RuntimeError(
+                f"Расчет сети не сошелся за {max_iter} итераций "
+                f"(невязка {change:.3e} млн м³/сут)"
+            )
+        if friction_change > friction_tol:
+            raise RuntimeError(
+                f"Коэффициенты сопротивления сети не сошлись за {max_iter} "
+                f"итераций (изменение λ {friction_change:.3e})"
+            )
+
+        self._flows = q
+        self._unknowns = x
+
+        n_nodes = net['n_nodes']
+        big_p[~fixed] = x[:n_free]
+        comp_flows = x[n_free:]
+
+        # Приток в узлах питания — из баланса
+        balance = (np.bincount(net['seg_start'], q, n_nodes)
+                   - np.bincount(net['seg_end'], q, n_nodes)
+                   + np.bincount(net['comp_start'], comp_flows, n_nodes)
+                   - np.bincount(net['comp_end'], comp_flows, n_nodes)
+                   + net['offtake'])
+
+        return {
+            'pressures': np.sqrt(np.maximum(big_p, 0)),
+            'flows': q.copy(),
+            'compressor_flows': comp_flows.copy(),
+            'supply': np.where(fixed, balance, 0.0),
+            'friction_factors': net['seg_lambda'].copy(),
+            'iterations': iterations,
+            'residual': change
+        }
+
+    def node_index(self, node: Hashable) -> int:
+        """Индекс узла в массивах результата"""
+        return self._node_index[node]
+
+    # ========== ВНУТРЕННИЕ РАСЧЕТЫ ==========
+
+    def _resistance(self, diameter: float, length: float, temperature: float,
+                    z: float, lambda_coef: float) -> float:
+        """Коэффициент k участка: p1² - p2² = k·q², МПа² и млн м³/сут"""
+        d_m = diameter / 1000
+        l_m = length * 1000
+        q_scale = 1e6 / (24 * 3600)
+
+        return (lambda_coef * z * self.R * temperature * l_m / d_m**5
+                * q_scale**2 / 1e12)
+
+    def _invalidate(self):
+        self._compiled = None
+        self._lu = None
+        self._conductance = None
+        self._flows = None
+        self._unknowns = None
+
+    def _compile(self) -> Dict:
+        if self._compiled is not None:
+            return self._compiled
+
+        pressure = np.array(self._node_pressure, dtype=float)
+        fixed = ~np.isnan(pressure)
+        n_nodes = len(pressure)
+        n_free = int((~fixed).sum())
+
+        # Номер неизвестной для свободных узлов, -1 для узлов питания
+        unknown = np.full(n_nodes, -1, dtype=np.int64)
+        unknown[~fixed] = np.arange(n_free)
+
+        comp_start = np.array(self._comp_start, dtype=np.int64)
+        comp_end = np.array(self._comp_end, dtype=np.int64)
+        if np.any(fixed[comp_start] & fixed[comp_end]):
+            raise ValueError("КС не может соединять два узла питания")
+
+        self._compiled = {
+            'q_eps': None,
+            'n_nodes': n_nodes,
+            'n_free': n_free,
+            'fixed': fixed,
+            'unknown': unknown,
+            'pressure': pressure,
+            'offtake': np.array(self._node_offtake, dtype=float),
+            'seg_start': np.array(self._seg_start, dtype=np.int64),
+            'seg_end': np.array(self._seg_end, dtype=np.int64),
+            'seg_k': np.array(self._seg_k, dtype=float),
+            'seg_lambda': np.array(self._seg_lambda, dtype=float),
+            'seg_auto': np.array(self._seg_auto, dtype=bool),
+            'seg_diameter': np.array(self._seg_diameter, dtype=float),
+            'seg_roughness': np.array(self._seg_roughness, dtype=float),
+            'comp_start': comp_start,
+            'comp_end': comp_end,
+            'comp_ratio_sq': np.array(self._comp_ratio, dtype=float) ** 2
+        }
+
+        return self._compiled
+
+    def _friction(self, net: Dict, q: np.ndarray):
+        """
+        Сглаженный закон сопротивления φ(q) = k·q·√(q² + ε²) и его производная
+
+        При |q| >> ε совпадает с k·q·|q|, около нуля остается линейным,
+        что сохраняет квадратичную сходимость на участках без потока.
+        """
+        k = net['seg_k']
+        smooth = np.sqrt(q**2 + net['q_eps']**2)
+        return k * q * smooth, k * (smooth + q**2 / smooth)
+
+    def _update_friction(self, net: Dict, q: np.ndarray) -> float:
+        """
+        Пересчет λ участков по Колбруку–Уайту для текущих расходов
+
+        Число Рейнольдса ограничено снизу границей ламинарного режима:
+        около нулевого расхода закон сопротивления и так сглажен, а
+        k участка должен оставаться положительным.
+
+        Returns:
+            Наибольшее относительное изменение λ
+        """
+        auto = net['seg_auto']
+        if not auto.any():
+            return 0.0
+
+        d = net['seg_diameter'][auto]
+        re = np.maximum(reynolds(q[auto], d, self.relative_density, self.viscosity),
+                        REYNOLDS_LAMINAR)
+        lam = friction_factor(re, net['seg_roughness'][auto] / (d / 1000))
+
+        old = net['seg_lambda'][auto]
+        net['seg_k'][auto] *= lam / old
+        net['seg_lambda'][auto] = lam
+
+        return float(np.abs(lam / old - 1).max())
+
+    def _factorize(self, net: Dict, q: np.ndarray):
+        """
+        Разложение узловой матрицы
+
+        Закон сопротивления линеаризуется в точке q с проводимостью
+        c = 1 / φ'(q); узловая матрица собирается из c и условий КС.
+        """
+        n_free = net['n_free']
+        n_comp = len(net['comp_ratio_sq'])
+        size = n_free + n_comp
+        unknown = net['unknown']
+
+        c = 1 / self._friction(net, q)[1]
+
+        a = unknown[net['seg_start']]
+        b = unknown[net['seg_end']]
+        comp = n_free + np.arange(n_comp)
+        ones = np.ones(n_comp)
+
+        # Баланс узлов: участки, расход через КС; затем уравнения КС
+        rows = np.concatenate([a, b, a, b, unknown[net['comp_start']],
+                               unknown[net['comp_end']], comp, comp])
+        cols = np.concatenate([a, b, b, a, comp, comp,
+                               unknown[net['comp_end']],
+                               unknown[net['comp_start']]])
+        vals = np.concatenate([c, c, -c, -c, ones, -ones, ones,
+                               -net['comp_ratio_sq']])
+        mask = (rows >= 0) & (cols >= 0)
+
+        matrix = sparse.csc_matrix(
+            (vals[mask], (rows[mask], cols[mask])), shape=(size, size)
+        )
+        self._lu = splu(matrix)
+        self._conductance = c
+        self.factorizations += 1
+
+    def _newton_step(self, net: Dict, big_p: np.ndarray, q: np.ndarray,
+                     x: np.ndarray):
+        """
+        Шаг Ньютона (или хорды при устаревшем разложении)
+
+        Returns:
+            Приращения расходов на участках и вектора неизвестных
+            (квадраты давлений в свободных узлах, расходы через КС)
+        """
+        fixed = net['fixed']
+        n_free = net['n_free']
+        n_nodes = net['n_nodes']
+        start = net['seg_start']
+        end = net['seg_end']
+        comp_start = net['comp_start']
+        comp_end = net['comp_end']
+        c = self._conductance
+
+        big_p_all = big_p.copy()
+        big_p_all[~fixed] = x[:n_free]
+        comp_flows = x[n_free:]
+
+        # Невязка закона сопротивления: e = Δ - φ(q), δq = c·(e + δΔ)
+        phi = self._friction(net, q)[0]
+        cq = c * (big_p_all[start] - big_p_all[end] - phi)
+
+        balance = (np.bincount(start, q + cq, n_nodes)
+                   - np.bincount(end, q + cq, n_nodes)
+                   + np.bincount(comp_start, comp_flows, n_nodes)
+                   - np.bincount(comp_end, comp_flows, n_nodes)
+                   + net['offtake'])
+
+        rhs = np.empty(len(x))
+        rhs[:n_free] = -balance[~fixed]
+        rhs[n_free:] = (net['comp_ratio_sq'] * big_p_all[comp_start]
+                        - big_p_all[comp_end])
+
+        dx = self._lu.solve(rhs)
+
+        dp = np.zeros(n_nodes)
+        dp[~fixed] = dx[:n_free]
+        dq = cq + c * (dp[start] - dp[end])
+
+        return dq, dx
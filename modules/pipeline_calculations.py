@@ -1,280 +1,724 @@
-"""
-Модуль расчетов для магистральных газопроводов
-СТО Газпром 2-3.5-051-2006
-"""
-
-import math
-
-class PipelineCalculator:
-    """Калькулятор для трубопроводов"""
-    
-    def __init__(self):
-        self.R = 8.314462618
-    
-    # ========== ГЕОМЕТРИЧЕСКИЕ РАСЧЕТЫ ==========
-    
-    def pipeline_volume(self, diameter: float, length: float,
-                       roughness: float = 0.0001) -> float:
-        """
-        Геометрический объем участка газопровода
-        
-        Args:
-            diameter: Внутренний диаметр, мм
-            length: Длина участка, км
-            roughness: Шероховатость стенок, м
-        
-        Returns:
-            Объем, м³
-        """
-        # Переводим в метры
-        d_m = diameter / 1000
-        l_m = length * 1000
-        
-        # Объем
-        volume = math.pi * d_m**2 / 4 * l_m
-        
-        return volume
-    
-    # ========== РАСЧЕТЫ ПАРАМЕТРОВ ==========
-    
-    def pipeline_capacity(self, diameter: float, pressure_start: float,
-                         pressure_end: float, length: float,
-                         temperature: float, z: float = 0.95,
-                         lambda_coef: float = 0.01) -> float:
-        """
-        Расчет пропускной способности газопровода
-        
-        Args:
-            diameter: Диаметр, мм
-            pressure_start: Начальное давление, МПа
-            pressure_end: Конечное давление, МПа
-            length: Длина, км
-            temperature: Температура газа, К
-            z: Коэффициент сжимаемости
-            lambda_coef: Коэффициент гидравлического сопротивления
-        
-        Returns:
-            Пропускная способность, млн м³/сут
-        """
-        # Переводим в метры и паскали
-        d_m = diameter / 1000
-        p1_pa = pressure_start * 1e6
-        p2_pa = pressure_end * 1e6
-        l_m = length * 1000
-        
-        # Формула для изотермического потока
-        a = math.pi * d_m**2 / 4
-        numerator = (p1_pa**2 - p2_pa**2) * d_m**5
-        denominator = lambda_coef * z * self.R * temperature * l_m
-        
-        if denominator == 0:
-            return 0
-        
-        q = 0.03848 * math.sqrt(numerator / denominator)
-        
-        # Переводим в млн м³/сут
-        q_million = q * 3600 * 24 / 1e6
-        
-        return q_million
-    
-    def final_pressure(self, diameter: float, pressure_start: float,
-                      flow_rate: float, length: float,
-                      temperature: float, z: float = 0.95) -> float:
-        """
-        Расчет конечного давления в участке газопровода
-        
-        Args:
-            diameter: Диаметр, мм
-            pressure_start: Начальное давление, МПа
-            flow_rate: Расход газа, млн м³/сут
-            length: Длина, км
-            temperature: Температура, К
-            z: Коэффициент сжимаемости
-        
-        Returns:
-            Конечное давление, МПа
-        """
-        # Переводим в м³/с
-        q = flow_rate * 1e6 / (24 * 3600)
-        
-        # Переводим в метры и паскали
-        d_m = diameter / 1000
-        p1_pa = pressure_start * 1e6
-        l_m = length * 1000
-        
-        # Формула
-        lambda_coef = 0.01  # типовое значение
-        a = math.pi * d_m**2 / 4
-        
-        p2_sq = p1_pa**2 - (lambda_coef * z * self.R * temperature * l_m * q**2) / d_m**5
-        p2_sq = max(p2_sq, 0)
-        
-        p2_pa = math.sqrt(p2_sq)
-        
-        return p2_pa / 1e6
-    
-    # ========== РАСЧЕТЫ РАСХОДА ==========
-    
-    def gas_through_hole(self, hole_diameter: float, pressure: float,
-                        temperature: float, z: float = 0.95,
-                        discharge_coef: float = 0.62) -> float:
-        """
-        Расчет расхода газа через отверстие (свищ, микротрещина)
-        Методика ВНИИГАЗ
-        
-        Args:
-            hole_diameter: Диаметр отверстия, мм
-            pressure: Давление в трубопроводе, МПа
-            temperature: Температура, К
-            z: Коэффициент сжимаемости
-            discharge_coef: Коэффициент истечения
-        
-        Returns:
-            Расход газа, м³/ч
-        """
-        # Площадь отверстия
-        area = math.pi * (hole_diameter / 1000)**2 / 4
-        
-        # Давление в Па
-        p_pa = pressure * 1e6
-        
-        # Плотность газа
-        molar_mass = 16.04  # для метана
-        rho = (p_pa * molar_mass) / (z * self.R * temperature)
-        
-        # Скорость истечения (критическое истечение)
-        k = 1.3  # показатель адиабаты
-        critical_pressure_ratio = (2 / (k + 1)) ** (k / (k - 1))
-        
-        if pressure / 0.101325 > 1 / critical_pressure_ratio:
-            # Критическое истечение
-            velocity = math.sqrt(k * self.R * temperature / molar_mass * 
-                               (2 / (k + 1)) ** ((k + 1) / (k - 1)))
-        else:
-            # Докритическое истечение
-            p0 = 101325  # атмосферное давление
-            velocity = math.sqrt(2 * k / (k - 1) * self.R * temperature / molar_mass *
-                               (1 - (p0 / p_pa) ** ((k - 1) / k)))
-        
-        # Расход
-        mass_flow = discharge_coef * area * rho * velocity
-        volume_flow = mass_flow / 0.7  # пересчет в объем при н.у.
-        
-        return volume_flow * 3600
-    
-    def gas_velocity(self, flow_rate: float, diameter: float,
-                    pressure: float, temperature: float) -> float:
-        """
-        Расчет линейной скорости газа в трубопроводе
-        
-        Args:
-            flow_rate: Расход газа, млн м³/сут
-            diameter: Диаметр трубопровода, мм
-            pressure: Давление, МПа
-            temperature: Температура, К
-        
-        Returns:
-            Скорость газа, м/с
-        """
-        # Переводим расход в м³/с при рабочих условиях
-        q_norm = flow_rate * 1e6 / (24 * 3600)  # м³/с при н.у.
-        
-        # Объемный расход при рабочих условиях
-        p_work = pressure  # МПа
-        t_work = temperature  # К
-        p_norm = 0.101325  # МПа
-        t_norm = 293.15  # К
-        
-        q_work = q_norm * (p_norm / p_work) * (t_work / t_norm)
-        
-        # Площадь сечения
-        area = math.pi * (diameter / 1000)**2 / 4
-        
-        # Скорость
-        velocity = q_work / area
-        
-        return velocity
-    
-    # ========== ТЕХНОЛОГИЧЕСКИЕ ОПЕРАЦИИ ==========
-    
-    def hydrate_plug_removal(self, pipeline_volume: float, pressure: float,
-                            n_injections: int = 3) -> float:
-        """
-        Расход газа на ликвидацию гидратных пробок
-        
-        Args:
-            pipeline_volume: Объем участка, м³
-            pressure: Давление продувки, МПа
-            n_injections: Количество закачек ингибитора
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Продувка после каждой закачки
-        gas_per_injection = pipeline_volume * (pressure / 0.101325)
-        
-        total_gas = gas_per_injection * n_injections
-        
-        return total_gas
-    
-    def pipeline_purging(self, volume: float, pressure: float,
-                        n_purges: int = 1) -> float:
-        """
-        Расход газа на продувку участка трубопровода
-        
-        Args:
-            volume: Объем участка, м³
-            pressure: Давление перед продувкой, МПа
-            n_purges: Количество продувок
-        
-        Returns:
-            Расход газа, м³
-        """
-        # Объем газа для одной продувки
-        gas_per_purge = volume * (pressure / 0.101325)
-        
-        return gas_per_purge * n_purges
-    
-    # ========== ТЕМПЕРАТУРА ТОЧКИ РОСЫ ==========
-    
-    def dew_point_conversion(self, dew_point_water: float, 
-                            pressure: float, method: str = "ISO18453") -> float:
-        """
-        Перевод температуры точки росы по воде (ТПРв) при различных давлениях
-        
-        Args:
-            dew_point_water: Точка росы по воде, °C
-            pressure: Давление, МПа
-            method: Методика расчета
-        
-        Returns:
-            Точка росы по воде при заданном давлении, °C
-        """
-        # Упрощенный расчет по формуле Магнуса
-        # Для точных расчетов нужны таблицы или сложные уравнения
-        
-        if method == "simplified":
-            # Упрощенная поправка: -0.5°C на каждые 0.1 МПа сверх атмосферного
-            pressure_correction = (pressure - 0.101325) / 0.1 * (-0.5)
-            corrected_dew_point = dew_point_water + pressure_correction
-            
-            return corrected_dew_point
-        else:
-            # Более точная формула
-            alpha = 17.27
-            beta = 237.7
-            
-            # Давление насыщенного пара при заданной точке росы
-            p_sat = 0.61094 * math.exp((alpha * dew_point_water) / (beta + dew_point_water))
-            
-            # Мольная доля воды
-            x_water = p_sat / (pressure * 1000)  # давление в кПа
-            
-            # Новая точка росы при заданном давлении
-            if x_water <= 0:
-                return -100  # очень низкая температура
-            
-            p_sat_new = x_water * pressure * 1000
-            dew_point_new = (beta * math.log(p_sat_new / 0.61094)) / (alpha - math.log(p_sat_new / 0.61094))
-            
-            return dew_point_new
\ No newline at end of file
+"""
+Модуль расчетов для магистральных газопроводов
+СТО Газпром 2-3.5-051-2006
+"""
+
+import math
+from typing import Dict, Optional
+
+import numpy as np
+
+from .compressibility import get_z_table, resolve_z
+from .dew_point import dew_point_iso, dew_point_simplified
+from .friction import ROUGHNESS, VISCOSITY, capacity_friction, pipe_friction
+from .gas_properties import DEFAULT_GAS, get_gas_properties
+
+def mean_pressure(pressure_start, pressure_end):
+    """
+    Среднее давление участка газопровода
+
+    Args:
+        pressure_start: Начальное давление, МПа
+        pressure_end: Конечное давление, МПа
+
+    Returns:
+        Среднее давление, МПа (0 при нулевых давлениях)
+    """
+    total = pressure_start + pressure_end
+    if isinstance(total, (int, float)):
+        if total == 0:
+            return 0.0
+        return 2 / 3 * (pressure_start + pressure_end**2 / total)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = 2 / 3 * (pressure_start + pressure_end**2 / total)
+    return np.where(total == 0, 0.0, mean)
+
+
+class PipelineCalculator:
+    """Калькулятор для трубопроводов"""
+    
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+        # Параметры газа для числа Рейнольдса
+        self.relative_density = self.gas.relative_density
+        self.viscosity = VISCOSITY
+    
+    # ========== ГЕОМЕТРИЧЕСКИЕ РАСЧЕТЫ ==========
+    
+    def pipeline_volume(self, diameter: float, length: float,
+                       roughness: float = 0.0001) -> float:
+        """
+        Геометрический объем участка газопровода
+        
+        Args:
+            diameter: Внутренний диаметр, мм
+            length: Длина участка, км
+            roughness: Шероховатость стенок, м
+        
+        Returns:
+            Объем, м³
+        """
+        # Переводим в метры
+        d_m = diameter / 1000
+        l_m = length * 1000
+        
+        # Объем
+        volume = math.pi * d_m**2 / 4 * l_m
+        
+        return volume
+    
+    # ========== РАСЧЕТЫ ПАРАМЕТРОВ ==========
+    
+    def pipeline_capacity(self, diameter: float, pressure_start: float,
+                         pressure_end: float, length: float,
+                         temperature: float, z: Optional[float] = None,
+                         lambda_coef: Optional[float] = 0.01,
+                         roughness: float = ROUGHNESS) -> float:
+        """
+        Расчет пропускной способности газопровода
+        
+        Args:
+            diameter: Диаметр, мм
+            pressure_start: Начальное давление, МПа
+            pressure_end: Конечное давление, МПа
+            length: Длина, км
+            temperature: Температура газа, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+                (None — по уравнению Колбрука–Уайта, согласованно с расходом)
+            roughness: Шероховатость стенок, м (при lambda_coef=None)
+        
+        Returns:
+            Пропускная способность, млн м³/сут
+        """
+        # Коэффициент сжимаемости при среднем давлении участка
+        if z is None:
+            p_mean = (None if self.z_table is None
+                      else mean_pressure(pressure_start, pressure_end))
+            z = resolve_z(z, self.z_table, p_mean, temperature)
+        
+        if lambda_coef is None:
+            # Расход пропорционален 1/√λ: λ по расходу при λ = 1
+            q_unit = self.pipeline_capacity(diameter, pressure_start,
+                                            pressure_end, length,
+                                            temperature, z, 1.0)
+            lambda_coef = float(capacity_friction(q_unit, diameter, roughness,
+                                                  self.relative_density,
+                                                  self.viscosity))
+        
+        # Переводим в метры и паскали
+        d_m = diameter / 1000
+        p1_pa = pressure_start * 1e6
+        p2_pa = pressure_end * 1e6
+        l_m = length * 1000
+        
+        # Формула для изотермического потока
+        a = math.pi * d_m**2 / 4
+        numerator = (p1_pa**2 - p2_pa**2) * d_m**5
+        denominator = lambda_coef * z * self.R * temperature * l_m
+        
+        if denominator == 0:
+            return 0
+        
+        q = 0.03848 * math.sqrt(numerator / denominator)
+        
+        # Переводим в млн м³/сут
+        q_million = q * 3600 * 24 / 1e6
+        
+        return q_million
+    
+    def final_pressure(self, diameter: float, pressure_start: float,
+                      flow_rate: float, length: float,
+                      temperature: float, z: Optional[float] = None,
+                      lambda_coef: Optional[float] = 0.01,
+                      roughness: float = ROUGHNESS) -> float:
+        """
+        Расчет конечного давления в участке газопровода
+        
+        Args:
+            diameter: Диаметр, мм
+            pressure_start: Начальное давление, МПа
+            flow_rate: Расход газа, млн м³/сут
+            length: Длина, км
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+                (None — по уравнению Колбрука–Уайта для заданного расхода)
+            roughness: Шероховатость стенок, м (при lambda_coef=None)
+        
+        Returns:
+            Конечное давление, МПа
+        """
+        if lambda_coef is None:
+            lambda_coef = float(pipe_friction(flow_rate, diameter, roughness,
+                                              self.relative_density,
+                                              self.viscosity))
+        
+        # Z по составу: оценка конечного давления при Z(p1),
+        # затем пересчет при среднем давлении участка
+        if z is None and self.z_table is not None:
+            z_start = self.z_table(pressure_start, temperature)
+            p_end = self.final_pressure(diameter, pressure_start, flow_rate,
+                                        length, temperature, z_start,
+                                        lambda_coef)
+            z = self.z_table(mean_pressure(pressure_start, p_end), temperature)
+        z = resolve_z(z, self.z_table, pressure_start, temperature)
+        
+        # Переводим в м³/с
+        q = flow_rate * 1e6 / (24 * 3600)
+        
+        # Переводим в метры и паскали
+        d_m = diameter / 1000
+        p1_pa = pressure_start * 1e6
+        l_m = length * 1000
+        
+        # Формула
+        a = math.pi * d_m**2 / 4
+        
+        p2_sq = p1_pa**2 - (lambda_coef * z * self.R * temperature * l_m * q**2) / d_m**5
+        p2_sq = max(p2_sq, 0)
+        
+        p2_pa = math.sqrt(p2_sq)
+        
+        return p2_pa / 1e6
+    
+    # ========== РАСЧЕТЫ РАСХОДА ==========
+    
+    def gas_through_hole(self, hole_diameter: float, pressure: float,
+                        temperature: float, z: Optional[float] = None,
+                        discharge_coef: float = 0.62) -> float:
+        """
+        Расчет расхода газа через отверстие (свищ, микротрещина)
+        Методика ВНИИГАЗ
+        
+        Args:
+            hole_diameter: Диаметр отверстия, мм
+            pressure: Давление в трубопроводе, МПа
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            discharge_coef: Коэффициент истечения
+        
+        Returns:
+            Расход газа, м³/ч
+        """
+        # Площадь отверстия
+        area = math.pi * (hole_diameter / 1000)**2 / 4
+        
+        # Давление в Па
+        p_pa = pressure * 1e6
+        
+        # Плотность газа
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        molar_mass = self.gas.molar_mass
+        rho = (p_pa * molar_mass) / (z * self.R * temperature)
+        
+        # Скорость истечения (критическое истечение)
+        k = self.gas.k  # показатель адиабаты
+        critical_pressure_ratio = (2 / (k + 1)) ** (k / (k - 1))
+        
+        if pressure / 0.101325 > 1 / critical_pressure_ratio:
+            # Критическое истечение
+            velocity = math.sqrt(k * self.R * temperature / molar_mass * 
+                               (2 / (k + 1)) ** ((k + 1) / (k - 1)))
+        else:
+            # Докритическое истечение
+            p0 = 101325  # атмосферное давление
+            velocity = math.sqrt(2 * k / (k - 1) * self.R * temperature / molar_mass *
+                               (1 - (p0 / p_pa) ** ((k - 1) / k)))
+        
+        # Расход
+        mass_flow = discharge_coef * area * rho * velocity
+        volume_flow = mass_flow / self.gas.density  # пересчет в объем при н.у.
+        
+        return volume_flow * 3600
+
+    def leak_volume(self, hole_diameter: float, pressure: float,
+                    temperature: float, diameter: float, length: float,
+                    duration: Optional[float] = None,
+                    z: Optional[float] = None, discharge_coef: float = 0.62,
+                    n_steps: int = 200) -> float:
+        """
+        Объем газа, потерянного через отверстие при падении давления
+        в отключенном участке
+
+        Расход через отверстие (gas_through_hole) интегрируется по кривой
+        падения давления методом Рунге-Кутты 4-го порядка с постоянным
+        шагом; по мере падения давления истечение переходит из
+        критического в докритическое и прекращается при атмосферном.
+
+        Args:
+            hole_diameter: Диаметр отверстия, мм
+            pressure: Начальное давление, МПа
+            temperature: Температура, К
+            diameter: Диаметр участка, мм
+            length: Длина участка, км
+            duration: Время до устранения утечки, ч (None — до полного
+                падения давления)
+            z: Коэффициент сжимаемости
+            discharge_coef: Коэффициент истечения
+            n_steps: Число шагов интегрирования
+
+        Returns:
+            Объем утечки, м³
+        """
+        p_atm = 0.101325
+        if pressure <= p_atm:
+            return 0.0
+
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        volume = self.pipeline_volume(diameter, length)
+        # Запас газа при н.у. на 1 МПа давления в участке, м³/МПа
+        pack_per_mpa = volume * 1e6 * 293.15 / (z * temperature * 101325)
+
+        def rate(p):
+            """Скорость падения давления, МПа/ч"""
+            if p <= p_atm:
+                return 0.0
+            return -self.gas_through_hole(hole_diameter, p, temperature, z,
+                                          discharge_coef) / pack_per_mpa
+
+        if duration is None:
+            # Постоянная времени опорожнения при начальном расходе;
+            # запас покрывает критическую стадию и докритический остаток
+            tau = -pressure / rate(pressure)
+            duration = tau * (math.log(pressure / p_atm) + 3)
+
+        h = duration / n_steps
+        p = pressure
+        for _ in range(n_steps):
+            k1 = rate(p)
+            k2 = rate(p + h / 2 * k1)
+            k3 = rate(p + h / 2 * k2)
+            k4 = rate(p + h * k3)
+            p = max(p + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4), p_atm)
+
+        return (pressure - p) * pack_per_mpa
+
+    def gas_velocity(self, flow_rate: float, diameter: float,
+                    pressure: float, temperature: float) -> float:
+        """
+        Расчет линейной скорости газа в трубопроводе
+        
+        Args:
+            flow_rate: Расход газа, млн м³/сут
+            diameter: Диаметр трубопровода, мм
+            pressure: Давление, МПа
+            temperature: Температура, К
+        
+        Returns:
+            Скорость газа, м/с
+        """
+        # Переводим расход в м³/с при рабочих условиях
+        q_norm = flow_rate * 1e6 / (24 * 3600)  # м³/с при н.у.
+        
+        # Объемный расход при рабочих условиях
+        p_work = pressure  # МПа
+        t_work = temperature  # К
+        p_norm = 0.101325  # МПа
+        t_norm = 293.15  # К
+        
+        q_work = q_norm * (p_norm / p_work) * (t_work / t_norm)
+        
+        # Площадь сечения
+        area = math.pi * (diameter / 1000)**2 / 4
+        
+        # Скорость
+        velocity = q_work / area
+        
+        return velocity
+    
+    # ========== ТЕХНОЛОГИЧЕСКИЕ ОПЕРАЦИИ ==========
+    
+    def hydrate_plug_removal(self, pipeline_volume: float, pressure: float,
+                            n_injections: int = 3) -> float:
+        """
+        Расход газа на ликвидацию гидратных пробок
+        
+        Args:
+            pipeline_volume: Объем участка, м³
+            pressure: Давление продувки, МПа
+            n_injections: Количество закачек ингибитора
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Продувка после каждой закачки
+        gas_per_injection = pipeline_volume * (pressure / 0.101325)
+        
+        total_gas = gas_per_injection * n_injections
+        
+        return total_gas
+    
+    def pipeline_purging(self, volume: float, pressure: float,
+                        n_purges: int = 1) -> float:
+        """
+        Расход газа на продувку участка трубопровода
+        
+        Args:
+            volume: Объем участка, м³
+            pressure: Давление перед продувкой, МПа
+            n_purges: Количество продувок
+        
+        Returns:
+            Расход газа, м³
+        """
+        # Объем газа для одной продувки
+        gas_per_purge = volume * (pressure / 0.101325)
+        
+        return gas_per_purge * n_purges
+    
+    # ========== ТЕМПЕРАТУРА ТОЧКИ РОСЫ ==========
+    
+    def dew_point_conversion(self, dew_point_water: float, 
+                            pressure: float, method: str = "ISO18453") -> float:
+        """
+        Перевод температуры точки росы по воде (ТПРв) при различных давлениях
+        
+        Args:
+            dew_point_water: Точка росы по воде, °C
+            pressure: Давление, МПа
+            method: Методика расчета
+        
+        Returns:
+            Точка росы по воде при заданном давлении, °C
+        """
+        # Упрощенный расчет по формуле Магнуса
+        # Для точных расчетов нужны таблицы или сложные уравнения
+        
+        if method == "simplified":
+            # Упрощенная поправка: -0.5°C на каждые 0.1 МПа сверх атмосферного
+            pressure_correction = (pressure - 0.101325) / 0.1 * (-0.5)
+            corrected_dew_point = dew_point_water + pressure_correction
+            
+            return corrected_dew_point
+        else:
+            # Более точная формула
+            alpha = 17.27
+            beta = 237.7
+            
+            # Давление насыщенного пара при заданной точке росы
+            p_sat = 0.61094 * math.exp((alpha * dew_point_water) / (beta + dew_point_water))
+            
+            # Мольная доля воды
+            x_water = p_sat / (pressure * 1000)  # давление в кПа
+            
+            # Новая точка росы при заданном давлении
+            if x_water <= 0:
+                return -100  # очень низкая температура
+            
+            p_sat_new = x_water * pressure * 1000
+            dew_point_new = (beta * math.log(p_sat_new / 0.61094)) / (alpha - math.log(p_sat_new / 0.61094))
+            
+            return dew_point_new
+
+
+class PipelineBatch:
+    """
+    Векторизованные расчеты для массивов участков газопровода
+
+    Методы повторяют формулы PipelineCalculator, но принимают массивы NumPy
+    (или скаляры) и считают все участки за один проход. Результаты
+    совпадают со скалярными методами поэлементно.
+    """
+
+    def __init__(self, composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            composition: Состав газа {компонент: мольная доля} для расчета
+                коэффициента сжимаемости и свойств газа; без состава
+                z = 0.95, свойства — DEFAULT_GAS
+        """
+        self.R = 8.314462618
+        self.composition = composition
+        self.z_table = get_z_table(composition) if composition else None
+        self.gas = get_gas_properties(composition) if composition else DEFAULT_GAS
+        # Параметры газа для числа Рейнольдса
+        self.relative_density = self.gas.relative_density
+        self.viscosity = VISCOSITY
+
+    # ========== ГЕОМЕТРИЧЕСКИЕ РАСЧЕТЫ ==========
+
+    def pipeline_volume(self, diameter, length, roughness=0.0001) -> np.ndarray:
+        """
+        Геометрический объем участков газопровода
+
+        Args:
+            diameter: Внутренний диаметр, мм
+            length: Длина участка, км
+            roughness: Шероховатость стенок, м
+
+        Returns:
+            Объем, м³
+        """
+        d_m = np.asarray(diameter, dtype=float) / 1000
+        l_m = np.asarray(length, dtype=float) * 1000
+
+        return math.pi * d_m**2 / 4 * l_m
+
+    # ========== РАСЧЕТЫ ПАРАМЕТРОВ ==========
+
+    def pipeline_capacity(self, diameter, pressure_start, pressure_end,
+                          length, temperature, z=None,
+                          lambda_coef=0.01, roughness=ROUGHNESS) -> np.ndarray:
+        """
+        Пропускная способность участков газопровода
+
+        Args:
+            diameter: Диаметр, мм
+            pressure_start: Начальное давление, МПа
+            pressure_end: Конечное давление, МПа
+            length: Длина, км
+            temperature: Температура газа, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+                (None или NaN — по уравнению Колбрука–Уайта, согласованно
+                с расходом)
+            roughness: Шероховатость стенок, м
+
+        Returns:
+            Пропускная способность, млн м³/сут
+        """
+        # Среднее давление нужно только для Z по таблице состава
+        p_mean = None
+        if self.z_table is not None and (z is None or np.ndim(z) > 0):
+            p_mean = mean_pressure(np.asarray(pressure_start, dtype=float),
+                                   np.asarray(pressure_end, dtype=float))
+        z = resolve_z(z, self.z_table, p_mean, temperature)
+
+        lambda_coef = np.asarray(np.nan if lambda_coef is None else lambda_coef,
+                                 dtype=float)
+        auto = np.isnan(lambda_coef)
+        if auto.any():
+            # Расход пропорционален 1/√λ: λ по расходу при λ = 1
+            q_unit = self.pipeline_capacity(diameter, pressure_start,
+                                            pressure_end, length,
+                                            temperature, z, 1.0)
+            lambda_coef = np.where(auto, capacity_friction(q_unit, diameter, roughness,
+                                                           self.relative_density,
+                                                           self.viscosity),
+                                   lambda_coef)
+
+        d_m = np.asarray(diameter, dtype=float) / 1000
+        p1_pa = np.asarray(pressure_start, dtype=float) * 1e6
+        p2_pa = np.asarray(pressure_end, dtype=float) * 1e6
+        l_m = np.asarray(length, dtype=float) * 1000
+
+        numerator = (p1_pa**2 - p2_pa**2) * d_m**5
+        denominator = lambda_coef * np.asarray(z, dtype=float) * self.R * temperature * l_m
+
+        # Участки с нулевым знаменателем дают 0, как в скалярном методе
+        zero = denominator == 0
+        ratio = numerator / np.where(zero, 1.0, denominator)
+        q = 0.03848 * np.sqrt(ratio)
+
+        return np.where(zero, 0.0, q * 3600 * 24 / 1e6)
+
+    def final_pressure(self, diameter, pressure_start, flow_rate, length,
+                       temperature, z=None, lambda_coef=0.01,
+                       roughness=ROUGHNESS) -> np.ndarray:
+        """
+        Конечное давление на участках газопровода
+
+        Args:
+            diameter: Диаметр, мм
+            pressure_start: Начальное давление, МПа
+            flow_rate: Расход газа, млн м³/сут
+            length: Длина, км
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+                (None или NaN — по уравнению Колбрука–Уайта для расхода)
+            roughness: Шероховатость стенок, м
+
+        Returns:
+            Конечное давление, МПа
+        """
+        lambda_coef = np.asarray(np.nan if lambda_coef is None else lambda_coef,
+                                 dtype=float)
+        auto = np.isnan(lambda_coef)
+        if auto.any():
+            lambda_coef = np.where(auto, pipe_friction(flow_rate, diameter, roughness,
+                                                       self.relative_density,
+                                                       self.viscosity),
+                                   lambda_coef)
+
+        if z is None and self.z_table is not None:
+            z_start = self.z_table(pressure_start, temperature)
+            p_end = self.final_pressure(diameter, pressure_start, flow_rate,
+                                        length, temperature, z_start,
+                                        lambda_coef)
+            z = self.z_table(mean_pressure(pressure_start, p_end), temperature)
+        z = resolve_z(z, self.z_table, pressure_start, temperature)
+
+        q = np.asarray(flow_rate, dtype=float) * 1e6 / (24 * 3600)
+
+        d_m = np.asarray(diameter, dtype=float) / 1000
+        p1_pa = np.asarray(pressure_start, dtype=float) * 1e6
+        l_m = np.asarray(length, dtype=float) * 1000
+
+        p2_sq = p1_pa**2 - (lambda_coef * np.asarray(z, dtype=float) * self.R
+                            * temperature * l_m * q**2) / d_m**5
+        p2_sq = np.maximum(p2_sq, 0)
+
+        return np.sqrt(p2_sq) / 1e6
+
+    # ========== РАСЧЕТЫ РАСХОДА ==========
+
+    def gas_through_hole(self, hole_diameter, pressure, temperature, z=None,
+                         discharge_coef=0.62) -> np.ndarray:
+        """
+        Расход газа через отверстия (свищи, микротрещины)
+
+        Args:
+            hole_diameter: Диаметр отверстия, мм
+            pressure: Давление в трубопроводе, МПа
+            temperature: Температура, К
+            z: Коэффициент сжимаемости
+            discharge_coef: Коэффициент истечения
+
+        Returns:
+            Расход газа, м³/ч
+        """
+        area = math.pi * (np.asarray(hole_diameter, dtype=float) / 1000)**2 / 4
+        pressure = np.asarray(pressure, dtype=float)
+        temperature = np.asarray(temperature, dtype=float)
+        p_pa = pressure * 1e6
+
+        z = resolve_z(z, self.z_table, pressure, temperature)
+        molar_mass = self.gas.molar_mass
+        rho = (p_pa * molar_mass) / (np.asarray(z, dtype=float) * self.R * temperature)
+
+        k = self.gas.k
+        critical_pressure_ratio = (2 / (k + 1)) ** (k / (k - 1))
+        critical = pressure / 0.101325 > 1 / critical_pressure_ratio
+
+        rt = self.R * temperature / molar_mass
+        velocity_critical = np.sqrt(k * rt * (2 / (k + 1)) ** ((k + 1) / (k - 1)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            subcritical = 1 - (101325 / p_pa) ** ((k - 1) / k)
+            velocity_subcritical = np.sqrt(2 * k / (k - 1) * rt
+                                           * np.maximum(subcritical, 0))
+        velocity = np.where(critical, velocity_critical, velocity_subcritical)
+
+        mass_flow = discharge_coef * area * rho * velocity
+
+        return mass_flow / self.gas.density * 3600
+
+    def leak_volume(self, hole_diameter, pressure, temperature, diameter,
+                    length, duration=None, z=None, discharge_coef=0.62,
+                    n_steps: int = 200) -> np.ndarray:
+        """
+        Объем утечек через отверстия в отключенных участках
+
+        Интегрирование по кривой падения давления выполняется для всех
+        утечек одновременно (Рунге-Кутта 4-го порядка, постоянный шаг,
+        свой для каждой утечки); результат совпадает
+        с PipelineCalculator.leak_volume поэлементно.
+
+        Args:
+            hole_diameter: Диаметр отверстия, мм
+            pressure: Начальное давление, МПа
+            temperature: Температура, К
+            diameter: Диаметр участка, мм
+            length: Длина участка, км
+            duration: Время до устранения утечки, ч (None или NaN —
+                до полного падения давления)
+            z: Коэффициент сжимаемости
+            discharge_coef: Коэффициент истечения
+            n_steps: Число шагов интегрирования
+
+        Returns:
+            Объем утечки, м³
+        """
+        p_atm = 0.101325
+        hole_diameter, pressure, temperature, diameter, length = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in
+              (hole_diameter, pressure, temperature, diameter, length))
+        )
+
+        z = np.asarray(resolve_z(z, self.z_table, pressure, temperature), dtype=float)
+        volume = self.pipeline_volume(diameter, length)
+        pack_per_mpa = volume * 1e6 * 293.15 / (z * temperature * 101325)
+
+        def rate(p):
+            leaking = p > p_atm
+            flow = self.gas_through_hole(hole_diameter, np.where(leaking, p, 1.0),
+                                         temperature, z, discharge_coef)
+            return np.where(leaking, -flow / pack_per_mpa, 0.0)
+
+        active = pressure > p_atm
+        initial_rate = rate(pressure)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            full = -pressure / initial_rate * (np.log(pressure / p_atm) + 3)
+        if duration is None:
+            duration = full
+        else:
+            duration = np.asarray(duration, dtype=float)
+            duration = np.where(np.isnan(duration), full, duration)
+        h = np.where(active, duration, 0.0) / n_steps
+
+        p = pressure.copy()
+        floor = np.minimum(pressure, p_atm)
+        for _ in range(n_steps):
+            k1 = rate(p)
+            k2 = rate(p + h / 2 * k1)
+            k3 = rate(p + h / 2 * k2)
+            k4 = rate(p + h * k3)
+            p = np.maximum(p + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4), floor)
+
+        return np.where(active, (pressure - p) * pack_per_mpa, 0.0)
+
+    def gas_velocity(self, flow_rate, diameter, pressure,
+                     temperature) -> np.ndarray:
+        """
+        Линейная скорость газа на участках газопровода
+
+        Args:
+            flow_rate: Расход газа, млн м³/сут
+            diameter: Диаметр трубопровода, мм
+            pressure: Давление, МПа
+            temperature: Температура, К
+
+        Returns:
+            Скорость газа, м/с
+        """
+        q_norm = np.asarray(flow_rate, dtype=float) * 1e6 / (24 * 3600)
+
+        p_norm = 0.101325  # МПа
+        t_norm = 293.15  # К
+
+        q_work = (q_norm * (p_norm / np.asarray(pressure, dtype=float))
+                  * (np.asarray(temperature, dtype=float) / t_norm))
+
+        area = math.pi * (np.asarray(diameter, dtype=float) / 1000)**2 / 4
+
+        return q_work / area
+
+    # ========== ТЕМПЕРАТУРА ТОЧКИ РОСЫ ==========
+
+    def dew_point_conversion(self, dew_point_water, pressure,
+                             method: str = "ISO18453") -> np.ndarray:
+        """
+        Перевод температуры точки росы по воде (ТПРв) для массивов замеров
+
+        Args:
+            dew_point_water: Точка росы по воде, °C
+            pressure: Давление, МПа
+            method: Методика расчета ("ISO18453" или "simplified")
+
+        Returns:
+            Точка росы по воде при заданном давлении, °C
+        """
+        if method == "simplified":
+            return dew_point_simplified(dew_point_water, pressure)
+        return dew_point_iso(dew_point_water, pressure)
@@ -0,0 +1,458 @@
+"""
+Колоночное хранилище результатов расчетов (файлы NumPy .npy)
+
+Результаты калькуляторов (например, calculate_all_grs / calculate_all_kc
+пакетных классов) сохраняются по столбцам:
+
+    root/<вид>/stations.json              словарь станций (номер -> имя)
+    root/<вид>/<ГГГГ-ММ>/part-00000/      одна запись append() за месяц
+        meta.json                         число строк, столбцы, диапазон времени
+        stations.npy                      строки станций: [номер, начало, конец)
+        timestamp.npy, station.npy, total.npy, ...
+
+Разбиение по месяцам — каталогами, по станциям — внутри части: строки
+отсортированы по станции, и meta.json хранит диапазон строк каждой
+станции (это избавляет от тысяч мелких файлов при большом числе станций).
+Частые небольшие записи (например, ежедневные) стоит периодически
+объединять в одну часть на месяц методом compact().
+Чтение выполняется через np.load(mmap_mode='r'): запрос открывает только
+нужные столбцы нужных месяцев, срезы по станциям не копируют данные,
+а страницы файлов подгружаются операционной системой по мере обхода.
+
+Хранилище рассчитано на одного писателя; части записываются во временный
+каталог и переименовываются, поэтому читатели не видят незаконченных частей.
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+# Служебные столбцы, записываемые в каждую часть
+TIMESTAMP = 'timestamp'
+STATION = 'station'
+
+AGGREGATES = ('sum', 'mean', 'min', 'max', 'count')
+GROUPS = (None, 'station', 'month', 'year')
+
+TimeLike = Union[str, datetime, np.datetime64, float, int]
+
+
+def to_datetime64(value) -> np.ndarray:
+    """
+    Перевод времени в datetime64[s]
+
+    Args:
+        value: datetime, строка ISO, datetime64 или время Unix, с
+            (число или массив)
+
+    Returns:
+        Массив datetime64[s]
+    """
+    array = np.asarray(value)
+    if array.dtype.kind in 'iuf':
+        return array.astype('int64').astype('datetime64[s]')
+    return array.astype('datetime64[s]')
+
+
+def _month(value: np.datetime64) -> str:
+    return str(value.astype('datetime64[M]'))
+
+
+class ResultStore:
+    """Хранилище результатов расчетов по месяцам и станциям"""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Каталог хранилища (создается при первой записи)
+        """
+        self.root = root
+        self._stations: Dict[str, List[str]] = {}
+
+    # ========== СЛОВАРЬ СТАНЦИЙ ==========
+
+    def stations(self, kind: str) -> List[str]:
+        """
+        Станции, встречающиеся в данных
+
+        Args:
+            kind: Вид результатов (например, 'grs', 'kc')
+
+        Returns:
+            Имена станций в порядке их номеров
+        """
+        if kind not in self._stations:
+            path = os.path.join(self.root, kind, 'stations.json')
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    self._stations[kind] = json.load(f)
+            else:
+                self._stations[kind] = []
+        return self._stations[kind]
+
+    def _station_codes(self, kind: str, names: np.ndarray) -> np.ndarray:
+        known = self.stations(kind)
+        index = {name: code for code, name in enumerate(known)}
+        unique, inverse = np.unique(names.astype(str), return_inverse=True)
+
+        added = False
+        codes = np.empty(len(unique), dtype=np.int32)
+        for i, name in enumerate(unique.tolist()):
+            if name not in index:
+                index[name] = len(known)
+                known.append(name)
+                added = True
+            codes[i] = index[name]
+
+        if added:
+            path = os.path.join(self.root, kind, 'stations.json')
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(known, f, ensure_ascii=False)
+            os.replace(path + '.tmp', path)
+        return codes[inverse]
+
+    # ========== ЗАПИСЬ ==========
+
+    def append(self, kind: str, results: Dict[str, object],
+               stations, timestamps) -> int:
+        """
+        Добавление результатов расчета
+
+        Args:
+            kind: Вид результатов (например, 'grs', 'kc')
+            results: {столбец: массив или число} — например, результат
+                GRSBatch.calculate_all_grs или GRSCalculator.calculate_all_grs
+            stations: Имя станции или массив имен по строкам
+            timestamps: Время расчета (одно значение или массив по строкам):
+                datetime, строка ISO, datetime64 или время Unix, с
+
+        Returns:
+            Число записанных строк
+        """
+        for name in (TIMESTAMP, STATION):
+            if name in results:
+                raise ValueError(f"Имя столбца зарезервировано: {name}")
+
+        columns = {name: np.asarray(values, dtype=float)
+                   for name, values in results.items()}
+        times = to_datetime64(timestamps)
+        names = np.asarray(stations, dtype=object)
+        n = max([np.size(values) for values in columns.values()]
+                + [np.size(times), np.size(names)])
+        if not columns or n == 0:
+            return 0
+
+        columns = {name: np.broadcast_to(values, n) for name, values in columns.items()}
+        times = np.broadcast_to(times, n)
+        names = np.broadcast_to(names, n)
+
+        os.makedirs(os.path.join(self.root, kind), exist_ok=True)
+        codes = self._station_codes(kind, names)
+
+        months = times.astype('datetime64[M]')
+        for month in np.unique(months):
+            rows = np.flatnonzero(months == month)
+            self._write_part(kind, _month(month), times[rows], codes[rows],
+                             {name: values[rows] for name, values in columns.items()})
+        return n
+
+    def _write_part(self, kind: str, month: str, times: np.ndarray,
+                    codes: np.ndarray, columns: Dict[str, np.ndarray]) -> str:
+        directory = os.path.join(self.root, kind, month)
+        os.makedirs(directory, exist_ok=True)
+        numbers = [int(name[5:]) for name in self._part_names(directory)]
+        final = os.path.join(directory, f'part-{max(numbers, default=-1) + 1:05d}')
+        temporary = final + '.tmp'
+        os.makedirs(temporary, exist_ok=True)
+
+        # Сортировка по станции, внутри станции — по времени
+        order = np.lexsort((times, codes))
+        codes = codes[order]
+        times = times[order]
+        np.save(os.path.join(temporary, f'{TIMESTAMP}.npy'), times)
+        np.save(os.path.join(temporary, f'{STATION}.npy'), codes)
+        for name, values in columns.items():
+            np.save(os.path.join(temporary, f'{name}.npy'), values[order])
+
+        # Диапазоны строк станций
+        unique, starts = np.unique(codes, return_index=True)
+        stops = np.append(starts[1:], len(codes))
+        np.save(os.path.join(temporary, 'stations.npy'),
+                np.column_stack((unique, starts, stops)).astype(np.int64))
+
+        meta = {
+            'rows': int(len(codes)),
+            'columns': list(columns),
+            't_min': str(times.min()),
+            't_max': str(times.max())
+        }
+        with open(os.path.join(temporary, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.rename(temporary, final)
+        return final
+
+    @staticmethod
+    def _part_names(directory: str) -> List[str]:
+        return sorted(name for name in os.listdir(directory)
+                      if name.startswith('part-') and not name.endswith('.tmp'))
+
+    def compact(self, kind: str, months: Optional[Sequence[str]] = None) -> int:
+        """
+        Объединение частей каждого месяца в одну
+
+        Новая часть записывается целиком до удаления старых. Столбцы,
+        отсутствующие в части, заполняются NaN.
+
+        Args:
+            kind: Вид результатов
+            months: Месяцы 'ГГГГ-ММ' (по умолчанию все)
+
+        Returns:
+            Число объединенных месяцев
+        """
+        compacted = 0
+        for month in months if months is not None else self.months(kind):
+            directory = os.path.join(self.root, kind, month)
+            parts = [os.path.join(directory, name)
+                     for name in self._part_names(directory)]
+            if len(parts) < 2:
+                continue
+
+            metas = []
+            for path in parts:
+                with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                    metas.append(json.load(f))
+            names = list(dict.fromkeys(name for meta in metas for name in meta['columns']))
+
+            def load(path, name, rows):
+                file = os.path.join(path, f'{name}.npy')
+                return np.load(file) if os.path.exists(file) else np.full(rows, np.nan)
+
+            times = np.concatenate([load(path, TIMESTAMP, 0) for path in parts])
+            codes = np.concatenate([load(path, STATION, 0) for path in parts])
+            columns = {name: np.concatenate([load(path, name, meta['rows'])
+                                             for path, meta in zip(parts, metas)])
+                       for name in names}
+
+            self._write_part(kind, month, times, codes, columns)
+            for path in parts:
+                shutil.rmtree(path)
+            compacted += 1
+        return compacted
+
+    # ========== ЧТЕНИЕ ==========
+
+    def months(self, kind: str) -> List[str]:
+        """
+        Месяцы, за которые есть данные
+
+        Args:
+            kind: Вид результатов
+
+        Returns:
+            Месяцы 'ГГГГ-ММ' по возрастанию
+        """
+        directory = os.path.join(self.root, kind)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(name for name in os.listdir(directory)
+                      if len(name) == 7 and name[4] == '-'
+                      and os.path.isdir(os.path.join(directory, name)))
+
+    def _parts(self, kind: str, start, end) -> Iterator[tuple]:
+        start = None if start is None else to_datetime64(start)
+        end = None if end is None else to_datetime64(end)
+        first = None if start is None else _month(start)
+        last = None if end is None else _month(end)
+
+        for month in self.months(kind):
+            if (first and month < first) or (last and month > last):
+                continue
+            directory = os.path.join(self.root, kind, month)
+            for name in self._part_names(directory):
+                path = os.path.join(directory, name)
+                with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+                    meta = json.load(f)
+                t_min = np.datetime64(meta['t_min'])
+                t_max = np.datetime64(meta['t_max'])
+                if (start is not None and t_max < start) or (end is not None and t_min >= end):
+                    continue
+                # Фильтр по времени нужен, только если часть пересекает границу
+                partial = ((start is not None and t_min < start)
+                           or (end is not None and t_max >= end))
+                yield month, path, meta, (start, end) if partial else None
+
+    def scan(self, kind: str, columns: Sequence[str],
+             start: Optional[TimeLike] = None, end: Optional[TimeLike] = None,
+             stations: Optional[Sequence[str]] = None,
+             by_station: bool = False) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Обход данных блоками без загрузки в память
+
+        Открываются только запрошенные столбцы; блок — срез отображенного
+        в память файла одной части (непрерывные строки выбранных станций).
+
+        Args:
+            kind: Вид результатов
+            columns: Нужные столбцы (можно включать 'timestamp' и 'station';
+                'station' возвращается номерами, имена — stations(kind))
+            start: Начало периода (включительно)
+            end: Конец периода (не включительно)
+            stations: Имена станций (по умолчанию все)
+            by_station: Отдельный блок для каждой станции
+
+        Yields:
+            {'month': 'ГГГГ-ММ', 'station_code': номер (при by_station),
+            столбец: массив}
+        """
+        codes = None
+        if stations is not None:
+            index = {name: code for code, name in enumerate(self.stations(kind))}
+            codes = np.array(sorted(index[name] for name in set(stations)
+                                    if name in index), dtype=np.int64)
+
+        for month, path, meta, bounds in self._parts(kind, start, end):
+            if codes is None and not by_station:
+                selected = [(0, meta['rows'], None)]
+            else:
+                index = np.load(os.path.join(path, 'stations.npy'))
+                if codes is not None:
+                    index = index[np.isin(index[:, 0], codes)]
+                if len(index) == 0:
+                    continue
+                if by_station:
+                    selected = [(begin, stop, code)
+                                for code, begin, stop in index.tolist()]
+                else:
+                    # Смежные диапазоны станций читаются одним срезом
+                    new_run = np.ones(len(index), dtype=bool)
+                    new_run[1:] = index[1:, 1] != index[:-1, 2]
+                    run_starts = np.flatnonzero(new_run)
+                    run_stops = np.append(run_starts[1:], len(index)) - 1
+                    selected = [(begin, stop, None) for begin, stop in
+                                zip(index[run_starts, 1].tolist(),
+                                    index[run_stops, 2].tolist())]
+            if not selected:
+                continue
+
+            files = {}
+            for name in columns:
+                file = os.path.join(path, f'{name}.npy')
+                files[name] = (np.load(file, mmap_mode='r') if os.path.exists(file)
+                               else None)
+            times = None
+            if bounds is not None:
+                times = np.load(os.path.join(path, f'{TIMESTAMP}.npy'), mmap_mode='r')
+
+            for begin, stop, code in selected:
+                mask = None
+                if times is not None:
+                    block_times = times[begin:stop]
+                    mask = np.ones(stop - begin, dtype=bool)
+                    if bounds[0] is not None:
+                        mask &= block_times >= bounds[0]
+                    if bounds[1] is not None:
+                        mask &= block_times < bounds[1]
+                    if not mask.any():
+                        continue
+                    if mask.all():
+                        mask = None
+
+                block = {'month': month}
+                if code is not None:
+                    block['station_code'] = code
+                for name, data in files.items():
+                    values = (np.full(stop - begin, np.nan) if data is None
+                              else data[begin:stop])
+                    block[name] = values if mask is None else values[mask]
+                yield block
+
+    def aggregate(self, kind: str, columns: Sequence[str], func: str = 'sum',
+                  by: Optional[str] = None,
+                  start: Optional[TimeLike] = None, end: Optional[TimeLike] = None,
+                  stations: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Агрегирование столбцов за период
+
+        NaN (например, столбец, отсутствующий в части) не учитываются.
+
+        Args:
+            kind: Вид результатов
+            columns: Агрегируемые столбцы
+            func: 'sum', 'mean', 'min', 'max' или 'count'
+            by: Группировка: None, 'station', 'month' или 'year'
+            start: Начало периода (включительно)
+            end: Конец периода (не включительно)
+            stations: Имена станций (по умолчанию все)
+
+        Returns:
+            {столбец: значение} без группировки,
+            иначе {группа: {столбец: значение}}
+        """
+        if func not in AGGREGATES:
+            raise ValueError(f"Неизвестная функция: {func}")
+        if by not in GROUPS:
+            raise ValueError(f"Неизвестная группировка: {by}")
+
+        names = self.stations(kind)
+        size = len(names) if by == 'station' else 1
+        read = list(columns) + ([STATION] if by == 'station' else [])
+
+        # группа -> [строки, {столбец: [суммы, количества, минимумы, максимумы]}];
+        # при группировке по станциям — одна группа с массивами по номерам станций
+        state: Dict[object, list] = {}
+
+        for block in self.scan(kind, read, start, end, stations):
+            if by == 'month':
+                group = block['month']
+            elif by == 'year':
+                group = block['month'][:4]
+            else:
+                group = None
+
+            index = (np.asarray(block[STATION], dtype=np.intp) if by == 'station'
+                     else np.zeros(len(block[read[0]]), dtype=np.intp))
+            rows, accumulators = state.setdefault(group, [np.zeros(size, dtype=np.int64), {}])
+            rows += np.bincount(index, minlength=size)
+
+            for name in columns:
+                values = np.asarray(block[name], dtype=float)
+                valid = ~np.isnan(values)
+                acc = accumulators.setdefault(name, [np.zeros(size), np.zeros(size, dtype=np.int64),
+                                                     np.full(size, np.inf), np.full(size, -np.inf)])
+                acc[0] += np.bincount(index, np.where(valid, values, 0.0), minlength=size)
+                acc[1] += np.bincount(index, valid, minlength=size).astype(np.int64)
+                if func == 'min':
+                    np.fmin.at(acc[2], index, values)
+                elif func == 'max':
+                    np.fmax.at(acc[3], index, values)
+
+        def finish(acc, i):
+            total, count, low, high = acc[0][i], acc[1][i], acc[2][i], acc[3][i]
+            if func == 'sum':
+                return float(total)
+            if func == 'count':
+                return int(count)
+            if count == 0:
+                return float('nan')
+            return float({'mean': total / count, 'min': low, 'max': high}[func])
+
+        empty = [np.zeros(1), np.zeros(1, dtype=np.int64),
+                 np.full(1, np.inf), np.full(1, -np.inf)]
+        if by is None:
+            accumulators = state.get(None, [None, {}])[1]
+            return {name: finish(accumulators.get(name, empty), 0) for name in columns}
+
+        if by == 'station':
+            if not state:
+                return {}
+            rows, accumulators = state[None]
+            return {names[code]: {name: finish(accumulators[name], code) for name in columns}
+                    for code in sorted(np.flatnonzero(rows), key=lambda code: names[code])}
+
+        return {group: {name: finish(accumulators[name], 0) for name in columns}
+                for group, (rows, accumulators) in sorted(state.items())}
@@ -0,0 +1,271 @@
+"""
+Подбор графика технологических операций КС с минимальным расходом газа
+
+Переменные — целочисленные параметры разделов calculate_all_kc
+(например, 'startup.n_starts', 'air_displacement.n_purges',
+'oil_tank.n_purges_per_day'), целевая функция — статья расхода или итог
+KCBatch.calculate_all_kc. Кандидаты оцениваются пакетами: каждый кандидат —
+«станция» колоночного расчета, тысячи графиков за один вызов.
+
+Ограничения — функции от массивов кандидатов и результатов, возвращающие
+маску допустимых графиков, например:
+
+    lambda s, r: s['air_displacement.n_purges'] >= s['startup.n_starts']
+    lambda s, r: r['gpa_startup'] <= 5000
+
+Небольшие пространства перебираются полностью; большие — локальным
+поиском с несколькими случайными стартами (соседи — изменение одной
+переменной на ±1 шаг), с кэшем уже оцененных графиков.
+"""
+
+import math
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .kc_calculations import KC_DEFAULTS, KCBatch, KCCalculator
+
+Constraint = Callable[[Dict[str, np.ndarray], Dict[str, np.ndarray]], np.ndarray]
+Domain = Union[Tuple[int, int], Sequence[float]]
+
+
+def _domain_values(domain: Domain) -> np.ndarray:
+    # (низ, верх) — целые включительно; иначе — явный список значений.
+    # Целые области хранятся как int, чтобы график содержал целые числа
+    if isinstance(domain, tuple) and len(domain) == 2:
+        low, high = domain
+        return np.arange(int(low), int(high) + 1)
+    values = np.asarray(sorted(domain))
+    return values if values.dtype.kind in 'iu' else values.astype(float)
+
+
+class ScheduleOptimizer:
+    """Поиск графика операций КС с минимальным расходом газа"""
+
+    def __init__(self, parameters: Dict, variables: Dict[str, Domain],
+                 constraints: Sequence[Constraint] = (),
+                 objective: str = 'total',
+                 composition: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            parameters: Параметры станции {раздел: {параметр: значение}}
+                в формате calculate_all_kc
+            variables: {'раздел.параметр': (низ, верх) или список значений}
+            constraints: Ограничения (маски допустимых кандидатов)
+            objective: Минимизируемая статья calculate_all_kc или 'total'
+            composition: Состав газа для коэффициента сжимаемости
+        """
+        if not variables:
+            raise ValueError("Не заданы переменные графика")
+
+        self.names = list(variables)
+        for name in self.names:
+            section, _, key = name.partition('.')
+            if section not in KC_DEFAULTS or not key:
+                raise ValueError(f"Неизвестная переменная: {name}")
+
+        self.domains = [_domain_values(variables[name]) for name in self.names]
+        if any(len(domain) == 0 for domain in self.domains):
+            raise ValueError("Пустая область значений переменной")
+
+        self.parameters = parameters
+        self.constraints = list(constraints)
+        self.objective = objective
+        self.composition = composition
+        self.batch = KCBatch(composition)
+
+        self.evaluated = 0
+        self._cache: Dict[Tuple[int, ...], float] = {}
+
+    @property
+    def size(self) -> int:
+        """Число всех возможных графиков"""
+        return math.prod(len(domain) for domain in self.domains)
+
+    # ========== ОЦЕНКА ==========
+
+    def _columns(self, candidates: Dict[str, np.ndarray]) -> Dict:
+        columns = {section: dict(values) for section, values in self.parameters.items()}
+        for name, values in candidates.items():
+            section, _, key = name.partition('.')
+            columns.setdefault(section, {})[key] = values
+        return columns
+
+    def evaluate(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Значения целевой функции для кандидатов
+
+        Args:
+            indices: Индексы значений переменных (кандидаты × переменные)
+
+        Returns:
+            Расход газа, м³ (inf — недопустимый график)
+        """
+        indices = np.asarray(indices, dtype=np.intp).reshape(-1, len(self.names))
+        candidates = {name: domain[indices[:, i]].astype(float)
+                      for i, (name, domain) in enumerate(zip(self.names, self.domains))}
+
+        results = self.batch.calculate_all_kc(self._columns(candidates))
+        cost = np.broadcast_to(np.asarray(results[self.objective], dtype=float),
+                               len(indices)).copy()
+
+        for constraint in self.constraints:
+            feasible = np.broadcast_to(np.asarray(constraint(candidates, results), dtype=bool),
+                                       len(indices))
+            cost[~feasible] = np.inf
+
+        self.evaluated += len(indices)
+        return cost
+
+    def _evaluate_cached(self, indices: np.ndarray) -> np.ndarray:
+        keys = [tuple(row) for row in indices.tolist()]
+        cost = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            value = self._cache.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                cost[i] = value
+        if missing:
+            values = self.evaluate(indices[missing])
+            cost[missing] = values
+            self._cache.update(zip((keys[i] for i in missing), values.tolist()))
+        return cost
+
+    # ========== ПОИСК ==========
+
+    def enumerate(self, batch_size: int = 100000) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Полный перебор
+
+        Args:
+            batch_size: Кандидатов в одном векторизованном вызове
+
+        Returns:
+            (индексы лучшего графика или None, расход)
+        """
+        shape = [len(domain) for domain in self.domains]
+        best_index, best_cost = None, math.inf
+
+        for start in range(0, self.size, batch_size):
+            flat = np.arange(start, min(start + batch_size, self.size))
+            indices = np.column_stack(np.unravel_index(flat, shape))
+            cost = self.evaluate(indices)
+            i = int(np.argmin(cost))
+            if cost[i] < best_cost:
+                best_index, best_cost = indices[i], float(cost[i])
+
+        return best_index, best_cost
+
+    def local_search(self, restarts: int = 16, max_iterations: int = 1000,
+                     seed: Optional[int] = None) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Локальный поиск с несколькими стартами
+
+        Все старты ведутся одновременно: на каждой итерации соседи всех
+        текущих графиков оцениваются одним пакетом.
+
+        Args:
+            restarts: Число стартовых графиков
+            max_iterations: Максимальное число итераций
+            seed: Начальное значение генератора
+
+        Returns:
+            (индексы лучшего графика или None, расход)
+        """
+        rng = np.random.default_rng(seed)
+        shape = np.array([len(domain) for domain in self.domains])
+        n_vars = len(shape)
+
+        # Старты: случайные точки, среди которых ищем допустимые
+        pool = rng.integers(0, shape, size=(max(restarts * 32, 256), n_vars))
+        pool_cost = self._evaluate_cached(pool)
+        order = np.argsort(pool_cost, kind='stable')[:restarts]
+        current, current_cost = pool[order], pool_cost[order]
+
+        # Сдвиги: ±1 по каждой переменной
+        steps = np.concatenate([np.eye(n_vars, dtype=np.intp),
+                                -np.eye(n_vars, dtype=np.intp)])
+
+        for _ in range(max_iterations):
+            neighbours = (current[:, None, :] + steps[None, :, :]).reshape(-1, n_vars)
+            inside = ((neighbours >= 0) & (neighbours < shape)).all(axis=1)
+            cost = np.full(len(neighbours), np.inf)
+            cost[inside] = self._evaluate_cached(neighbours[inside])
+            cost = cost.reshape(len(current), len(steps))
+
+            best = np.argmin(cost, axis=1)
+            best_cost = cost[np.arange(len(current)), best]
+            improved = best_cost < current_cost
+            if not improved.any():
+                break
+            current[improved] = neighbours.reshape(len(current), len(steps), n_vars)[
+                np.flatnonzero(improved), best[improved]]
+            current_cost[improved] = best_cost[improved]
+
+        i = int(np.argmin(current_cost))
+        if not math.isfinite(current_cost[i]):
+            return None, math.inf
+        return current[i], float(current_cost[i])
+
+    def optimize(self, max_enumeration: int = 1000000, restarts: int = 16,
+                 seed: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Поиск графика с минимальным расходом
+
+        Args:
+            max_enumeration: Наибольшее число графиков для полного перебора
+            restarts: Число стартов локального поиска
+            seed: Начальное значение генератора локального поиска
+
+        Returns:
+            {'schedule': {переменная: значение} или None (нет допустимых),
+            'cost': расход, м³, 'results': calculate_all_kc для графика,
+            'method': 'enumeration' / 'local_search', 'evaluated': число оценок}
+        """
+        if self.size <= max_enumeration:
+            method = 'enumeration'
+            index, cost = self.enumerate()
+        else:
+            method = 'local_search'
+            index, cost = self.local_search(restarts=restarts, seed=seed)
+
+        summary: Dict[str, Any] = {'schedule': None, 'cost': cost, 'results': None,
+                                   'method': method, 'evaluated': self.evaluated}
+        if index is None or not math.isfinite(cost):
+            return summary
+
+        schedule = {name: domain[i].item()
+                    for name, domain, i in zip(self.names, self.domains, index)}
+        parameters = {section: dict(values) for section, values in self.parameters.items()}
+        for name, value in schedule.items():
+            section, _, key = name.partition('.')
+            parameters.setdefault(section, {})[key] = value
+
+        summary['schedule'] = schedule
+        summary['results'] = KCCalculator(self.composition).calculate_all_kc(parameters)
+        return summary
+
+
+def optimize_schedule(parameters: Dict, variables: Dict[str, Domain],
+                      constraints: Sequence[Constraint] = (),
+                      objective: str = 'total',
+                      composition: Optional[Dict[str, float]] = None,
+                      **options) -> Dict[str, Any]:
+    """
+    Поиск графика операций КС с минимальным расходом газа
+
+    Args:
+        parameters: Параметры станции в формате calculate_all_kc
+        variables: {'раздел.параметр': (низ, верх) или список значений}
+        constraints: Ограничения (маски допустимых кандидатов)
+        objective: Минимизируемая статья или 'total'
+        composition: Состав газа
+        options: Параметры ScheduleOptimizer.optimize
+
+    Returns:
+        Результат ScheduleOptimizer.optimize
+    """
+    return ScheduleOptimizer(parameters, variables, constraints, objective,
+                             composition).optimize(**options)
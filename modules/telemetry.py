@@ -0,0 +1,524 @@
+"""
+Потоковая обработка телеметрии (SCADA) калькуляторами газопровода
+
+Замеры поступают из подключаемого источника (очередь asyncio, файл,
+дополняемый другим процессом, локальный сокет), группируются в пакеты
+по временному окну и рассчитываются векторизованно (PipelineBatch):
+скорость газа, конечное давление участка и точка росы при рабочем
+давлении. Результаты передаются обработчику пакетов, выход за пороги —
+обработчику тревог (в боте — сообщение в чат).
+
+Память ограничена: между источником и расчетом — очередь фиксированного
+размера, поэтому при всплеске источник приостанавливается (для сокета —
+перестает читать соединение, и отправитель упирается в буфер TCP),
+а пакет не превышает max_batch замеров.
+
+Формат замера (словарь или строка JSON):
+    {"station": "КС-1", "timestamp": 1700000000.0, "flow_rate": 30.0,
+     "pressure": 7.2, "temperature": 288.0, "dew_point": -15.0,
+     "diameter": 1020, "length": 100}
+Отсутствующие поля берутся из параметров станции (stations),
+иначе считаются NaN — зависящие от них результаты тоже NaN.
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, List,
+                    Optional, Tuple)
+
+import numpy as np
+
+from .pipeline_calculations import PipelineBatch
+
+logger = logging.getLogger(__name__)
+
+# Поля замера, используемые в расчетах
+FIELDS = ('flow_rate', 'pressure', 'temperature', 'dew_point', 'diameter', 'length')
+
+# Рассчитываемые величины: {имя: (описание, единицы)}
+DERIVED = {
+    'velocity': ('Скорость газа', 'м/с'),
+    'pressure_end': ('Конечное давление', 'МПа'),
+    'dew_point_actual': ('ТПРв при рабочем давлении', '°C'),
+}
+
+# Пороги по умолчанию: {величина: {'min': ..., 'max': ...}}
+DEFAULT_THRESHOLDS = {
+    'velocity': {'max': 20.0},
+    'pressure_end': {'min': 3.0},
+    'dew_point_actual': {'max': -10.0},
+}
+
+_END = object()
+
+
+def parse_reading(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Разбор строки с замером (JSON)
+
+    Args:
+        line: Строка JSON-объекта
+
+    Returns:
+        Замер или None для пустой/некорректной строки
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        reading = json.loads(line)
+    except ValueError:
+        logger.warning("Некорректная строка телеметрии: %.200s", line)
+        return None
+    return reading if isinstance(reading, dict) else None
+
+
+# ========== ИСТОЧНИКИ ==========
+
+class QueueSource:
+    """Источник из очереди asyncio (None в очереди — конец потока)"""
+
+    def __init__(self, queue: asyncio.Queue):
+        self.queue = queue
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            reading = await self.queue.get()
+            if reading is None:
+                return
+            yield reading
+
+
+class FileTailSource:
+    """Источник из файла JSON Lines, дополняемого другим процессом (аналог tail -f)"""
+
+    def __init__(self, path: str, poll_interval: float = 0.5,
+                 from_start: bool = False):
+        """
+        Args:
+            path: Путь к файлу
+            poll_interval: Интервал проверки новых строк, с
+            from_start: Читать файл с начала (иначе — только новые строки)
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        while not os.path.exists(self.path):
+            await asyncio.sleep(self.poll_interval)
+
+        f = open(self.path, encoding='utf-8')
+        try:
+            if not self.from_start:
+                f.seek(0, os.SEEK_END)
+            inode = os.fstat(f.fileno()).st_ino
+            pending = ''
+
+            while True:
+                line = f.readline()
+                if line:
+                    pending += line
+                    if not pending.endswith('\n'):
+                        continue  # строка дописывается
+                    reading = parse_reading(pending)
+                    pending = ''
+                    if reading is not None:
+                        yield reading
+                    continue
+
+                await asyncio.sleep(self.poll_interval)
+
+                # Ротация или усечение файла: открываем заново с начала
+                try:
+                    stat = os.stat(self.path)
+                except FileNotFoundError:
+                    continue
+                if stat.st_ino != inode or stat.st_size < f.tell():
+                    f.close()
+                    f = open(self.path, encoding='utf-8')
+                    inode = os.fstat(f.fileno()).st_ino
+                    pending = ''
+        finally:
+            f.close()
+
+
+class SocketSource:
+    """
+    Источник из локального сокета: строки JSON Lines от любого числа клиентов
+
+    Адрес — путь Unix-сокета или (host, port) для TCP. Строки всех
+    соединений проходят через очередь размера queue_size: пока она
+    заполнена, соединения не читаются.
+    """
+
+    def __init__(self, address, queue_size: int = 10000,
+                 line_limit: int = 65536):
+        """
+        Args:
+            address: Путь Unix-сокета или (host, port)
+            queue_size: Размер очереди принятых замеров
+            line_limit: Максимальная длина строки, байт
+        """
+        self.address = address
+        self.queue_size = queue_size
+        self.line_limit = line_limit
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def _handle(self, queue: asyncio.Queue, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Строка длиннее line_limit
+                    logger.warning("Телеметрия: слишком длинная строка, соединение закрыто")
+                    break
+                if not line:
+                    break
+                reading = parse_reading(line.decode('utf-8', errors='replace'))
+                if reading is not None:
+                    await queue.put(reading)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        def handler(reader, writer):
+            return self._handle(queue, reader, writer)
+
+        if isinstance(self.address, str):
+            self.server = await asyncio.start_unix_server(
+                handler, self.address, limit=self.line_limit)
+        else:
+            host, port = self.address
+            self.server = await asyncio.start_server(
+                handler, host, port, limit=self.line_limit)
+
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.server.close()
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+
+def source_from_url(url: str):
+    """
+    Источник по строке настройки
+
+    Args:
+        url: 'file:/путь', 'unix:/путь' или 'tcp:host:port'
+
+    Returns:
+        Источник замеров
+    """
+    kind, _, target = url.partition(':')
+    if kind == 'file':
+        return FileTailSource(target)
+    if kind == 'unix':
+        return SocketSource(target)
+    if kind == 'tcp':
+        host, _, port = target.rpartition(':')
+        return SocketSource((host or '127.0.0.1', int(port)))
+    raise ValueError(f"Неизвестный источник телеметрии: {url}")
+
+
+# ========== ОБРАБОТКА ==========
+
+class TelemetryProcessor:
+    """Пакетный расчет потока замеров с контролем порогов"""
+
+    def __init__(self, source, window: float = 1.0, max_batch: int = 10000,
+                 queue_size: int = 50000,
+                 stations: Optional[Dict[str, Dict[str, float]]] = None,
+                 thresholds: Optional[Dict[str, Dict[str, float]]] = None,
+                 on_batch: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                 on_alert: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+                 composition: Optional[Dict[str, float]] = None,
+                 lambda_coef: float = 0.01):
+        """
+        Args:
+            source: Источник замеров (асинхронный итератор словарей)
+            window: Временное окно пакета, с
+            max_batch: Максимальное число замеров в пакете
+            queue_size: Размер очереди между источником и расчетом
+            stations: Постоянные параметры станций {станция: {поле: значение}}
+                (например, диаметр и длина участка)
+            thresholds: Пороги {величина: {'min': ..., 'max': ...}}
+                (по умолчанию DEFAULT_THRESHOLDS)
+            on_batch: Обработчик рассчитанного пакета
+            on_alert: Обработчик тревоги
+            composition: Состав газа для коэффициента сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+        """
+        self.source = source
+        self.window = window
+        self.max_batch = max_batch
+        self.stations = stations or {}
+        self.thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        self.on_batch = on_batch
+        self.on_alert = on_alert
+        self.lambda_coef = lambda_coef
+        self.batch = PipelineBatch(composition)
+
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        # Последние значения и активные тревоги по станциям
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self._active: Dict[Tuple[str, str], str] = {}
+        self.stats = {'readings': 0, 'batches': 0, 'alerts': 0}
+
+    # ========== ЗАПУСК ==========
+
+    async def run(self):
+        """Обработка до конца потока источника (или до отмены задачи)"""
+        reader = asyncio.create_task(self._read())
+        try:
+            while True:
+                readings = await self._collect()
+                if readings is None:
+                    break
+                await self.process(readings)
+        finally:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+
+        if not reader.cancelled() and reader.exception() is not None:
+            raise reader.exception()
+
+    async def _read(self):
+        error = None
+        try:
+            async for reading in self.source:
+                # Ожидание места в очереди — обратное давление на источник
+                await self.queue.put(reading)
+        except Exception as e:
+            error = e
+        await self.queue.put(_END)
+        if error is not None:
+            raise error
+
+    async def _collect(self) -> Optional[List[Dict[str, Any]]]:
+        """Замеры одного окна (None — источник исчерпан)"""
+        first = await self.queue.get()
+        if first is _END:
+            return None
+
+        readings = [first]
+        deadline = time.monotonic() + self.window
+        while len(readings) < self.max_batch:
+            # Сначала забираем уже накопленное, не уступая цикл событий
+            try:
+                item = self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is _END:
+                self.queue.put_nowait(_END)
+                break
+            readings.append(item)
+        return readings
+
+    # ========== РАСЧЕТ ==========
+
+    def columns(self, readings: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """
+        Столбцы замеров с подстановкой параметров станций
+
+        Args:
+            readings: Замеры
+
+        Returns:
+            {'station': массив объектов, 'timestamp': ..., поле: массив}
+        """
+        n = len(readings)
+        columns = {field: np.full(n, math.nan) for field in FIELDS}
+        stations = np.empty(n, dtype=object)
+        timestamps = np.empty(n)
+        now = time.time()
+
+        for i, reading in enumerate(readings):
+            station = str(reading.get('station', ''))
+            stations[i] = station
+            try:
+                timestamps[i] = float(reading.get('timestamp', now))
+            except (TypeError, ValueError):
+                timestamps[i] = now
+            defaults = self.stations.get(station)
+            for field in FIELDS:
+                value = reading.get(field)
+                if value is None and defaults is not None:
+                    value = defaults.get(field)
+                if value is not None:
+                    try:
+                        columns[field][i] = float(value)
+                    except (TypeError, ValueError):
+                        pass
+
+        columns['station'] = stations
+        columns['timestamp'] = timestamps
+        return columns
+
+    def calculate(self, columns: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """
+        Векторизованный расчет производных величин
+
+        Args:
+            columns: Столбцы замеров (см. columns)
+
+        Returns:
+            {величина: массив} для всех величин DERIVED
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'velocity': self.batch.gas_velocity(
+                    columns['flow_rate'], columns['diameter'],
+                    columns['pressure'], columns['temperature']),
+                'pressure_end': self.batch.final_pressure(
+                    columns['diameter'], columns['pressure'], columns['flow_rate'],
+                    columns['length'], columns['temperature'],
+                    lambda_coef=self.lambda_coef),
+                'dew_point_actual': self.batch.dew_point_conversion(
+                    columns['dew_point'], columns['pressure']),
+            }
+
+    def check(self, columns: Dict[str, np.ndarray],
+              derived: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+        """
+        Проверка порогов
+
+        Тревога по паре (станция, величина) выдается один раз при выходе
+        за порог и снимается при возврате в допустимый диапазон.
+
+        Args:
+            columns: Столбцы замеров
+            derived: Рассчитанные величины
+
+        Returns:
+            Новые тревоги: {'station', 'timestamp', 'parameter', 'value',
+            'limit', 'kind' ('min'/'max'/'ok')}
+        """
+        alerts = []
+        stations = columns['station']
+        timestamps = columns['timestamp']
+
+        for parameter, limits in self.thresholds.items():
+            values = derived.get(parameter)
+            if values is None:
+                values = columns.get(parameter)
+            if values is None:
+                continue
+
+            violation = np.full(len(values), '', dtype=object)
+            if 'min' in limits:
+                violation[values < limits['min']] = 'min'
+            if 'max' in limits:
+                violation[values > limits['max']] = 'max'
+
+            # Состояние может измениться только у нарушений и у станций
+            # с активной тревогой по этой величине
+            active = [station for station, name in self._active if name == parameter]
+            candidates = violation != ''
+            if active:
+                candidates |= np.isin(stations, active)
+            candidates &= ~np.isnan(values)
+
+            for i in np.flatnonzero(candidates):
+                key = (stations[i], parameter)
+                kind = violation[i]
+                previous = self._active.get(key, '')
+                if kind == previous:
+                    continue
+                if kind:
+                    self._active[key] = kind
+                else:
+                    del self._active[key]
+                alerts.append({
+                    'station': stations[i],
+                    'timestamp': float(timestamps[i]),
+                    'parameter': parameter,
+                    'value': float(values[i]),
+                    'limit': limits.get(kind or previous),
+                    'kind': kind or 'ok',
+                })
+        return alerts
+
+    async def process(self, readings: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Расчет одного пакета и вызов обработчиков
+
+        Args:
+            readings: Замеры
+
+        Returns:
+            {'columns', 'derived', 'alerts'}
+        """
+        columns = self.columns(readings)
+        derived = self.calculate(columns)
+        alerts = self.check(columns, derived)
+
+        # Последние значения по станциям (замеры упорядочены по поступлению)
+        last = {station: i for i, station in enumerate(columns['station'])}
+        for station, i in last.items():
+            self.latest[station] = {
+                'timestamp': float(columns['timestamp'][i]),
+                **{field: float(columns[field][i]) for field in FIELDS},
+                **{name: float(values[i]) for name, values in derived.items()},
+            }
+
+        self.stats['readings'] += len(readings)
+        self.stats['batches'] += 1
+        self.stats['alerts'] += len(alerts)
+
+        result = {'columns': columns, 'derived': derived, 'alerts': alerts}
+        # Ошибка обработчика (например, сети при отправке тревоги) не
+        # должна останавливать обработку следующих пакетов
+        if self.on_batch is not None:
+            try:
+                await self.on_batch(result)
+            except Exception:
+                logger.exception("Ошибка обработчика пакета телеметрии")
+        if self.on_alert is not None:
+            for alert in alerts:
+                try:
+                    await self.on_alert(alert)
+                except Exception:
+                    logger.exception("Тревога не отправлена: %s %s",
+                                     alert['station'], alert['parameter'])
+                    if alert['kind'] != 'ok':
+                        # Тревога будет повторена, если нарушение сохранится
+                        self._active.pop((alert['station'], alert['parameter']), None)
+        return result
+
+
+def format_alert(alert: Dict[str, Any]) -> str:
+    """
+    Текст тревоги для сообщения
+
+    Args:
+        alert: Тревога (см. TelemetryProcessor.check)
+
+    Returns:
+        Текст сообщения
+    """
+    title, unit = DERIVED.get(alert['parameter'], (alert['parameter'], ''))
+    value = f"{alert['value']:.4g} {unit}".strip()
+    if alert['kind'] == 'ok':
+        return f"✅ {alert['station']}: {title} в норме ({value})"
+    sign = '<' if alert['kind'] == 'min' else '>'
+    return (f"⚠️ {alert['station']}: {title} {value} "
+            f"{sign} {alert['limit']:g} {unit}").rstrip()
@@ -0,0 +1,469 @@
+"""
+Модуль расчета нестационарных режимов участка газопровода
+(изменение запаса газа, опорожнение через свечу)
+
+Изотермическое течение с преобладанием трения (инерционными членами
+пренебрегаем):
+
+    A·∂ρ/∂t + ∂m/∂x = 0
+    ∂(p²)/∂x = -λ·c²·m·|m| / (D·A²),   ρ = p / c²,   c² = z·R·T / M
+
+Участок делится на n_cells конечных объемов; по времени — неявная схема
+Эйлера. Нелинейная система для давлений в ячейках решается методом
+Ньютона; якобиан трехдиагональный и обращается методом прогонки. Все массивы состояния и системы
+выделяются один раз при создании объекта; шаг по времени не создает
+новых массивов.
+
+Расчет ведется в СИ (Па, кг/с, м), на входе и выходе — единицы
+остальных калькуляторов: мм, км, МПа, млн м³/сут (стандартные условия
+293.15 К, 0.101325 МПа).
+"""
+
+import logging
+import math
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+R = 8.314462618
+
+# Стандартные условия
+P_STANDARD = 101325.0  # Па
+T_STANDARD = 293.15  # К
+
+SECONDS_PER_DAY = 24 * 3600
+
+Schedule = Union[None, float, Callable[[float], float]]
+
+
+def _value_at(schedule: Schedule, t: float) -> Optional[float]:
+    """Значение граничного условия в момент t, с (число или функция времени)"""
+    if schedule is None or not callable(schedule):
+        return schedule
+    return schedule(t)
+
+
+def thomas(lower: np.ndarray, diag: np.ndarray, upper: np.ndarray,
+           rhs: np.ndarray, work: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """
+    Решение трехдиагональной системы методом прогонки (без выделения памяти)
+
+    Args:
+        lower: Поддиагональ (lower[0] не используется)
+        diag: Диагональ
+        upper: Наддиагональ (upper[-1] не используется)
+        rhs: Правая часть
+        work: Рабочий массив длины n
+        out: Массив для решения длины n
+
+    Returns:
+        out
+    """
+    n = len(diag)
+    beta = diag[0]
+    out[0] = rhs[0] / beta
+    for i in range(1, n):
+        work[i] = upper[i - 1] / beta
+        beta = diag[i] - lower[i] * work[i]
+        out[i] = (rhs[i] - lower[i] * out[i - 1]) / beta
+    for i in range(n - 2, -1, -1):
+        out[i] -= work[i + 1] * out[i + 1]
+    return out
+
+
+class TransientPipeline:
+    """Нестационарная модель участка газопровода"""
+
+    def __init__(self, diameter: float, length: float, n_cells: int = 100,
+                 temperature: float = 288.15, z: float = 0.95,
+                 lambda_coef: float = 0.01, molar_mass: float = 0.01604,
+                 k: float = 1.3):
+        """
+        Args:
+            diameter: Внутренний диаметр, мм
+            length: Длина участка, км
+            n_cells: Число конечных объемов
+            temperature: Температура газа, К
+            z: Коэффициент сжимаемости
+            lambda_coef: Коэффициент гидравлического сопротивления
+            molar_mass: Молярная масса газа, кг/моль
+            k: Показатель адиабаты (для истечения через свечу)
+        """
+        self.diameter = diameter / 1000
+        self.length = length * 1000
+        self.n_cells = n_cells
+        self.temperature = temperature
+        self.z = z
+        self.lambda_coef = lambda_coef
+        self.molar_mass = molar_mass
+        self.k = k
+
+        self.area = math.pi * self.diameter**2 / 4
+        self.dx = self.length / n_cells
+        self.cell_volume = self.area * self.dx
+        # c² = z·R·T/M, м²/с²
+        self.c2 = z * R * temperature / molar_mass
+        # Сопротивление грани между центрами ячеек: p_a² - p_b² = α·m·|m|
+        self.alpha = lambda_coef * self.c2 * self.dx / (self.diameter * self.area**2)
+        # Плотность газа при стандартных условиях, кг/м³
+        self.standard_density = P_STANDARD * molar_mass / (R * T_STANDARD)
+
+        # Состояние и рабочие массивы (выделяются один раз)
+        n = n_cells
+        self.pressure = np.full(n, P_STANDARD)
+        self._old = np.empty(n)
+        self._d2 = np.empty(n - 1)
+        self._q = np.empty(n - 1)
+        self._flow = np.empty(n - 1)
+        self._dflow = np.empty(n - 1)
+        self._delta = np.empty(n)
+        self._previous = np.empty(n)
+        self._lower = np.empty(n)
+        self._diag = np.empty(n)
+        self._upper = np.empty(n)
+        self._rhs = np.empty(n)
+        self._work = np.empty(n)
+
+        # Регуляризация закона трения около нулевого расхода, кг/с
+        self.flow_eps = 1e-3
+
+    # ========== СОСТОЯНИЕ ==========
+
+    def _mass_flow(self, flow_rate: float) -> float:
+        """Перевод млн м³/сут в кг/с"""
+        return flow_rate * 1e6 / SECONDS_PER_DAY * self.standard_density
+
+    def _standard_flow(self, mass_flow: float) -> float:
+        """Перевод кг/с в млн м³/сут"""
+        return mass_flow / self.standard_density * SECONDS_PER_DAY / 1e6
+
+    def set_pressure(self, pressure):
+        """
+        Задание давления по участку
+
+        Args:
+            pressure: Давление, МПа (число или массив длины n_cells)
+        """
+        self.pressure[:] = np.asarray(pressure, dtype=float) * 1e6
+
+    def set_steady_state(self, pressure_start: float, flow_rate: float):
+        """
+        Установившийся профиль давления при постоянном расходе
+
+        Args:
+            pressure_start: Давление в начале участка, МПа
+            flow_rate: Расход газа, млн м³/сут
+        """
+        m = self._mass_flow(flow_rate)
+        # Центры ячеек: x = (i + 1/2)·dx, α — сопротивление на длине dx
+        p2 = ((pressure_start * 1e6)**2
+              - self.alpha * m * abs(m) * (np.arange(self.n_cells) + 0.5))
+        if p2.min() <= 0:
+            raise ValueError("Расход превышает пропускную способность участка")
+        self.pressure[:] = np.sqrt(p2)
+
+    def line_pack(self) -> float:
+        """
+        Запас газа в участке
+
+        Returns:
+            Объем газа при стандартных условиях, м³
+        """
+        mass = self.pressure.sum() * self.cell_volume / self.c2
+        return mass / self.standard_density
+
+    def profile(self) -> Dict[str, np.ndarray]:
+        """
+        Профиль давления
+
+        Returns:
+            {'distance': км, 'pressure': МПа} по центрам ячеек
+        """
+        return {
+            'distance': (np.arange(self.n_cells) + 0.5) * self.dx / 1000,
+            'pressure': self.pressure / 1e6
+        }
+
+    # ========== ИСТЕЧЕНИЕ ЧЕРЕЗ СВЕЧУ ==========
+
+    def vent_flow(self, pressure: float, vent_area: float,
+                  discharge_coef: float, back_pressure: float = P_STANDARD) -> float:
+        """
+        Массовый расход через свечу (критическое или докритическое истечение)
+
+        Args:
+            pressure: Давление перед свечой, Па
+            vent_area: Площадь проходного сечения, м²
+            discharge_coef: Коэффициент расхода
+            back_pressure: Давление за свечой, Па
+
+        Returns:
+            Расход, кг/с
+        """
+        if pressure <= back_pressure:
+            return 0.0
+
+        k = self.k
+        rt = R * self.temperature / self.molar_mass
+        critical_ratio = (2 / (k + 1))**(k / (k - 1))
+        ratio = back_pressure / pressure
+
+        if ratio <= critical_ratio:
+            psi = math.sqrt(k * (2 / (k + 1))**((k + 1) / (k - 1)))
+        else:
+            psi = math.sqrt(2 * k / (k - 1)
+                            * (ratio**(2 / k) - ratio**((k + 1) / k)))
+
+        return discharge_coef * vent_area * pressure * psi / math.sqrt(rt)
+
+    # ========== РАСЧЕТ ==========
+
+    def _face_flows(self, p: np.ndarray):
+        """
+        Расходы через внутренние грани и их производные
+
+        m = Δ / sqrt(α·|Δ| + α²·ε²),   Δ = p_a² - p_b²
+        (при |m| >> ε — закон трения m·|m| = Δ / α)
+        """
+        d, q, m, dm = self._d2, self._q, self._flow, self._dflow
+        np.multiply(p[:-1], p[:-1], out=d)
+        np.multiply(p[1:], p[1:], out=q)
+        d -= q
+        np.abs(d, out=q)
+        q *= self.alpha
+        q += (self.alpha * self.flow_eps)**2
+        # dm/dΔ = (α·|Δ|/2 + α²·ε²) / q^(3/2)
+        np.abs(d, out=dm)
+        dm *= self.alpha / 2
+        dm += (self.alpha * self.flow_eps)**2
+        np.sqrt(q, out=m)
+        q *= m
+        dm /= q
+        np.divide(d, m, out=m)
+
+    def _boundary_flow(self, p_from: float, p_to: float):
+        """Расход через полуячейку у границы и производная dm/d(p_from²-p_to²)"""
+        alpha = self.alpha / 2
+        d = p_from**2 - p_to**2
+        q = alpha * abs(d) + (alpha * self.flow_eps)**2
+        return d / math.sqrt(q), (alpha * abs(d) / 2 + (alpha * self.flow_eps)**2) / q**1.5
+
+    def step(self, dt: float, inlet_pressure: Optional[float] = None,
+             inlet_flow: Optional[float] = None,
+             outlet_pressure: Optional[float] = None,
+             outlet_flow: Optional[float] = None,
+             vent_area: float = 0.0, discharge_coef: float = 0.62,
+             max_iter: int = 30, tol: float = 1e-9) -> Dict[str, float]:
+        """
+        Один шаг по времени (неявная схема, метод Ньютона)
+
+        Граничные условия — в СИ: давление, Па; расход, кг/с. Если на
+        границе не задано ни давление, ни расход, граница закрыта.
+        Свеча (vent_area > 0) подключается к концу участка.
+
+        Returns:
+            {'inlet': расход через начало, кг/с, 'outlet': расход через
+             конец (включая свечу), кг/с, 'iterations': число итераций,
+             'converged': поправка давления ниже tol}
+
+        Если за max_iter итераций поправка не стала меньше tol, в журнал
+        пишется предупреждение, а шаг принимается с последним приближением
+        (первый шаг после резкого изменения граничных условий сходится
+        медленнее остальных).
+        """
+        p = self.pressure
+        old = self._old
+        lower, diag, upper, rhs = self._lower, self._diag, self._upper, self._rhs
+        m, dm, delta = self._flow, self._dflow, self._delta
+        previous = self._previous
+        capacity = self.cell_volume / (self.c2 * dt)
+
+        old[:] = p
+        inlet = outlet = 0.0
+        iterations = 0
+        for iterations in range(1, max_iter + 1):
+            self._face_flows(p)
+
+            # Невязка: C·(p - p_old) + m_справа - m_слева (со знаком минус в rhs)
+            np.subtract(old, p, out=rhs)
+            rhs *= capacity
+            rhs[:-1] -= m
+            rhs[1:] += m
+
+            # Якобиан: dm/dp_a = 2·p_a·dm/dΔ, dm/dp_b = -2·p_b·dm/dΔ
+            diag.fill(capacity)
+            np.multiply(p[:-1], dm, out=lower[1:])
+            lower[1:] *= -2
+            diag[:-1] -= lower[1:]
+            np.multiply(p[1:], dm, out=upper[:-1])
+            upper[:-1] *= -2
+            diag[1:] -= upper[:-1]
+            lower[0] = upper[-1] = 0.0
+
+            # Начало участка
+            if inlet_pressure is not None:
+                inlet, d_inlet = self._boundary_flow(inlet_pressure, p[0])
+                diag[0] += 2 * p[0] * d_inlet
+            else:
+                inlet = inlet_flow or 0.0
+            rhs[0] += inlet
+
+            # Конец участка
+            outlet = 0.0
+            if outlet_pressure is not None:
+                outlet, d_outlet = self._boundary_flow(p[-1], outlet_pressure)
+                diag[-1] += 2 * p[-1] * d_outlet
+            elif outlet_flow is not None:
+                outlet = outlet_flow
+            if vent_area > 0:
+                vent = self.vent_flow(p[-1], vent_area, discharge_coef)
+                h = p[-1] * 1e-7
+                diag[-1] += (self.vent_flow(p[-1] + h, vent_area, discharge_coef)
+                             - vent) / h
+                outlet += vent
+            rhs[-1] -= outlet
+
+            thomas(lower, diag, upper, rhs, self._work, delta)
+            # Ньютон для расхода ~ sqrt(Δ) колеблется около нулевого расхода
+            # (закрытый конец): поправки, сменившие знак без быстрого
+            # уменьшения, уменьшаются вдвое
+            if iterations > 1:
+                np.multiply(delta, previous, out=self._work)
+                self._work *= 4
+                np.multiply(previous, previous, out=rhs)
+                self._work += rhs
+                delta[self._work < 0] *= 0.5
+            previous[:] = delta
+            p += delta
+
+            if p.min() <= 0:
+                raise ValueError("Давление упало до нуля: отбор превышает "
+                                 "возможности участка")
+
+            np.abs(delta, out=self._work)
+            if self._work.max() <= tol * p.max():
+                break
+        converged = bool(self._work.max() <= tol * p.max())
+        if not converged:
+            logger.warning(
+                "Шаг по времени %.3g с не сошелся за %d итераций "
+                "(относительная поправка давления %.3e)",
+                dt, max_iter, self._work.max() / p.max())
+
+        return {'inlet': inlet, 'outlet': outlet, 'iterations': iterations,
+                'converged': converged}
+
+    def simulate(self, duration: float, dt: float = 60.0,
+                 inlet_pressure: Schedule = None, inlet_flow: Schedule = None,
+                 outlet_pressure: Schedule = None, outlet_flow: Schedule = None,
+                 vent_diameter: float = 0.0, discharge_coef: float = 0.62,
+                 record_every: int = 1,
+                 stop_pressure: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Расчет нестационарного режима
+
+        Граничные условия задаются числом или функцией времени t (с):
+        давления — МПа, расходы — млн м³/сут. Граница без условий закрыта.
+
+        Args:
+            duration: Длительность, ч
+            dt: Шаг по времени, с
+            inlet_pressure: Давление в начале участка, МПа
+            inlet_flow: Расход на входе, млн м³/сут
+            outlet_pressure: Давление в конце участка, МПа
+            outlet_flow: Отбор в конце участка, млн м³/сут
+            vent_diameter: Диаметр свечи в конце участка, мм (0 — без свечи)
+            discharge_coef: Коэффициент расхода свечи
+            record_every: Сохранять каждый N-й шаг
+            stop_pressure: Остановить расчет, когда максимальное давление
+                опустится ниже этого значения, МПа
+
+        Returns:
+            {'time': ч, 'pressure_start', 'pressure_end': МПа,
+             'inlet_flow', 'outlet_flow': млн м³/сут,
+             'line_pack': м³, 'outflow': накопленный выход через конец, м³,
+             'iterations': итераций на шаг}
+        """
+        n_steps = int(math.ceil(duration * 3600 / dt))
+        n_records = n_steps // record_every + 1
+        vent_area = math.pi * (vent_diameter / 1000)**2 / 4
+
+        history = {key: np.zeros(n_records) for key in
+                   ('time', 'pressure_start', 'pressure_end', 'inlet_flow',
+                    'outlet_flow', 'line_pack', 'outflow', 'iterations')}
+
+        def record(index, t, flows, outflow):
+            history['time'][index] = t / 3600
+            history['pressure_start'][index] = self.pressure[0] / 1e6
+            history['pressure_end'][index] = self.pressure[-1] / 1e6
+            history['inlet_flow'][index] = self._standard_flow(flows['inlet'])
+            history['outlet_flow'][index] = self._standard_flow(flows['outlet'])
+            history['line_pack'][index] = self.line_pack()
+            history['outflow'][index] = outflow / self.standard_density
+            history['iterations'][index] = flows['iterations']
+
+        def boundary(schedule, t, scale):
+            value = _value_at(schedule, t)
+            return None if value is None else value * scale
+
+        flow_scale = self._mass_flow(1.0)
+        record(0, 0.0, {'inlet': 0.0, 'outlet': 0.0, 'iterations': 0}, 0.0)
+
+        outflow = 0.0
+        index = 0
+        t = 0.0
+        for step in range(1, n_steps + 1):
+            t = step * dt
+            flows = self.step(
+                dt,
+                inlet_pressure=boundary(inlet_pressure, t, 1e6),
+                inlet_flow=boundary(inlet_flow, t, flow_scale),
+                outlet_pressure=boundary(outlet_pressure, t, 1e6),
+                outlet_flow=boundary(outlet_flow, t, flow_scale),
+                vent_area=vent_area, discharge_coef=discharge_coef
+            )
+            outflow += flows['outlet'] * dt
+
+            stop = (stop_pressure is not None
+                    and self.pressure.max() <= stop_pressure * 1e6)
+            if step % record_every == 0 or stop:
+                index += 1
+                record(index, t, flows, outflow)
+            if stop:
+                break
+
+        return {key: values[:index + 1] for key, values in history.items()}
+
+    def blowdown(self, vent_diameter: float, final_pressure: float = 0.2,
+                 dt: float = 10.0, max_hours: float = 24.0,
+                 discharge_coef: float = 0.62) -> Dict[str, float]:
+        """
+        Опорожнение закрытого участка через свечу в конце участка
+
+        Args:
+            vent_diameter: Диаметр свечи, мм
+            final_pressure: Давление окончания стравливания, МПа
+            dt: Шаг по времени, с
+            max_hours: Предельная длительность, ч
+            discharge_coef: Коэффициент расхода свечи
+
+        Returns:
+            {'duration': время стравливания, ч,
+             'vented': стравленный объем, м³,
+             'line_pack_start', 'line_pack_end': запас газа, м³,
+             'completed': давление снизилось до final_pressure}
+        """
+        start = self.line_pack()
+        result = self.simulate(max_hours, dt, vent_diameter=vent_diameter,
+                               discharge_coef=discharge_coef,
+                               record_every=max(1, int(max_hours * 3600 / dt)),
+                               stop_pressure=final_pressure)
+        return {
+            'duration': float(result['time'][-1]),
+            'vented': float(result['outflow'][-1]),
+            'line_pack_start': start,
+            'line_pack_end': self.line_pack(),
+            'completed': bool(self.pressure.max() <= final_pressure * 1e6)
+        }
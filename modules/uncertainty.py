@@ -0,0 +1,252 @@
+"""
+Оценка неопределенности расчетов ГРС и КС методом Монте-Карло
+
+Параметры задаются так же, как для calculate_all_grs / calculate_all_kc,
+но любое число можно заменить распределением (normal, uniform,
+triangular, lognormal). Для каждого распределения генерируется N выборок,
+и все выборки рассчитываются одним векторизованным вызовом
+GRSBatch.calculate_all_grs / KCBatch.calculate_all_kc — выборка играет
+роль «станции» колоночного расчета.
+
+Пример:
+    propagate('kc', {'startup': {'pipeline_volume': normal(10, 0.3),
+                                 'pressure': uniform(1.9, 2.1),
+                                 'z': triangular(0.9, 0.93, 0.95)}},
+              n_samples=1_000_000, seed=1)
+
+Выборки делятся на блоки фиксированного размера с независимыми
+генераторами (SeedSequence.spawn), поэтому при заданном seed результат
+не зависит от числа процессов.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .grs_calculations import GRS_DEFAULTS, GRS_ITEMS, GRSBatch
+from .kc_calculations import KC_DEFAULTS, KC_ITEMS, KCBatch
+
+DISTRIBUTIONS = ('normal', 'uniform', 'triangular', 'lognormal')
+
+ITEMS = {
+    'grs': list(GRS_ITEMS),
+    'kc': [item for item, _, _ in KC_ITEMS],
+}
+DEFAULTS = {'grs': GRS_DEFAULTS, 'kc': KC_DEFAULTS}
+
+
+# ========== РАСПРЕДЕЛЕНИЯ ==========
+
+def normal(mean: float, std: float, low: Optional[float] = None,
+           high: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Нормальное распределение (с необязательным ограничением диапазона)
+
+    Args:
+        mean: Среднее
+        std: Стандартное отклонение
+        low: Нижняя граница (выборки ниже заменяются границей)
+        high: Верхняя граница
+
+    Returns:
+        Описание распределения
+    """
+    return {'distribution': 'normal', 'mean': mean, 'std': std,
+            'low': low, 'high': high}
+
+
+def uniform(low: float, high: float) -> Dict[str, Any]:
+    """Равномерное распределение на [low, high)"""
+    return {'distribution': 'uniform', 'low': low, 'high': high}
+
+
+def triangular(low: float, mode: float, high: float) -> Dict[str, Any]:
+    """Треугольное распределение"""
+    return {'distribution': 'triangular', 'low': low, 'mode': mode, 'high': high}
+
+
+def lognormal(median: float, sigma: float) -> Dict[str, Any]:
+    """
+    Логнормальное распределение
+
+    Args:
+        median: Медиана
+        sigma: Стандартное отклонение логарифма
+
+    Returns:
+        Описание распределения
+    """
+    return {'distribution': 'lognormal', 'median': median, 'sigma': sigma}
+
+
+def is_distribution(value) -> bool:
+    return isinstance(value, dict) and 'distribution' in value
+
+
+def sample(spec: Dict[str, Any], n: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Выборка из распределения
+
+    Args:
+        spec: Описание распределения (normal, uniform, ...)
+        n: Размер выборки
+        rng: Генератор случайных чисел
+
+    Returns:
+        Массив длины n
+    """
+    kind = spec['distribution']
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Неизвестное распределение: {kind}")
+    if kind == 'normal':
+        values = rng.normal(spec['mean'], spec['std'], n)
+        if spec.get('low') is not None or spec.get('high') is not None:
+            values = np.clip(values, spec.get('low'), spec.get('high'))
+        return values
+    if kind == 'uniform':
+        return rng.uniform(spec['low'], spec['high'], n)
+    if kind == 'triangular':
+        return rng.triangular(spec['low'], spec['mode'], spec['high'], n)
+    return rng.lognormal(np.log(spec['median']), spec['sigma'], n)
+
+
+# ========== РАСЧЕТ ==========
+
+def _appliance_matrices(section: Dict[str, Dict[str, float]]) -> Dict[str, np.ndarray]:
+    # Словари бытовых приборов -> матрицы (1 × типы) для GRSBatch
+    types = list(section.get('n_appliances', {}))
+    return {
+        key: np.array([[section.get(key, {}).get(name, np.nan) for name in types]],
+                      dtype=float)
+        for key in ('n_appliances', 'consumption_rates', 'hours_usage')
+    }
+
+
+def _sample_columns(kind: str, parameters: Dict, n: int,
+                    rng: np.random.Generator) -> Dict:
+    columns = {}
+    for section, values in parameters.items():
+        if section not in DEFAULTS[kind]:
+            raise ValueError(f"Неизвестный раздел: {section}")
+        if kind == 'grs' and section == 'appliances':
+            # Бытовые приборы учитываются точечной оценкой
+            columns[section] = _appliance_matrices(values)
+            continue
+        # Порядок генерации — порядок параметров, как они заданы
+        columns[section] = {
+            key: sample(value, n, rng) if is_distribution(value) else value
+            for key, value in values.items()
+        }
+        if not columns[section]:
+            # Раздел только со значениями по умолчанию: задаем размер пакета
+            first = next(iter(DEFAULTS[kind][section]))
+            columns[section][first] = np.full(n, float(DEFAULTS[kind][section][first]))
+    return columns
+
+
+def _evaluate_block(block: tuple, kind: str, parameters: Dict,
+                    composition: Optional[Dict[str, float]]) -> Dict[str, np.ndarray]:
+    """Расчет одного блока выборок (выполняется и в дочерних процессах)"""
+    n, seed = block
+    rng = np.random.default_rng(seed)
+    columns = _sample_columns(kind, parameters, n, rng)
+
+    if kind == 'grs':
+        return GRSBatch(composition).calculate_all_grs(columns)
+    return KCBatch(composition).calculate_all_kc(columns)
+
+
+def summarize(values: np.ndarray, confidence: float = 0.95) -> Dict[str, float]:
+    """
+    Статистика выборки результата
+
+    Args:
+        values: Выборка
+        confidence: Доверительная вероятность интервала
+
+    Returns:
+        {'mean', 'std', 'median', 'ci_low', 'ci_high'}
+    """
+    low, high = values.min(), values.max()
+    if low == high:
+        # Точное значение (статья без неопределенных параметров)
+        value = float(low)
+        return {'mean': value, 'std': 0.0, 'median': value,
+                'ci_low': value, 'ci_high': value}
+
+    tail = (1 - confidence) / 2 * 100
+    low, median, high = np.percentile(values, [tail, 50, 100 - tail])
+    return {
+        'mean': float(values.mean()),
+        'std': float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+        'median': float(median),
+        'ci_low': float(low),
+        'ci_high': float(high),
+    }
+
+
+def propagate(kind: str, parameters: Dict, n_samples: int = 100000,
+              confidence: float = 0.95, seed: Optional[int] = None,
+              composition: Optional[Dict[str, float]] = None,
+              workers: Optional[int] = 1, block_size: int = 250000,
+              return_samples: bool = False) -> Dict[str, Any]:
+    """
+    Распространение неопределенности входных данных на расходы газа
+
+    Args:
+        kind: 'grs' или 'kc'
+        parameters: {раздел: {параметр: значение или распределение}}
+            в формате calculate_all_grs / calculate_all_kc
+        n_samples: Число выборок
+        confidence: Доверительная вероятность интервала
+        seed: Начальное значение генератора (None — случайное)
+        composition: Состав газа для коэффициента сжимаемости
+        workers: Число процессов (0 — по числу ядер, 1 — без пула)
+        block_size: Выборок в одном блоке (единица работы процесса)
+        return_samples: Вернуть также выборки результатов
+
+    Returns:
+        {'n_samples', 'confidence', 'results': {статья: статистика
+        (см. summarize)}, включая 'total'; при return_samples —
+        'samples': {статья: массив}}
+    """
+    if kind not in DEFAULTS:
+        raise ValueError(f"Неизвестный вид станции: {kind}")
+    if n_samples < 1:
+        raise ValueError("Число выборок должно быть положительным")
+
+    sizes = [block_size] * (n_samples // block_size)
+    if n_samples % block_size:
+        sizes.append(n_samples % block_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    blocks = list(zip(sizes, seeds))
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+
+    evaluate = partial(_evaluate_block, kind=kind, parameters=parameters,
+                       composition=composition)
+    if workers and workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(blocks))) as executor:
+            parts: List[Dict[str, np.ndarray]] = list(executor.map(evaluate, blocks))
+    else:
+        parts = [evaluate(block) for block in blocks]
+
+    keys = ITEMS[kind] + ['total']
+    # Статьи без неопределенных параметров приходят скалярами или массивами (1,)
+    samples = {key: np.concatenate([np.broadcast_to(np.asarray(part[key], dtype=float), size)
+                                    for part, size in zip(parts, sizes)])
+               for key in keys}
+
+    summary = {
+        'n_samples': n_samples,
+        'confidence': confidence,
+        'results': {key: summarize(values, confidence)
+                    for key, values in samples.items()},
+    }
+    if return_samples:
+        summary['samples'] = samples
+    return summary
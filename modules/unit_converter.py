@@ -0,0 +1,364 @@
+"""
+Серверный конвертер величин
+
+Таблицы единиц повторяют script.js (плюс давление). При создании
+конвертера таблицы компилируются в граф коэффициентов: каждая единица
+связана с базовой единицей категории (а валюты — курсами), и для каждой
+пары единиц заранее вычисляется одно аффинное преобразование
+y = a·x + b. Конвертация — поиск пары в словаре и одна операция.
+"""
+
+import re
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Категории: (код, название, множитель к базовой единице, смещение)
+# Базовая единица — первая в списке.
+UNITS = {
+    'length': [
+        ('m', 'метр', 1, 0),
+        ('km', 'километр', 1000, 0),
+        ('cm', 'сантиметр', 0.01, 0),
+        ('mm', 'миллиметр', 0.001, 0),
+        ('mile', 'миля', 1609.34, 0),
+        ('yard', 'ярд', 0.9144, 0),
+        ('foot', 'фут', 0.3048, 0),
+        ('inch', 'дюйм', 0.0254, 0)
+    ],
+    'weight': [
+        ('kg', 'килограмм', 1, 0),
+        ('g', 'грамм', 0.001, 0),
+        ('lb', 'фунт', 0.453592, 0),
+        ('oz', 'унция', 0.0283495, 0),
+        ('ton', 'тонна', 1000, 0),
+        ('carat', 'карат', 0.0002, 0)
+    ],
+    'temperature': [
+        ('c', 'Цельсий', 1, 0),
+        ('f', 'Фаренгейт', 5 / 9, -32 * 5 / 9),
+        ('k', 'Кельвин', 1, -273.15)
+    ],
+    'volume': [
+        ('l', 'литр', 1, 0),
+        ('ml', 'миллилитр', 0.001, 0),
+        ('m3', 'куб. метр', 1000, 0),
+        ('gallon', 'галлон', 3.78541, 0),
+        ('pint', 'пинта', 0.473176, 0)
+    ],
+    'area': [
+        ('m2', 'кв. метр', 1, 0),
+        ('km2', 'кв. километр', 1000000, 0),
+        ('ha', 'гектар', 10000, 0),
+        ('acre', 'акр', 4046.86, 0),
+        ('sotka', 'сотка', 100, 0)
+    ],
+    'speed': [
+        ('m/s', 'метр/сек', 1, 0),
+        ('km/h', 'километр/час', 0.277778, 0),
+        ('mph', 'миля/час', 0.44704, 0),
+        ('knot', 'узел', 0.514444, 0)
+    ],
+    'time': [
+        ('s', 'секунда', 1, 0),
+        ('min', 'минута', 60, 0),
+        ('h', 'час', 3600, 0),
+        ('day', 'день', 86400, 0),
+        ('week', 'неделя', 604800, 0)
+    ],
+    'pressure': [
+        ('pa', 'паскаль', 1, 0),
+        ('kpa', 'килопаскаль', 1e3, 0),
+        ('mpa', 'мегапаскаль', 1e6, 0),
+        ('bar', 'бар', 1e5, 0),
+        ('atm', 'атмосфера', 101325, 0),
+        ('kgf/cm2', 'кгс/см²', 98066.5, 0),
+        ('psi', 'psi', 6894.757, 0),
+        ('mmhg', 'мм рт. ст.', 133.322, 0)
+    ]
+}
+
+# Валюты: статические курсы, как в script.js (ребра графа)
+CURRENCIES = [
+    ('RUB', 'Рубль (RUB)'),
+    ('USD', 'Доллар (USD)'),
+    ('EUR', 'Евро (EUR)'),
+    ('GBP', 'Фунт (GBP)'),
+    ('JPY', 'Йена (JPY)')
+]
+
+CURRENCY_RATES = {
+    'USD': {'RUB': 90, 'EUR': 0.92, 'GBP': 0.79, 'JPY': 148},
+    'EUR': {'RUB': 98, 'USD': 1.09, 'GBP': 0.86, 'JPY': 161},
+    'RUB': {'USD': 0.011, 'EUR': 0.0102, 'GBP': 0.0088, 'JPY': 1.64}
+}
+
+# Дополнительные обозначения единиц для разбора текста
+ALIASES = {
+    'm': ['м', 'метр', 'метра', 'метров', 'метры', 'meter', 'meters'],
+    'km': ['км', 'километр', 'километра', 'километров', 'километры'],
+    'cm': ['см', 'сантиметр', 'сантиметров', 'сантиметры'],
+    'mm': ['мм', 'миллиметр', 'миллиметров', 'миллиметры'],
+    'mile': ['mi', 'miles', 'миля', 'мили', 'миль', 'милях'],
+    'yard': ['yd', 'yards', 'ярд', 'ярда', 'ярдов', 'ярды'],
+    'foot': ['ft', 'feet', 'фут', 'фута', 'футов', 'футы'],
+    'inch': ['in', 'inches', 'дюйм', 'дюйма', 'дюймов', 'дюймы'],
+    'kg': ['кг', 'килограмм', 'килограмма', 'килограммов', 'килограммы'],
+    'g': ['г', 'гр', 'грамм', 'грамма', 'граммов', 'граммы'],
+    'lb': ['lbs', 'pound', 'pounds', 'фунт', 'фунта', 'фунтов', 'фунты'],
+    'oz': ['ounce', 'ounces', 'унция', 'унции', 'унций'],
+    'ton': ['t', 'т', 'тонна', 'тонны', 'тонн'],
+    'carat': ['ct', 'кар', 'карат', 'карата', 'каратов'],
+    'c': ['°c', '℃', 'цельсий', 'цельсия', 'celsius'],
+    'f': ['°f', '℉', 'фаренгейт', 'фаренгейта', 'fahrenheit'],
+    'k': ['кельвин', 'кельвина', 'кельвинов', 'kelvin'],
+    'l': ['л', 'литр', 'литра', 'литров', 'литры', 'liter', 'liters'],
+    'ml': ['мл', 'миллилитр', 'миллилитров', 'миллилитры'],
+    'm3': ['м3', 'м³', 'm³', 'куб. м', 'кубометр', 'кубометров'],
+    'gallon': ['gal', 'gallons', 'галлон', 'галлона', 'галлонов', 'галлоны'],
+    'pint': ['pt', 'pints', 'пинта', 'пинты', 'пинт'],
+    'm2': ['м2', 'м²', 'm²', 'кв. м', 'кв.м'],
+    'km2': ['км2', 'км²', 'km²', 'кв. км', 'кв.км'],
+    'ha': ['га', 'гектар', 'гектара', 'гектаров', 'гектары'],
+    'acre': ['acres', 'акр', 'акра', 'акров', 'акры'],
+    'sotka': ['сотка', 'сотки', 'соток'],
+    'm/s': ['м/с', 'mps'],
+    'km/h': ['км/ч', 'kmh', 'kph'],
+    'mph': ['миль/ч', 'миля/ч', 'mi/h'],
+    'knot': ['kn', 'knots', 'узел', 'узла', 'узлов', 'узлы'],
+    's': ['sec', 'с', 'сек', 'секунда', 'секунды', 'секунд'],
+    'min': ['мин', 'минута', 'минуты', 'минут'],
+    'h': ['hr', 'hour', 'hours', 'ч', 'час', 'часа', 'часов'],
+    'day': ['days', 'д', 'день', 'дня', 'дней', 'сут', 'сутки', 'суток'],
+    'week': ['weeks', 'нед', 'неделя', 'недели', 'недель'],
+    'pa': ['па', 'паскаль', 'паскалей'],
+    'kpa': ['кпа'],
+    'mpa': ['мпа'],
+    'bar': ['бар', 'бара', 'баров'],
+    'atm': ['атм', 'атмосфера', 'атмосферы', 'атмосфер'],
+    'kgf/cm2': ['кгс/см2', 'кгс/см²', 'at', 'ат'],
+    'psi': [],
+    'mmhg': ['мм рт. ст.', 'мм рт.ст.', 'мм.рт.ст.', 'торр', 'torr'],
+    'RUB': ['руб', 'рубль', 'рубля', 'рублей', 'рубли', '₽', 'rur'],
+    'USD': ['$', 'доллар', 'доллара', 'долларов', 'доллары'],
+    'EUR': ['€', 'евро'],
+    'GBP': ['£', 'фунт стерлингов'],
+    'JPY': ['¥', 'йена', 'йены', 'иен', 'иена']
+}
+
+# "150 km в мили", "3,5 atm to MPa", "100 °F -> C"
+QUERY_PATTERN = re.compile(
+    r'^\s*(?P<value>[-+]?\d+(?:[.,]\d+)?(?:e[-+]?\d+)?)\s*'
+    r'(?P<from>.+?)\s+(?:в|во|to|in|->|→|=)\s+(?P<to>.+?)\s*[?.!]?\s*$',
+    re.IGNORECASE
+)
+
+# "3.5 atm" — без целевой единицы
+VALUE_PATTERN = re.compile(
+    r'^\s*(?P<value>[-+]?\d+(?:[.,]\d+)?(?:e[-+]?\d+)?)\s*(?P<from>.+?)\s*$',
+    re.IGNORECASE
+)
+
+
+class UnitConverter:
+    """Конвертер величин с предвычисленными преобразованиями для всех пар"""
+
+    def __init__(self):
+        self.categories: Dict[str, List[Tuple[str, str]]] = {}
+        self._category_of: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        self._transforms: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+        self._compile()
+
+    # ========== КОМПИЛЯЦИЯ ==========
+
+    def _compile(self):
+        """Построение графа коэффициентов и преобразований для всех пар"""
+        # Ребра графа: from -> [(to, a, b)], y = a·x + b
+        edges: Dict[str, List[Tuple[str, float, float]]] = {}
+
+        def connect(source: str, target: str, a: float, b: float):
+            edges.setdefault(source, []).append((target, a, b))
+            edges.setdefault(target, []).append((source, 1 / a, -b / a))
+
+        for category, units in UNITS.items():
+            self.categories[category] = [(code, name) for code, name, _, _ in units]
+            base = units[0][0]
+            edges.setdefault(base, [])
+            for code, _, factor, offset in units[1:]:
+                connect(code, base, factor, offset)
+            for code, _, _, _ in units:
+                self._category_of[code] = category
+
+        self.categories['currency'] = list(CURRENCIES)
+        for code, _ in CURRENCIES:
+            self._category_of[code] = 'currency'
+            edges.setdefault(code, [])
+        for source, rates in CURRENCY_RATES.items():
+            for target, rate in rates.items():
+                # Прямые курсы имеют приоритет над обратными
+                if not any(t == target for t, _, _ in edges[source]):
+                    edges[source].append((target, rate, 0.0))
+                if not any(t == source for t, _, _ in edges[target]):
+                    edges[target].append((source, 1 / rate, 0.0))
+
+        # Для каждой единицы — обход графа в ширину с композицией
+        # преобразований: сначала прямые ребра, затем пути через соседей
+        for start in edges:
+            self._transforms[(start, start)] = (1.0, 0.0)
+            visited = {start}
+            pending = deque([(start, 1.0, 0.0)])
+            while pending:
+                node, a, b = pending.popleft()
+                for target, edge_a, edge_b in edges[node]:
+                    if target in visited:
+                        continue
+                    visited.add(target)
+                    composed = (edge_a * a, edge_a * b + edge_b)
+                    self._transforms[(start, target)] = composed
+                    pending.append((target, *composed))
+
+        # Обозначения: код, название и дополнительные варианты
+        for category, units in self.categories.items():
+            for code, name in units:
+                for alias in [code, name] + ALIASES.get(code, []):
+                    self._aliases.setdefault(self._normalize(alias), code)
+
+    @staticmethod
+    def _normalize(unit: str) -> str:
+        return ' '.join(unit.strip().lower().replace('ё', 'е').split())
+
+    # ========== КОНВЕРТАЦИЯ ==========
+
+    def resolve(self, unit: str) -> str:
+        """
+        Код единицы по обозначению
+
+        Args:
+            unit: Код, название или обозначение ('km', 'км', 'мили')
+
+        Returns:
+            Код единицы
+        """
+        code = self._aliases.get(self._normalize(unit))
+        if code is None:
+            raise ValueError(f"Неизвестная единица: {unit}")
+        return code
+
+    def category(self, unit: str) -> str:
+        """Категория единицы"""
+        return self._category_of[self.resolve(unit)]
+
+    def name(self, unit: str) -> str:
+        """Название единицы для вывода"""
+        code = self.resolve(unit)
+        return dict(self.categories[self._category_of[code]])[code]
+
+    def transform(self, from_unit: str, to_unit: str) -> Tuple[float, float]:
+        """
+        Предвычисленное преобразование y = a·x + b
+
+        Returns:
+            Коэффициенты (a, b)
+        """
+        source = self.resolve(from_unit)
+        target = self.resolve(to_unit)
+        transform = self._transforms.get((source, target))
+        if transform is None:
+            raise ValueError(
+                f"Нельзя перевести {self._category_of[source]} "
+                f"в {self._category_of[target]}"
+            )
+        return transform
+
+    def convert(self, value: float, from_unit: str, to_unit: str) -> float:
+        """
+        Конвертация значения
+
+        Args:
+            value: Значение
+            from_unit: Исходная единица
+            to_unit: Целевая единица
+
+        Returns:
+            Значение в целевой единице
+        """
+        a, b = self.transform(from_unit, to_unit)
+        return a * value + b
+
+    def convert_many(self, values: Iterable[float], from_unit: str,
+                     to_unit: str):
+        """
+        Конвертация набора значений
+
+        Args:
+            values: Список или массив NumPy значений
+            from_unit: Исходная единица
+            to_unit: Целевая единица
+
+        Returns:
+            Массив NumPy для массива на входе, иначе список
+        """
+        a, b = self.transform(from_unit, to_unit)
+        if isinstance(values, np.ndarray):
+            return a * values + b
+        return [a * value + b for value in values]
+
+    def convert_all(self, value: float, from_unit: str) -> List[Tuple[str, float]]:
+        """
+        Значение во всех остальных единицах той же категории
+
+        Returns:
+            [(код единицы, значение)] в порядке таблицы единиц
+        """
+        source = self.resolve(from_unit)
+        result = []
+        for code, _ in self.categories[self._category_of[source]]:
+            if code != source:
+                a, b = self._transforms[(source, code)]
+                result.append((code, a * value + b))
+        return result
+
+    # ========== РАЗБОР ТЕКСТА ==========
+
+    def parse(self, text: str) -> Optional[Tuple[float, str, str]]:
+        """
+        Разбор запроса вида "150 km в мили"
+
+        Returns:
+            (значение, код исходной единицы, код целевой единицы)
+            или None, если текст не является запросом конвертации
+        """
+        match = QUERY_PATTERN.match(text)
+        if match is None:
+            return None
+
+        source = self._aliases.get(self._normalize(match['from']))
+        target = self._aliases.get(self._normalize(match['to']))
+        if source is None or target is None:
+            return None
+
+        return float(match['value'].replace(',', '.')), source, target
+
+    def parse_value(self, text: str) -> Optional[Tuple[float, str]]:
+        """
+        Разбор значения с единицей без целевой единицы ("3.5 atm")
+
+        Returns:
+            (значение, код единицы) или None
+        """
+        match = VALUE_PATTERN.match(text)
+        if match is None:
+            return None
+
+        source = self._aliases.get(self._normalize(match['from']))
+        if source is None:
+            return None
+
+        return float(match['value'].replace(',', '.')), source
+
+
+# Конвертер компилируется один раз при импорте
+converter = UnitConverter()
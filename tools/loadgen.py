@@ -0,0 +1,167 @@
+"""
+Нагрузочный тест webhook-режима бота без реального Telegram API
+
+Скрипт поднимает локальную заглушку Bot API и отправляет синтетические
+обновления на webhook бота, измеряя пропускную способность и задержки:
+время подтверждения webhook (HTTP 200) и время до ответа бота
+(запрос sendMessage в заглушку).
+
+Пример:
+    TELEGRAM_API_URL=http://127.0.0.1:8081 BOT_TOKEN=123:test \\
+        python bot.py --webhook --workers 4
+    python tools/loadgen.py --updates 20000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+
+from aiohttp import ClientSession, TCPConnector, web
+
+TEXTS = ["/start", "/help", "/categories", "📜 История", "⭐ Избранное"]
+
+
+class FakeBotAPI:
+    """Заглушка Bot API: отвечает на любые методы и фиксирует ответы бота"""
+
+    def __init__(self):
+        self.replied_at = {}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+
+        now = time.perf_counter()
+        chat_id = int(params.get("chat_id", 0) or 0)
+
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Bot",
+                      "username": "loadgen_bot"}
+        elif method.startswith("send") or method.startswith("edit"):
+            self.replied_at.setdefault(chat_id, now)
+            result = {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": str(params.get("text", ""))
+            }
+        else:
+            result = True
+
+        return web.json_response({"ok": True, "result": result})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/bot{token}/{method}", self.handle)
+        return app
+
+
+def make_update(update_id: int, chat_id: int, text: str) -> dict:
+    """Синтетическое обновление с текстовым сообщением"""
+    user = {"id": chat_id, "is_bot": False, "first_name": "Load"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": user,
+            "text": text
+        }
+    }
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def run(args):
+    api = FakeBotAPI()
+    runner = web.AppRunner(api.app())
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.api_port).start()
+
+    headers = {"Content-Type": "application/json"}
+    if args.secret:
+        headers["X-Telegram-Bot-Api-Secret-Token"] = args.secret
+
+    sent_at = {}
+    ack_latency = []
+    errors = 0
+    counter = itertools.count(1)
+
+    async def worker(session: ClientSession):
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i > args.updates:
+                return
+            chat_id = 10_000_000 + i
+            body = json.dumps(make_update(i, chat_id, TEXTS[i % len(TEXTS)]))
+            start = time.perf_counter()
+            sent_at[chat_id] = start
+            try:
+                async with session.post(args.url, data=body,
+                                        headers=headers) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except OSError:
+                errors += 1
+            ack_latency.append(time.perf_counter() - start)
+
+    connector = TCPConnector(limit=args.concurrency)
+    async with ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session)
+                               for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    # Ждем ответы бота, обработанные в фоне
+    deadline = time.perf_counter() + args.drain
+    while len(api.replied_at) < args.updates and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+
+    reply_latency = [api.replied_at[chat_id] - sent
+                     for chat_id, sent in sent_at.items()
+                     if chat_id in api.replied_at]
+
+    await runner.cleanup()
+
+    print(f"Обновлений:        {args.updates} (ошибок: {errors})")
+    print(f"Пропускная способность: {args.updates / elapsed:.0f} обн/с")
+    print(f"Подтверждение webhook: p50 {percentile(ack_latency, 50) * 1000:.1f} мс, "
+          f"p99 {percentile(ack_latency, 99) * 1000:.1f} мс")
+    print(f"Ответ бота ({len(reply_latency)}): "
+          f"p50 {percentile(reply_latency, 50) * 1000:.1f} мс, "
+          f"p99 {percentile(reply_latency, 99) * 1000:.1f} мс")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", default="http://127.0.0.1:8080/webhook",
+                        help="Адрес webhook бота")
+    parser.add_argument("--api-port", type=int, default=8081,
+                        help="Порт заглушки Bot API")
+    parser.add_argument("--updates", type=int, default=10000,
+                        help="Количество обновлений")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="Число одновременных запросов")
+    parser.add_argument("--secret", default="",
+                        help="Секрет webhook (WEBHOOK_SECRET)")
+    parser.add_argument("--drain", type=float, default=10.0,
+                        help="Время ожидания ответов бота после отправки, с")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))